@@ -1,4 +1,3 @@
-from src.advising import *
 import argparse
 import os
 
@@ -8,29 +7,106 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(
                     prog='AdvisingScript',
                     description='This script helps with honours advising in the School of Mathematics and Statistics at the University of St Andrews.',
-                    epilog='All results are experimental and will need to be double-checked. \n\n')
+                    epilog='All results are experimental and will need to be double-checked. \n\n' + 
+                           'Instead of a file, folder or student ID, the following commands can be given: \n' +
+                           'compile-catalogue: check the module catalogue and save it in a format that loads faster. Needs to be repeated whenever Module_catalogue.xlsx changes.\n' +
+                           'blocked-by MODULE: list all modules that cannot be taken without MODULE, and all students who selected them and have not passed MODULE.\n' +
+                           'requires MODULE: list all modules that MODULE depends on through its prerequisites.\n' +
+                           'suggest STUDENT_ID [MODULE ...]: suggest changes to the module choices of a student that fix timetable clashes, modules that are not running and missing prerequisites while meeting the programme requirements. If modules are given, only these modules are added.\n' +
+                           'forecast [ACADEMIC_YEAR]: save how many students plan to take each module, how many students are in lectures at each timeslot, and the most common clashing pairs of modules into forecast.xlsx or the file given with -o. If an academic year like 2025/2026 is given, only module choices for that year are counted.\n' +
+                           'clash-table [ACADEMIC_YEAR]: save which modules clash in each semester, and how many students selected each clashing pair, into clash_table.xlsx or the file given with -o. If an academic year like 2025/2026 is given, only modules running in that year are included.',
+                    formatter_class=argparse.RawDescriptionHelpFormatter)
     
-    parser.add_argument('file_or_folder', type = str, nargs='?', help = 'name of the file or folder to be processed, or a student ID')       
-    parser.add_argument('-o', '--output', type = str, default = 'summary_file.xlsx', help = 'name of the output excel file')       
+    parser.add_argument('file_or_folder', type = str, nargs='?', help = 'name of the file or folder to be processed, or a student ID, or one of the commands listed below')       
+    parser.add_argument('command_arguments', type = str, nargs='*', help = 'the module codes for the commands listed below')       
+    parser.add_argument('-o', '--output', type = str, help = 'name of the output excel file, summary_file.xlsx by default')       
     parser.add_argument('--check-final-years', action="store_true", help = 'use this option to check all final year students using the database only')
+    parser.add_argument('--incremental', action="store_true", help = 'use this option to only reload the students whose data changed since the last run. Together with --check-final-years, only these students will be checked again.')
     parser.add_argument('-p', '--programme_name', type = str, help = 'use this option to provide an alternative programme name. Will be ignored if more than one student is checked.')
+    parser.add_argument('--all-programmes', action="store_true", help = 'use this option to check a single file or student ID against the requirements of every programme, and save the programmes ranked by the number of unmet requirements into programme_comparison.xlsx or the file given with -o')
     parser.add_argument('-y', '--year_of_study', type = int, help = 'use this option to manually provide the year of study. Will be ignored if more than one student is checked. Note, that the expected input is 1-based for all students, i.e. for direct entry students the years of study are year 1, 2, and 3 instead of 2, 3, and 4.')
 
     args = parser.parse_args()
 
+    # the advising package loads pandas and other large libraries, so we only import it once the arguments are parsed,
+    # which keeps --help fast
+    from src.advising import *
+
     file_or_folder = args.file_or_folder
     saving_name = args.output
+    if saving_name is None:
+        saving_name = 'summary_file.xlsx'
     programme_name = args.programme_name
     year_of_study = args.year_of_study
+
+    if file_or_folder == 'compile-catalogue':
+        compile_module_catalogue()
+        exit()
+
+    if file_or_folder == 'requires':
+        for module_code in args.command_arguments:
+            print_modules_required_by(module_code)
+        exit()
     
+    # load all student data once, so that it can be shared between all students that we check
+    student_record_store = StudentRecordStore(incremental = args.incremental)
+
+    if file_or_folder == 'blocked-by':
+        for module_code in args.command_arguments:
+            print_modules_blocked_by(module_code, student_record_store)
+        exit()
+
+    if file_or_folder == 'suggest':
+        if len(args.command_arguments) == 0:
+            raise(ValueError('please give the student ID after suggest'))
+        if len(args.command_arguments) > 1:
+            candidate_modules = args.command_arguments[1:]
+        else:
+            candidate_modules = None
+        print_module_suggestions(int(args.command_arguments[0]), student_record_store, candidate_modules)
+        exit()
+
+    if file_or_folder == 'clash-table':
+        if args.output is None:
+            saving_name = 'clash_table.xlsx'
+        if len(args.command_arguments) > 0:
+            academic_year = args.command_arguments[0]
+        else:
+            academic_year = None
+        save_clash_table(saving_name, academic_year, student_record_store)
+        exit()
+
+    if file_or_folder == 'forecast':
+        if args.output is None:
+            saving_name = 'forecast.xlsx'
+        if len(args.command_arguments) > 0:
+            academic_year = args.command_arguments[0]
+        else:
+            academic_year = None
+        save_module_demand_forecast(saving_name, academic_year, student_record_store)
+        exit()
+
+    if args.all_programmes:
+        if args.output is None:
+            saving_name = 'programme_comparison.xlsx'
+        if args.check_final_years or os.path.isdir(file_or_folder):
+            raise(ValueError('--all-programmes needs a single file or student ID'))
+        elif os.path.isfile(file_or_folder):
+            save_programme_comparison(file_or_folder, saving_name, year_of_study, student_record_store)
+        elif file_or_folder.isdigit():
+            save_programme_comparison(int(file_or_folder), saving_name, year_of_study, student_record_store)
+        else:
+            raise(ValueError('argument is neither a file or a student ID. Does it exist?'))
+        exit()
+
     if args.check_final_years:
-        summary_data_frame = check_final_year_students()
+        summary_data_frame = check_final_year_students(student_record_store, incremental = args.incremental)
     elif os.path.isdir(file_or_folder):
-        summary_data_frame = process_folder(file_or_folder)
+        summary_data_frame = process_folder(file_or_folder, student_record_store = student_record_store)
     elif os.path.isfile(file_or_folder):
-        summary_data_frame = process_form_file_or_student_id(file_or_folder, programme_name, year_of_study)
+        summary_data_frame = process_form_file_or_student_id(file_or_folder, programme_name, year_of_study, student_record_store)
     elif file_or_folder.isdigit():
-        summary_data_frame = process_form_file_or_student_id(int(file_or_folder), programme_name, year_of_study)
+        summary_data_frame = process_form_file_or_student_id(int(file_or_folder), programme_name, year_of_study, student_record_store)
     else:
         raise(ValueError('argument is neither a file or a folder. Does it exist?'))
 
@@ -0,0 +1,265 @@
+import re
+from .prerequisite_expressions import *
+from .timeslots import *
+
+# the number of the format of compiled catalogue files. Increase this if the ModuleCatalogue class changes, so that
+# old compiled catalogues are no longer used
+catalogue_format_version = 5
+
+# prerequisite entries that do not list modules, and that the prerequisite check handles as special cases
+prerequisite_texts_without_modules = ['Letter of Agreement', 
+                                      'Students must have gained admission onto an MSc programme',
+                                      'See module catalogue']
+
+class ModuleRecord():
+    def __init__(self, module_code, catalogue_rows):
+        """Constructor for the ModuleRecord class. Holds everything the checks need to know about one module
+        from the module catalogue.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code
+
+        catalogue_rows : pandas data frame
+            all rows of the module catalogue for this module. Most modules have one row, modules that are
+            taught in both semesters have one row per semester.
+        """
+        first_row = catalogue_rows.iloc[0]
+
+        # everything that is wrong with the catalogue entries of this module
+        self.problems = []
+
+        self.module_code = module_code
+        self.module_name = first_row['Module name']
+        # the semesters the module runs in, in the order in which they appear in the catalogue
+        self.semesters = catalogue_rows['Semester'].to_list()
+        self.academic_year = first_row['Year']
+        self.alternate_years_entry = first_row['Alternate years']
+        if self.alternate_years_entry == 'Yes':
+            self.is_alternating = True
+        elif self.alternate_years_entry == 'No':
+            self.is_alternating = False
+        else:
+            # the checks complain about this when they need to know if the module is alternating
+            self.is_alternating = None
+            self.problems.append('cannot tell if module ' + module_code + ' is alternating or not, the entry is ' + 
+                                 repr(self.alternate_years_entry))
+        if not isinstance(self.academic_year, str) or re.fullmatch(r'\d{4}/\d{4}', self.academic_year) is None:
+            self.problems.append('module ' + module_code + ' has an invalid academic year ' + repr(self.academic_year))
+        for semester in self.semesters:
+            if semester not in ['S1', 'S2', 'Full Year']:
+                self.problems.append('module ' + module_code + ' has an invalid semester ' + repr(semester))
+        self.prerequisites = first_row['Prerequisites']
+        # the compiled prerequisites, None if there are no prerequisites to check, and the error if they cannot be read
+        if isinstance(self.prerequisites, str) and self.prerequisites not in prerequisite_texts_without_modules:
+            try:
+                self.prerequisite_expression = PrerequisiteExpression(self.prerequisites)
+            except ValueError as error:
+                self.prerequisite_expression = error
+                self.problems.append('cannot read the prerequisites of module ' + module_code + ': ' + str(error))
+        else:
+            self.prerequisite_expression = None
+        self.antirequisites = first_row['Antirequisites']
+        if isinstance(self.antirequisites, str):
+            self.antirequisite_codes = re.findall(r'[A-Z]{2}\d{4}', self.antirequisites)
+        else:
+            self.antirequisite_codes = []
+        # bitmask of the antirequisites, set by the ModuleCatalogue
+        self.antirequisite_mask = 0
+        # the module catalogue currently has no credits column
+        self.credits = first_row.get('Credits', float('nan'))
+
+        # the timeslots of the first row, and the timeslots for each semester, as bitmasks. Entries that cannot be 
+        # parsed are stored as the error, which is raised when the timeslots are needed
+        self.timeslot_mask = get_timeslot_mask_or_error(first_row['Timetable'])
+        self.semester_timeslot_masks = dict()
+        for _, row in catalogue_rows.iterrows():
+            if row['Semester'] not in self.semester_timeslot_masks:
+                self.semester_timeslot_masks[row['Semester']] = get_timeslot_mask_or_error(row['Timetable'])
+                if isinstance(self.semester_timeslot_masks[row['Semester']], Exception):
+                    self.problems.append('cannot read the timetable of module ' + module_code + ': ' + 
+                                         str(self.semester_timeslot_masks[row['Semester']]))
+
+class ModuleCatalogue():
+    def __init__(self, catalogue_data_frame):
+        """Constructor for the ModuleCatalogue class. Builds one record per module and indexes the records
+        by module code, and the timeslots by module code and semester, so that looking up a module does
+        not require scanning the catalogue.
+
+        Parameters:
+        -----------
+
+        catalogue_data_frame : pandas data frame
+            the content of Module_catalogue.xlsx
+        """
+        self.data_frame = catalogue_data_frame
+        self.records = dict()
+        for module_code, catalogue_rows in catalogue_data_frame.groupby('Module code', sort=False):
+            self.records[module_code] = ModuleRecord(module_code, catalogue_rows)
+
+        self.semester_index = dict()
+        for module_code, record in self.records.items():
+            for semester, timeslot_mask in record.semester_timeslot_masks.items():
+                self.semester_index[(module_code, semester)] = timeslot_mask
+
+        # every module code in the catalogue, including codes that only appear as pre- or antirequisites, gets
+        # a bit position, so that sets of modules can be stored as bitmasks
+        self.module_index = dict()
+        for module_code in self.records:
+            self.add_to_module_index(module_code)
+        for module_code, record in self.records.items():
+            if isinstance(record.prerequisite_expression, PrerequisiteExpression):
+                for required_module_code in record.prerequisite_expression.module_codes:
+                    self.add_to_module_index(required_module_code)
+                record.prerequisite_expression.assign_module_bits(self.module_index)
+            for antirequisite_code in record.antirequisite_codes:
+                self.add_to_module_index(antirequisite_code)
+            record.antirequisite_mask = self.get_module_bitmask(record.antirequisite_codes)
+
+        # everything that is wrong with the catalogue, so that it can be reported once
+        self.problems = []
+        for module_code in catalogue_data_frame['Module code']:
+            if not isinstance(module_code, str) or re.fullmatch(r'[A-Z]{2}\d{4}', module_code) is None:
+                self.problems.append('invalid module code ' + repr(module_code))
+        for record in self.records.values():
+            self.problems += record.problems
+
+    def __contains__(self, module_code):
+        return module_code in self.records
+
+    def add_to_module_index(self, module_code):
+        """Give a module code the next free bit position, unless it already has one.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code
+        """
+        if module_code not in self.module_index:
+            self.module_index[module_code] = len(self.module_index)
+
+    def get_module_bit(self, module_code):
+        """Get the bit of a module in module bitmasks.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code
+
+        Returns:
+        --------
+
+        module_bit : int
+            the bit, or 0 for modules that the catalogue does not know about, since these are never a pre- or antirequisite
+        """
+        if module_code in self.module_index:
+            return 1 << self.module_index[module_code]
+        return 0
+
+    def get_module_bitmask(self, module_codes):
+        """Turn a collection of module codes into a bitmask.
+
+        Parameters:
+        -----------
+
+        module_codes : list or set of strings
+            the module codes
+
+        Returns:
+        --------
+
+        module_bitmask : int
+            the bitmask, which has the bits of all given modules set. Modules that the catalogue does not know about are left out.
+        """
+        module_bitmask = 0
+        for module_code in module_codes:
+            if module_code in self.module_index:
+                module_bitmask |= 1 << self.module_index[module_code]
+
+        return module_bitmask
+
+    def get_record(self, module_code):
+        """Get the catalogue record of a module.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code
+
+        Returns:
+        --------
+
+        record : instance of ModuleRecord or None
+            the record, or None if the module is not in the catalogue
+        """
+        return self.records.get(module_code)
+
+    def get_timeslot_mask(self, module_code, semester):
+        """Get the timeslots of a module in a semester as a bitmask. If the module only has one row in the catalogue,
+        the timeslots of that row are used for either semester.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code
+
+        semester : string
+            needs to be one of 'S1' or 'S2'
+
+        Returns:
+        --------
+
+        timeslot_mask : int
+            the bitmask of all timeslots that the module is running in, or 0 if the module is not in the catalogue
+        """
+        record = self.records.get(module_code)
+        if record is None:
+            return 0
+        if len(record.semesters) == 1:
+            timeslot_mask = record.timeslot_mask
+        elif (module_code, semester) in self.semester_index:
+            timeslot_mask = self.semester_index[(module_code, semester)]
+        else:
+            raise(ValueError('module ' + module_code + ' has no timetable entry for semester ' + str(semester)))
+        if isinstance(timeslot_mask, Exception):
+            raise timeslot_mask
+        return timeslot_mask
+
+    def get_timeslots(self, module_code, semester):
+        """Get the timeslots of a module in a semester, as readable strings like '9am Mon (odd weeks)'.
+        Takes the same arguments as get_timeslot_mask().
+
+        Returns:
+        --------
+
+        timeslots : list of strings
+            all timeslots that the module is running in, or an empty list if the module is not in the catalogue
+        """
+        return get_timeslot_labels(self.get_timeslot_mask(module_code, semester))
+
+def get_timeslot_mask_or_error(timeslot_entry):
+    """Parse an entry of the 'Timetable' column with parse_timetable_entry() and turn it into a bitmask, 
+    but return the error instead of raising it if the entry cannot be parsed.
+
+    Parameters:
+    -----------
+
+    timeslot_entry : string or float
+        the entry of the catalogue
+
+    Returns:
+    --------
+
+    timeslot_mask : int or Exception
+        the bitmask of all timeslots in the entry, or the error that occurred when parsing it
+    """
+    try:
+        return get_timeslot_mask(parse_timetable_entry(timeslot_entry))
+    except Exception as error:
+        return error
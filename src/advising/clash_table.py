@@ -0,0 +1,220 @@
+from .infrastructure import *
+from .offerings import *
+
+class ClashTable():
+    def __init__(self, module_catalogue, semester, module_codes = None):
+        """Constructor for the ClashTable class. Compares the timeslots of every pair of modules in one semester
+        once, so that checking the module choices of a student only needs to look up the pairs.
+
+        Parameters:
+        -----------
+
+        module_catalogue : instance of ModuleCatalogue
+            the module catalogue, as returned by get_module_catalogue()
+
+        semester : string
+            needs to be one of 'S1' or 'S2'
+
+        module_codes : list of strings
+            the modules to include. If this is None, all modules in the catalogue are included. Modules without a
+            readable timetable entry for the semester are left out in either case.
+        """
+        self.semester = semester
+        if module_codes is None:
+            module_codes = list(module_catalogue.records)
+
+        # the timeslot bitmask of each module in the table
+        self.module_codes = []
+        self.timeslot_masks = []
+        for module_code in sorted(module_codes):
+            try:
+                timeslot_mask = module_catalogue.get_timeslot_mask(module_code, semester)
+            except Exception:
+                continue
+            self.module_codes.append(module_code)
+            self.timeslot_masks.append(timeslot_mask)
+        self.module_positions = {module_code: position for position, module_code in enumerate(self.module_codes)}
+
+        # one row of timeslot bits per module, so that all pairs can be compared with one matrix product
+        number_of_timeslot_bits = max([timeslot_mask.bit_length() for timeslot_mask in self.timeslot_masks], default = 0)
+        timeslot_bits = np.zeros((len(self.module_codes), number_of_timeslot_bits), dtype = np.int32)
+        for position, timeslot_mask in enumerate(self.timeslot_masks):
+            for bit_position in range(timeslot_mask.bit_length()):
+                if (timeslot_mask >> bit_position) & 1:
+                    timeslot_bits[position, bit_position] = 1
+
+        # symmetric, True if the two modules share at least one timeslot. A module does not clash with itself.
+        self.clash_matrix = (timeslot_bits @ timeslot_bits.T) > 0
+        np.fill_diagonal(self.clash_matrix, False)
+
+        # the shared timeslots of every clashing pair, stored once for each pair of positions with first < second
+        self.overlapping_timeslots = dict()
+        for first_position, second_position in zip(*np.nonzero(np.triu(self.clash_matrix))):
+            self.overlapping_timeslots[(first_position, second_position)] = (self.timeslot_masks[first_position] &
+                                                                            self.timeslot_masks[second_position])
+
+    def get_overlapping_timeslots(self, first_module, second_module):
+        """Look up the timeslots that two modules share.
+
+        Parameters:
+        -----------
+
+        first_module : string
+            a module code
+
+        second_module : string
+            another module code
+
+        Returns:
+        --------
+
+        timeslot_mask : int
+            the bitmask of the shared timeslots, which is 0 if the modules do not clash, or if one of them is not in the table
+        """
+        if first_module not in self.module_positions or second_module not in self.module_positions:
+            return 0
+        first_position = self.module_positions[first_module]
+        second_position = self.module_positions[second_module]
+        return self.overlapping_timeslots.get((min(first_position, second_position), max(first_position, second_position)), 0)
+
+    def get_data_frame(self):
+        """Write the clash table as a grid, with one row and one column per module.
+
+        Returns:
+        --------
+
+        clash_data_frame : pandas data frame
+            each entry lists the shared timeslots of two modules, and is empty if they do not clash
+        """
+        clash_entries = np.full(self.clash_matrix.shape, '', dtype = object)
+        for (first_position, second_position), timeslot_mask in self.overlapping_timeslots.items():
+            clash_entry = ', '.join(get_timeslot_labels(timeslot_mask))
+            clash_entries[first_position, second_position] = clash_entry
+            clash_entries[second_position, first_position] = clash_entry
+
+        return pd.DataFrame(clash_entries, index = self.module_codes, columns = self.module_codes)
+
+@functools.lru_cache(maxsize=None)
+def get_clash_table(semester, academic_year = None):
+    """Build the clash table for a semester once per process.
+
+    Parameters:
+    -----------
+
+    semester : string
+        needs to be one of 'S1' or 'S2'
+
+    academic_year : string
+        an academic year like '2025/2026'. If this is given, only modules that run in this academic year are included.
+
+    Returns:
+    --------
+
+    clash_table : instance of ClashTable
+        the clash table
+    """
+    if academic_year is None:
+        module_codes = None
+    else:
+        module_codes = get_offering_index().get_modules_running_in_academic_year(academic_year)
+
+    return ClashTable(get_module_catalogue(), semester, module_codes)
+
+def get_cohort_clash_statistics(student_record_store = None, academic_year = None):
+    """Count how many students in the student data have selected each pair of clashing modules for the same semester.
+
+    Parameters:
+    -----------
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    academic_year : string
+        an academic year like '2025/2026'. If this is given, only module choices for this academic year are counted.
+
+    Returns:
+    --------
+
+    clash_statistics : pandas data frame
+        one row per pair of clashing modules, with the columns 'Academic year', 'Semester', 'First module',
+        'Second module', 'Clashing timeslots' and 'Number of students', sorted by the number of students
+    """
+    if student_record_store is None:
+        student_record_store = get_student_record_store()
+    data_base = student_record_store.data_base
+
+    planned_entries = data_base.loc[data_base['Assessment result'].isna(), ['Student ID', 'Year', 'Semester', 'Module code']]
+    planned_entries = planned_entries.astype({'Year': str, 'Semester': str, 'Module code': str}).drop_duplicates()
+    if academic_year is not None:
+        planned_entries = planned_entries[planned_entries['Year'] == academic_year]
+
+    # all pairs of modules that a student has selected for the same semester
+    module_pairs = planned_entries.merge(planned_entries, on = ['Student ID', 'Year', 'Semester'], suffixes = (' 1', ' 2'))
+    module_pairs = module_pairs[module_pairs['Module code 1'] < module_pairs['Module code 2']]
+
+    clash_statistics_list = []
+    for semester in ['S1', 'S2']:
+        clash_table = get_clash_table(semester, academic_year)
+        these_module_pairs = module_pairs[module_pairs['Semester'] == semester]
+        first_positions = these_module_pairs['Module code 1'].map(clash_table.module_positions)
+        second_positions = these_module_pairs['Module code 2'].map(clash_table.module_positions)
+        pair_is_in_table = (first_positions.notna() & second_positions.notna()).to_numpy()
+        these_module_pairs = these_module_pairs[pair_is_in_table]
+        pair_is_clashing = clash_table.clash_matrix[first_positions[pair_is_in_table].astype(int).to_numpy(),
+                                                    second_positions[pair_is_in_table].astype(int).to_numpy()]
+        clashing_pairs = these_module_pairs[pair_is_clashing]
+        pair_counts = clashing_pairs.groupby(['Year', 'Module code 1', 'Module code 2']).size()
+        for (this_academic_year, first_module, second_module), number_of_students in pair_counts.items():
+            clashing_timeslots = get_timeslot_labels(clash_table.get_overlapping_timeslots(first_module, second_module))
+            clash_statistics_list.append([this_academic_year, semester, first_module, second_module,
+                                          ', '.join(clashing_timeslots), number_of_students])
+
+    clash_statistics = pd.DataFrame(clash_statistics_list, columns = ['Academic year', 'Semester', 'First module', 'Second module',
+                                                                      'Clashing timeslots', 'Number of students'])
+    clash_statistics = clash_statistics.sort_values(by = ['Number of students', 'Academic year', 'Semester'],
+                                                    ascending = [False, True, True], ignore_index = True)
+
+    return clash_statistics
+
+def save_clash_table(filename, academic_year = None, student_record_store = None):
+    """Save the clash tables of both semesters, for example for the timetabling office. This is what
+    'python advising_tool.py clash-table' does.
+
+    Parameters:
+    -----------
+
+    filename : string
+        an excel file, with one sheet per semester, or a csv file, in which case one file per semester is
+        saved with '_S1' and '_S2' added to the name
+
+    academic_year : string
+        an academic year like '2025/2026'. If this is given, only modules that run in this academic year are included.
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is given, the number of students who selected each clashing pair of
+        modules is saved as well, in a sheet 'Students' or a file ending in '_students'.
+    """
+    clash_data_frames = {semester: get_clash_table(semester, academic_year).get_data_frame() for semester in ['S1', 'S2']}
+    if student_record_store is not None:
+        clash_statistics = get_cohort_clash_statistics(student_record_store, academic_year)
+
+    file_root, file_extension = os.path.splitext(filename)
+    if file_extension == '.csv':
+        saved_files = []
+        for semester, clash_data_frame in clash_data_frames.items():
+            saved_files.append(file_root + '_' + semester + '.csv')
+            clash_data_frame.to_csv(saved_files[-1])
+        if student_record_store is not None:
+            saved_files.append(file_root + '_students.csv')
+            clash_statistics.to_csv(saved_files[-1], index = False)
+    else:
+        if file_extension != '.xlsx':
+            filename = file_root + '.xlsx'
+        with pd.ExcelWriter(filename) as writer:
+            for semester, clash_data_frame in clash_data_frames.items():
+                clash_data_frame.to_excel(writer, sheet_name = semester)
+            if student_record_store is not None:
+                clash_statistics.to_excel(writer, sheet_name = 'Students', index = False)
+        saved_files = [filename]
+
+    print('Saved the clash tables in ' + ' and '.join(saved_files))
@@ -0,0 +1,149 @@
+from .infrastructure import *
+from .clash_table import *
+
+def get_planned_module_entries(student_record_store = None, academic_year = None):
+    """Get all planned module choices of all students in the student data, i.e. all entries without an assessment result.
+
+    Parameters:
+    -----------
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    academic_year : string
+        an academic year like '2025/2026'. If this is given, only module choices for this academic year are included.
+
+    Returns:
+    --------
+
+    planned_entries : pandas data frame
+        one row per student, module, academic year and semester, with the columns 'Student ID', 'Programme name',
+        'Academic year', 'Semester' and 'Module code'
+    """
+    if student_record_store is None:
+        student_record_store = get_student_record_store()
+    data_base = student_record_store.data_base
+
+    planned_entries = data_base.loc[data_base['Assessment result'].isna(),
+                                    ['Student ID', 'Programme name', 'Year', 'Semester', 'Module code']]
+    planned_entries = planned_entries.astype({'Programme name': str, 'Year': str, 'Semester': str, 'Module code': str})
+    planned_entries = planned_entries.rename(columns = {'Year': 'Academic year'})
+    planned_entries = planned_entries.drop_duplicates(subset = ['Student ID', 'Academic year', 'Semester', 'Module code'],
+                                                      ignore_index = True)
+    if academic_year is not None:
+        planned_entries = planned_entries[planned_entries['Academic year'] == academic_year].reset_index(drop = True)
+
+    return planned_entries
+
+def get_module_demand(planned_entries):
+    """Count how many students plan to take each module in each academic year and semester.
+
+    Parameters:
+    -----------
+
+    planned_entries : pandas data frame
+        the planned module choices, as returned by get_planned_module_entries()
+
+    Returns:
+    --------
+
+    module_demand : pandas data frame
+        one row per module, with the module name from the module catalogue, one column per academic year and semester
+        with the number of students, and a column 'Total'. Sorted by the total number of students.
+    """
+    module_demand = planned_entries.groupby(['Module code', 'Academic year', 'Semester']).size().unstack(['Academic year', 'Semester'],
+                                                                                                       fill_value = 0)
+    module_demand = module_demand.sort_index(axis = 1)
+    module_demand.columns = [academic_year + ' ' + semester for academic_year, semester in module_demand.columns]
+    module_demand['Total'] = module_demand.sum(axis = 1)
+
+    module_catalogue = get_module_catalogue()
+    module_names = [module_catalogue.get_record(module_code).module_name if module_code in module_catalogue else ''
+                    for module_code in module_demand.index]
+    module_demand.insert(0, 'Module name', module_names)
+    module_demand = module_demand.sort_values(by = ['Total'], ascending = False, kind = 'stable')
+
+    return module_demand
+
+def get_timeslot_load(planned_entries):
+    """Count how many students are planning to be in lectures at each timeslot, by adding up the planned
+    students of all modules running at that timeslot.
+
+    Parameters:
+    -----------
+
+    planned_entries : pandas data frame
+        the planned module choices, as returned by get_planned_module_entries()
+
+    Returns:
+    --------
+
+    timeslot_load : pandas data frame
+        one row per day and time, and one column per academic year, semester and odd or even weeks, with the
+        number of students. Modules without a readable timetable entry are left out.
+    """
+    module_counts = planned_entries[planned_entries['Semester'].isin(['S1', 'S2'])]
+    module_counts = module_counts.groupby(['Academic year', 'Semester', 'Module code']).size().rename('Number of students').reset_index()
+
+    # one row for each timeslot of each module and semester that appears in the module choices
+    module_catalogue = get_module_catalogue()
+    timeslot_table = []
+    for module_code, semester in module_counts[['Module code', 'Semester']].drop_duplicates().itertuples(index = False):
+        try:
+            timeslot_mask = module_catalogue.get_timeslot_mask(module_code, semester)
+        except Exception:
+            continue
+        while timeslot_mask:
+            bit_position = (timeslot_mask & -timeslot_mask).bit_length() - 1
+            timeslot_mask &= timeslot_mask - 1
+            hour_position, parity_index = divmod(bit_position, 2)
+            day_index, hour = divmod(hour_position, hours_per_day)
+            timeslot_table.append([module_code, semester, day_index, hour, week_parities[parity_index]])
+    timeslot_table = pd.DataFrame(timeslot_table, columns = ['Module code', 'Semester', 'Day number', 'Hour', 'Weeks'])
+
+    timeslot_counts = module_counts.merge(timeslot_table, on = ['Module code', 'Semester'])
+    timeslot_load = timeslot_counts.pivot_table(index = ['Day number', 'Hour'], columns = ['Academic year', 'Semester', 'Weeks'],
+                                                values = 'Number of students', aggfunc = 'sum', fill_value = 0)
+    timeslot_load = timeslot_load[sorted(timeslot_load.columns, key = lambda column: (column[0], column[1], week_parities.index(column[2])))]
+    timeslot_load.index = pd.MultiIndex.from_tuples([(timetable_days[day_index], get_hour_label(hour))
+                                                     for day_index, hour in timeslot_load.index], names = ['Day', 'Time'])
+
+    return timeslot_load
+
+def save_module_demand_forecast(filename, academic_year = None, student_record_store = None, number_of_clashing_pairs = 50):
+    """Save the projected enrolment of each module, the number of students at each timeslot, and the most common
+    pairs of clashing modules into one excel file. This is what 'python advising_tool.py forecast' does.
+
+    Parameters:
+    -----------
+
+    filename : string
+        an excel file, with the sheets 'Module demand', 'Timeslot load' and 'Clashing pairs'
+
+    academic_year : string
+        an academic year like '2025/2026'. If this is given, only module choices for this academic year are counted.
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    number_of_clashing_pairs : int
+        the number of clashing pairs of modules to list
+    """
+    if student_record_store is None:
+        student_record_store = get_student_record_store()
+
+    planned_entries = get_planned_module_entries(student_record_store, academic_year)
+    module_demand = get_module_demand(planned_entries)
+    timeslot_load = get_timeslot_load(planned_entries)
+    clash_statistics = get_cohort_clash_statistics(student_record_store, academic_year).head(number_of_clashing_pairs)
+
+    file_root, file_extension = os.path.splitext(filename)
+    if file_extension != '.xlsx':
+        filename = file_root + '.xlsx'
+    with pd.ExcelWriter(filename) as writer:
+        module_demand.to_excel(writer, sheet_name = 'Module demand')
+        timeslot_load.to_excel(writer, sheet_name = 'Timeslot load')
+        clash_statistics.to_excel(writer, sheet_name = 'Clashing pairs', index = False)
+
+    print('Counted the module choices of ' + str(planned_entries['Student ID'].nunique()) + ' students')
+    print('Saved the forecast in ' + filename)
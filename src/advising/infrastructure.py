@@ -1,17 +1,47 @@
 import os
-import openpyxl
 import pandas as pd
-import termcolor
 from .student import *
-import docx
+from .catalogue import *
 import numbers
+import functools
+import numpy as np
+import hashlib
+import pickle
 from datetime import date
 
 
 module_catalogue_location = os.path.join(os.path.dirname(__file__),'Module_catalogue.xlsx') 
-module_catalogue = pd.read_excel(module_catalogue_location)
-
-def process_form_file_or_student_id(argument, programme_name = None, year_of_study = None):
+compiled_module_catalogue_location = os.path.join(os.path.dirname(__file__),'Module_catalogue.pkl') 
+# modules that only run in the academic years listed in this file, instead of the years that follow from the module catalogue
+module_offering_overrides_location = os.path.join(os.path.dirname(__file__),'Module_offering_overrides.csv') 
+
+# The columns of the MMS 'academic data' export that the checks use, and the types they are read in as.
+# Text entries repeat many times (e.g. each module code appears for many students), so they are stored as
+# categories, i.e. as integer codes into a table of distinct values, which keeps memory use low and makes
+# comparisons fast.
+mms_data_schema = {'Student ID': 'int32',
+                   'Given names': 'category',
+                   'Family name': 'category',
+                   'Email': 'category',
+                   'Programme name': 'category',
+                   'Module code': 'category',
+                   'Year': 'category',
+                   'Semester': 'category',
+                   'Credits available': 'float32',
+                   'Credits': 'float32',
+                   'Assessment result': 'category',
+                   'Assessment grade': 'float32',
+                   'Reassessment result': 'category'}
+
+# increase this number whenever the format of cached student data changes
+mms_cache_version = 3
+
+# increase this number whenever a change to the checks, or to the format of the saved check results, can change 
+# the results for a student, so that --incremental does not reuse results of the previous version
+check_results_version = 2
+
+def process_form_file_or_student_id(argument, programme_name = None, year_of_study = None, student_record_store = None,
+                                    missing_programme_requirements = None, missing_prerequisites = None, not_running_modules = None):
     """preforms all advising checks on the 
     submitted form.
     
@@ -30,6 +60,22 @@ def process_form_file_or_student_id(argument, programme_name = None, year_of_stu
         if this is not none than the year of study will be taken to be this one instead of being inferred from the data base. 
         This can be useful for students who have taken a leave of absence or studied abroad, or who are repeating a year.
 
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    missing_programme_requirements : tuple of strings
+        the result of find_missing_programme_requirements() for this student, if it has already been worked out, e.g. for 
+        a whole cohort with find_missing_programme_requirements_for_cohort(). If this is None, the programme requirements 
+        will be checked here.
+
+    missing_prerequisites : tuple of strings
+        the result of find_missing_prerequisites() for this student, if it has already been worked out, e.g. for 
+        a whole cohort with find_missing_prerequisites_for_cohort(). If this is None, the prerequisites will be checked here.
+
+    not_running_modules : tuple of strings
+        the result of find_not_running_modules() for this student, if it has already been worked out, e.g. for 
+        a whole cohort with find_not_running_modules_for_cohort(). If this is None, the module offerings will be checked here.
+
     Returns:
     --------
 
@@ -42,10 +88,12 @@ def process_form_file_or_student_id(argument, programme_name = None, year_of_stu
     print(' ')
 
     if isinstance(argument, str):
-        student_or_warning = parse_excel_form(argument, programme_name = programme_name, year_of_study = year_of_study)
+        student_or_warning = parse_excel_form(argument, programme_name = programme_name, year_of_study = year_of_study,
+                                              student_record_store = student_record_store)
         _,filename_for_output = os.path.split(argument)
     elif isinstance(argument, numbers.Integral):
-        student_or_warning = collect_student_data(argument, programme_name = programme_name, year_of_study = year_of_study)
+        student_or_warning = collect_student_data(argument, programme_name = programme_name, year_of_study = year_of_study,
+                                                  student_record_store = student_record_store)
         filename_for_output = 'student id ' + str(argument)
     else:
         raise(ValueError('Could not read argument of process_form_file_or_student, it is not an int or a string'))
@@ -77,17 +125,23 @@ def process_form_file_or_student_id(argument, programme_name = None, year_of_stu
     print('Programme: ' + student.programme_name)
     print(' ')
     
-    missed_programme_requirements, programme_adviser_recommendations = find_missing_programme_requirements(student)
+    if missing_programme_requirements is None:
+        missing_programme_requirements = find_missing_programme_requirements(student)
+    missed_programme_requirements, programme_adviser_recommendations = missing_programme_requirements
     
     print('The student is missing the following programme requirements:')
     colour_code_print_statement(missed_programme_requirements)
 
-    missed_prerequisites, prerequisite_adviser_recommendations = find_missing_prerequisites(student)
+    if missing_prerequisites is None:
+        missing_prerequisites = find_missing_prerequisites(student)
+    missed_prerequisites, prerequisite_adviser_recommendations = missing_prerequisites
     
     print('The student is missing the following prerequisites:')
     colour_code_print_statement(missed_prerequisites)
 
-    not_running_modules, scheduling_adviser_recommendations = find_not_running_modules(student)
+    if not_running_modules is None:
+        not_running_modules = find_not_running_modules(student)
+    not_running_modules, scheduling_adviser_recommendations = not_running_modules
 
     print('The student selected the following modules when they are not running:')
     colour_code_print_statement(not_running_modules)
@@ -112,7 +166,7 @@ def process_form_file_or_student_id(argument, programme_name = None, year_of_stu
     
     return summary_data_frame
 
-def parse_excel_form(filename, programme_name = None, year_of_study = None):
+def parse_excel_form(filename, programme_name = None, year_of_study = None, student_record_store = None):
     """returns an instance of a 'student' class
     that has all the excel data as named attributes
 
@@ -129,6 +183,9 @@ def parse_excel_form(filename, programme_name = None, year_of_study = None):
     year_of_study : int
         the year of study if it should be overwritten and not taken from the student data base
 
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
     Returns:
     --------
 
@@ -136,6 +193,8 @@ def parse_excel_form(filename, programme_name = None, year_of_study = None):
         an object with student attributes. If it's a string then it's a warning
         message about what went wrong
     """
+    import openpyxl
+
     # open the form file and read in the student ID
     this_workbook = openpyxl.load_workbook(filename=filename)
     sheet = this_workbook.active
@@ -143,7 +202,8 @@ def parse_excel_form(filename, programme_name = None, year_of_study = None):
     if not isinstance(student_id, int):
         return 'No student ID'
         
-    this_student = collect_student_data(student_id, include_credits=False, programme_name = programme_name, year_of_study = year_of_study)
+    this_student = collect_student_data(student_id, include_credits=False, programme_name = programme_name, year_of_study = year_of_study,
+                                        student_record_store = student_record_store)
     if isinstance(this_student, str):
         return this_student
    
@@ -178,7 +238,63 @@ def parse_excel_form(filename, programme_name = None, year_of_study = None):
     # return the student
     return this_student
 
-def collect_student_data(student_id, include_credits = True, programme_name = None, year_of_study = None):
+def get_programme_years(programme_name):
+    """Look up how long a programme is.
+
+    Parameters :
+    -----------
+
+    programme_name : string
+        the programme name, e.g. 'Master in Mathematics (Honours) Mathematics'
+
+    Returns :
+    ---------
+
+    programme_length : tuple of ints
+        the number of years of the programme and the number of honours years, e.g. (5, 3), or None if the
+        programme is not recognised
+    """
+    if 'Bachelor of Science' in programme_name:
+        return 4, 2
+    elif 'Master in Mathematics' in programme_name:
+        return 5, 3
+    elif 'Master of Arts (Honours)' in programme_name: 
+        return 4, 2
+    elif 'Master in Chemistry (Honours) Chemistry with Mathematics' == programme_name:
+        return 5, 3
+    elif 'Master in Physics (Honours) Mathematics and Theoretical Physics' == programme_name:
+        return 5, 3
+    else:
+        return None
+
+def get_passed_module_mask(data_base):
+    """Find the entries of a data base that count as passed modules. Apart from passed modules, this includes 
+    z-coded and deferred modules, failed modules that are awaiting reassessment, and s-coded modules, which the 
+    checks treat as passed and flag to the adviser.
+
+    Parameters :
+    -----------
+
+    data_base : pandas data frame
+        entries of the MMS data base, e.g. of one student or of all students
+
+    Returns :
+    ---------
+
+    passed_module_mask : pandas series
+        True for each entry that counts as a passed module
+    """
+    return ((data_base['Assessment result']=='P') | 
+            (data_base['Reassessment result']=='P') |
+            ((data_base['Assessment result']=='Z') & (pd.isnull(data_base['Reassessment result']))) |
+            ((data_base['Assessment result']=='D') & (pd.isnull(data_base['Reassessment result']))) |
+            ((data_base['Assessment result']=='F') & (pd.isnull(data_base['Reassessment result'])) 
+                                                   & (data_base['Assessment grade'] > 3.5) ) | 
+            ( ( (data_base['Assessment result']=='S')|(data_base['Assessment result']=='SP') ) & 
+              ( (~pd.isnull(data_base['Assessment grade']) & (data_base['Assessment grade'] > 7.0) ) |
+                  (pd.isnull(data_base['Reassessment result']))) ))
+
+def collect_student_data(student_id, include_credits = True, programme_name = None, year_of_study = None, student_record_store = None):
     """Collects all available data for the student with the given ID
     
     Parameters :
@@ -196,6 +312,9 @@ def collect_student_data(student_id, include_credits = True, programme_name = No
     year_of_study : int
         the year of study if it should be overwritten and not taken from the student data base
 
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
     Returns :
     ---------
     
@@ -204,23 +323,15 @@ def collect_student_data(student_id, include_credits = True, programme_name = No
         message about what went wrong
     """
     # process data base here
-    
-    # Now that we have the student ID we can look up the student in the database:
-    data_bases = get_all_mms_data_bases()
-    year_data_base = get_year_data_base()
+    if student_record_store is None:
+        student_record_store = get_student_record_store()
+    programme_years = student_record_store.programme_years
 
+    # Now that we have the student ID we can look up the student in the database:
     # get a table with only the entries for this student
-    student_not_yet_found = True
-
-    data_base_index = 0
-    while student_not_yet_found and data_base_index < len(data_bases):
-        this_data_base = data_bases[data_base_index]
-        if student_id in this_data_base['Student ID'].to_numpy():
-            student_not_yet_found = False
-            student_data_base = this_data_base[this_data_base['Student ID'] == student_id]
-        data_base_index += 1
+    student_data_base = student_record_store.get_student_data_base(student_id)
         
-    if student_not_yet_found:
+    if student_data_base is None:
         return 'contains invalid student ID ' + str(student_id)
 
     # infer the year of study from the earliest module taken
@@ -230,11 +341,7 @@ def collect_student_data(student_id, include_credits = True, programme_name = No
 
     data_of_module_years = past_student_data_base['Year'].str.slice(0,4).astype('int')
     
-    today = date.today()
-    if today.month < 4:
-        current_calendar_year = today.year - 1
-    else:
-        current_calendar_year = today.year
+    current_calendar_year = get_current_calendar_year()
 
     if not pd.isna(data_of_module_years.min()):
         earliest_year = data_of_module_years.min()
@@ -250,11 +357,10 @@ def collect_student_data(student_id, include_credits = True, programme_name = No
             leave_of_absence_years +=1
    
     year_of_study_in_data_base = False
-    if year_data_base is not None and student_id in year_data_base['Student ID'].to_numpy():
-        data_base_year_of_study = year_data_base[year_data_base['Student ID'] == student_id]['Programme year'].values[0]
-        if not pd.isna(data_base_year_of_study):
-            # data_base_year_of_study -= 1
-            year_of_study_in_data_base = True
+    if student_id in programme_years:
+        data_base_year_of_study = programme_years[student_id]
+        # data_base_year_of_study -= 1
+        year_of_study_in_data_base = True
 
     year_of_study_provided_as_argument = False
     if year_of_study is not None:
@@ -271,15 +377,7 @@ def collect_student_data(student_id, include_credits = True, programme_name = No
         year_of_study_provided = False
  
     # identify all modules that the student has passed
-    data_base_of_passed_modules = student_data_base[(student_data_base['Assessment result']=='P') | 
-                                                    (student_data_base['Reassessment result']=='P') |
-                                                    ((student_data_base['Assessment result']=='Z') & (pd.isnull(student_data_base['Reassessment result']))) |
-                                                    ((student_data_base['Assessment result']=='D') & (pd.isnull(student_data_base['Reassessment result']))) |
-                                                    ((student_data_base['Assessment result']=='F') & (pd.isnull(student_data_base['Reassessment result'])) 
-                                                                                                   & (student_data_base['Assessment grade'] > 3.5) ) | 
-                                                    ( ( (student_data_base['Assessment result']=='S')|(student_data_base['Assessment result']=='SP') ) & 
-                                                      ( (~pd.isnull(student_data_base['Assessment grade']) & (student_data_base['Assessment grade'] > 7.0) ) |
-                                                          (pd.isnull(student_data_base['Reassessment result']))) )].copy()
+    data_base_of_passed_modules = student_data_base[get_passed_module_mask(student_data_base)].copy()
     data_base_of_passed_modules.drop_duplicates(subset='Module code', keep='last', inplace=True)
     passed_modules = data_base_of_passed_modules['Module code'].to_list()
     passed_modules = passed_modules
@@ -302,7 +400,7 @@ def collect_student_data(student_id, include_credits = True, programme_name = No
     s_coded_modules = data_base_of_s_coded_modules['Module code'].to_list()
 
     #identify the programme of the student
-    programme_counts = student_data_base['Programme name'].value_counts()
+    programme_counts = student_data_base['Programme name'].astype(object).value_counts()
     if programme_name == None:
         programme_name = programme_counts.idxmax()
     # programme_entries = student_data_base['Programme name'].unique()    
@@ -325,24 +423,11 @@ def collect_student_data(student_id, include_credits = True, programme_name = No
     email = email_entries[0]
 
     # Figure out what year they are in and how many they have left
-    if 'Bachelor of Science' in programme_name:
-        no_of_programme_years = 4
-        expected_honours_years = 2
-    elif 'Master in Mathematics' in programme_name:
-        no_of_programme_years = 5
-        expected_honours_years = 3
-    elif 'Master of Arts (Honours)' in programme_name: 
-        no_of_programme_years = 4
-        expected_honours_years = 2
-    elif 'Master in Chemistry (Honours) Chemistry with Mathematics' == programme_name:
-        no_of_programme_years = 5
-        expected_honours_years = 3
-    elif 'Master in Physics (Honours) Mathematics and Theoretical Physics' == programme_name:
-        no_of_programme_years = 5
-        expected_honours_years = 3
-    else:
+    programme_length = get_programme_years(programme_name)
+    if programme_length is None:
         warning_message = 'Do not recognise student programme for parsing: ' + programme_name
         return warning_message
+    no_of_programme_years, expected_honours_years = programme_length
     
     if 'EXA120' in student_data_base['Module code'].values:
         no_of_programme_years -=1
@@ -415,16 +500,365 @@ def collect_student_data(student_id, include_credits = True, programme_name = No
     
     return this_student
  
-def get_all_mms_data_bases():
-    '''looks into the student_data folder and loads all data bases in there that it can find into memory.
+@functools.lru_cache(maxsize=None)
+def get_module_catalogue():
+    '''Load the module catalogue. The catalogue is only loaded when it is first needed, and then kept 
+    in memory for the rest of the process, so that commands that do not need it start faster. If a compiled
+    catalogue made by compile_module_catalogue() exists and is up to date, it is used, otherwise the catalogue 
+    is read from Module_catalogue.xlsx and any problems with it are printed.
     
     Returns :
     ---------
     
-    data_bases: list of pandas data frames
-        each entry of the list is one pandas data frame from a .csv file found in the student_data folder.
+    module_catalogue : instance of ModuleCatalogue
+        the content of Module_catalogue.xlsx, indexed by module code. This is shared between all callers and should not be modified.
     '''
-    # Now that we have the student ID we can look up the student in the database:
+    cache_entry = read_cache_file(compiled_module_catalogue_location)
+    if cache_entry is not None:
+        if cache_entry['fingerprint'] == get_module_catalogue_fingerprint():
+            return cache_entry['module catalogue']
+        print('The compiled module catalogue is out of date and will not be used. Run "python advising_tool.py compile-catalogue" to update it.')
+        print(' ')
+
+    module_catalogue = ModuleCatalogue(pd.read_excel(module_catalogue_location))
+    for problem in module_catalogue.problems:
+        print('Problem in the module catalogue: ' + problem)
+    if len(module_catalogue.problems) > 0:
+        print(' ')
+
+    return module_catalogue
+
+def compile_module_catalogue():
+    '''Read Module_catalogue.xlsx, check every entry, and save the parsed catalogue next to it, so that later runs
+    can load it without reading and parsing the excel file. Nothing is saved if the catalogue contains errors.
+    '''
+    module_catalogue = ModuleCatalogue(pd.read_excel(module_catalogue_location))
+    if len(module_catalogue.problems) > 0:
+        raise(ValueError('The module catalogue contains the following errors, please fix them and try again:\n' + 
+                         '\n'.join(module_catalogue.problems)))
+
+    write_cache_file(compiled_module_catalogue_location, {'fingerprint': get_module_catalogue_fingerprint(),
+                                                          'module catalogue': module_catalogue})
+    # the cached catalogue of this process is now out of date
+    get_module_catalogue.cache_clear()
+    print('Compiled ' + str(len(module_catalogue.records)) + ' modules into ' + compiled_module_catalogue_location)
+
+def get_module_catalogue_fingerprint():
+    '''Get a fingerprint of Module_catalogue.xlsx, which tells us whether a compiled catalogue is up to date.
+    
+    Returns :
+    ---------
+    
+    fingerprint : dictionary
+        the content hash of the catalogue file and the version of the compiled format
+    '''
+    fingerprint = {'content hash': get_file_content_hash(module_catalogue_location),
+                   'format version': catalogue_format_version}
+
+    return fingerprint
+
+def get_current_calendar_year():
+    '''Get the calendar year in which the current academic year started, where we count the academic year as 
+    starting in April, when the module choices for the next year are made.
+    
+    Returns :
+    ---------
+    
+    current_calendar_year : int
+        the calendar year
+    '''
+    today = date.today()
+    if today.month < 4:
+        current_calendar_year = today.year - 1
+    else:
+        current_calendar_year = today.year
+
+    return current_calendar_year
+
+class StudentRecordStore():
+    def __init__(self, data_directory = None, incremental = False):
+        """Constructor for the StudentRecordStore class. Loads all MMS data bases and the year data base
+        once, merges the MMS data bases into one table, and indexes the data base rows by student ID so that 
+        looking up a student does not require scanning the full data bases.
+        
+        Parameters:
+        -----------
+        
+        data_directory : string
+            the folder containing the student data files. If this is None, the folder will be found
+            with get_student_data_directory().
+            
+        incremental : bool
+            if True, the merged data base from the previous run is loaded from the cache folder, and only
+            the entries of students whose data changed in the .csv files since then are rebuilt. The IDs of 
+            these students are stored in changed_student_ids, and the merged data base is saved again for the 
+            next incremental run. Runs that are not incremental do not save the data base.
+        """
+        if data_directory is None:
+            data_directory = get_student_data_directory()
+        self.data_directory = data_directory
+        self.cache_directory = get_cache_directory(data_directory)
+
+        # the IDs of the students whose data changed since the previous run, None if all students were loaded from scratch
+        self.changed_student_ids = None
+
+        previous_state = None
+        if incremental and self.cache_directory is not None:
+            previous_state = read_cache_file(self.get_state_path())
+            if previous_state is not None and previous_state['fingerprint'] != self.get_state_fingerprint():
+                previous_state = None
+
+        if previous_state is None:
+            self.build()
+        else:
+            self.data_base = previous_state['data base']
+            self.data_file_summaries = previous_state['data file summaries']
+            self.conflict_data_base = previous_state['conflicts']
+            self.update_student_row_index()
+            self.changed_student_ids = self.refresh(save_state = False)
+        write_merge_conflict_report(self.conflict_data_base, data_directory)
+        if incremental:
+            self.save_state()
+
+        self.year_data_base = get_year_data_base(data_directory, self.cache_directory)
+        self.programme_years = get_programme_year_dictionary(self.year_data_base)
+
+    def build(self):
+        """Load all MMS data bases and merge them into one table, replacing any data that is already loaded.
+        """
+        data_file_names = get_mms_data_file_names(self.data_directory)
+        data_bases = get_all_mms_data_bases(self.data_directory)
+        self.data_file_summaries = {}
+        for data_file_name, this_data_base in zip(data_file_names, data_bases):
+            data_path = os.path.join(self.data_directory, data_file_name)
+            self.data_file_summaries[data_file_name] = get_data_file_summary(data_path, this_data_base)
+        data_file_modification_times = [self.data_file_summaries[data_file_name]['modification time'] 
+                                        for data_file_name in data_file_names]
+
+        # a student may appear in multiple data bases, so we merge them all into one table
+        self.data_base, self.conflict_data_base = merge_mms_data_bases(data_bases, data_file_names, data_file_modification_times)
+        self.update_student_row_index()
+
+    def refresh(self, save_state = True):
+        """Bring the data base up to date with the .csv files in the student data folder. Finds the files that 
+        were added, removed or changed since the data base was built or last refreshed, and rebuilds only the entries
+        of the students that appear in the changed parts of these files.
+        
+        Parameters:
+        -----------
+        
+        save_state : bool
+            if True, the updated data base is saved in the cache folder for the next incremental run
+            
+        Returns:
+        --------
+        
+        changed_student_ids : set of ints
+            the IDs of all students whose entries were rebuilt
+        """
+        data_file_names = get_mms_data_file_names(self.data_directory)
+        data_file_summaries = {}
+        loaded_data_bases = {}
+        touched_data_file_names = []
+        changed_student_ids = set()
+        for data_file_name in data_file_names:
+            data_path = os.path.join(self.data_directory, data_file_name)
+            file_stats = os.stat(data_path)
+            previous_summary = self.data_file_summaries.get(data_file_name)
+            if (previous_summary is not None and previous_summary['size'] == file_stats.st_size and 
+                previous_summary['modification time'] == file_stats.st_mtime_ns):
+                data_file_summaries[data_file_name] = previous_summary
+                continue
+            this_data_base = load_mms_data_file_with_cache(data_path, self.cache_directory)
+            loaded_data_bases[data_file_name] = this_data_base
+            this_summary = get_data_file_summary(data_path, this_data_base)
+            data_file_summaries[data_file_name] = this_summary
+            if previous_summary is None:
+                changed_student_ids.update(this_summary['student hashes'].index)
+            else:
+                touched_data_file_names.append(data_file_name)
+                changed_student_ids.update(get_students_with_changed_entries(previous_summary['student hashes'],
+                                                                             this_summary['student hashes']))
+        for data_file_name, previous_summary in self.data_file_summaries.items():
+            if data_file_name not in data_file_summaries:
+                changed_student_ids.update(previous_summary['student hashes'].index)
+
+        # a new modification time can change which file wins a conflict for students that are in several files
+        if len(touched_data_file_names) > 0:
+            all_student_ids = pd.concat([this_summary['student hashes'].index.to_series() for this_summary in data_file_summaries.values()])
+            student_ids_in_several_files = all_student_ids[all_student_ids.duplicated()].unique()
+            for data_file_name in touched_data_file_names:
+                student_ids_in_file = data_file_summaries[data_file_name]['student hashes'].index
+                changed_student_ids.update(student_ids_in_file.intersection(student_ids_in_several_files))
+
+        self.data_file_summaries = data_file_summaries
+        changed_student_ids = set(int(student_id) for student_id in changed_student_ids)
+        if len(changed_student_ids) > 0:
+            self.rebuild_students(changed_student_ids, loaded_data_bases)
+        if save_state:
+            self.save_state()
+
+        return changed_student_ids
+
+    def rebuild_students(self, student_ids, loaded_data_bases = None):
+        """Rebuild the data base entries of some students from the .csv files. Only the files that contain
+        these students are loaded.
+        
+        Parameters:
+        -----------
+        
+        student_ids : set of ints
+            the students we want to rebuild
+            
+        loaded_data_bases : dictionary
+            data bases that are already loaded, with the file names as keys
+        """
+        if loaded_data_bases is None:
+            loaded_data_bases = {}
+        student_ids = np.array(sorted(student_ids))
+        data_file_names = []
+        data_bases = []
+        data_file_modification_times = []
+        for data_file_name, this_summary in self.data_file_summaries.items():
+            if not this_summary['student hashes'].index.isin(student_ids).any():
+                continue
+            if data_file_name in loaded_data_bases:
+                this_data_base = loaded_data_bases[data_file_name]
+            else:
+                data_path = os.path.join(self.data_directory, data_file_name)
+                this_data_base = load_mms_data_file_with_cache(data_path, self.cache_directory)
+            data_file_names.append(data_file_name)
+            data_bases.append(this_data_base[this_data_base['Student ID'].isin(student_ids)])
+            data_file_modification_times.append(this_summary['modification time'])
+
+        unchanged_data_base = self.data_base[~self.data_base['Student ID'].isin(student_ids)].copy()
+        unchanged_conflict_data_base = self.conflict_data_base[~self.conflict_data_base['Student ID'].isin(student_ids)].copy()
+        if len(data_bases) > 0:
+            rebuilt_data_base, rebuilt_conflict_data_base = merge_mms_data_bases(data_bases, data_file_names, data_file_modification_times)
+            self.data_base = concatenate_mms_data_bases([unchanged_data_base, rebuilt_data_base])
+            self.conflict_data_base = concatenate_mms_data_bases([unchanged_conflict_data_base, rebuilt_conflict_data_base])
+        else:
+            self.data_base = unchanged_data_base.reset_index(drop=True)
+            self.conflict_data_base = unchanged_conflict_data_base
+        self.update_student_row_index()
+
+    def update_student_row_index(self):
+        """Rebuild the hash index from student ID to the row positions of that student in the data base.
+        """
+        self.student_row_index = self.data_base.groupby('Student ID', sort=False).indices
+
+    def get_state_path(self):
+        """Get the path of the cache file in which the merged data base is saved between runs.
+        
+        Returns:
+        --------
+        
+        state_path : string
+            the path of the cache file
+        """
+        return os.path.join(self.cache_directory, 'student_record_store.pkl')
+
+    def get_state_fingerprint(self):
+        """Get a fingerprint that identifies which data folder and which version of the tool a saved data base belongs to.
+        
+        Returns:
+        --------
+        
+        fingerprint : dictionary
+            the fingerprint
+        """
+        return {'path': os.path.abspath(self.data_directory),
+                'cache version': mms_cache_version}
+
+    def save_state(self):
+        """Save the merged data base in the cache folder, so that the next run can refresh it incrementally.
+        """
+        if self.cache_directory is None:
+            return
+        write_cache_file(self.get_state_path(), {'fingerprint': self.get_state_fingerprint(),
+                                                 'data base': self.data_base,
+                                                 'data file summaries': self.data_file_summaries,
+                                                 'conflicts': self.conflict_data_base})
+
+    def get_student_data_base(self, student_id):
+        """Get all data base entries for one student.
+        
+        Parameters:
+        -----------
+        
+        student_id : int
+            the student ID
+            
+        Returns:
+        --------
+        
+        student_data_base : pandas data frame or None
+            the rows of the data base that belong to this student, or None if the student is not in the data base
+        """
+        if student_id not in self.student_row_index:
+            return None
+        return self.data_base.iloc[self.student_row_index[student_id]]
+
+    def get_student_ids(self):
+        """Get all student IDs in the data base.
+        
+        Returns:
+        --------
+        
+        student_ids : list of ints
+            all student IDs, in the order in which they appear in the merged data base
+        """
+        return list(self.student_row_index.keys())
+
+def concatenate_mms_data_bases(data_bases):
+    """Concatenate data bases that were read with read_mms_data_file(). Category columns of
+    different files have different sets of categories, which pandas would turn into text columns when
+    concatenating, so the categories are unified first.
+    
+    Parameters:
+    -----------
+    
+    data_bases : list of pandas data frames
+        the data bases we want to concatenate. Their category columns will be modified.
+        
+    Returns:
+    --------
+    
+    full_data_base : pandas data frame
+        all data bases in one data frame
+    """
+    for column, column_type in mms_data_schema.items():
+        if column_type == 'category':
+            all_categories = pd.api.types.union_categoricals([this_data_base[column] for this_data_base in data_bases]).categories
+            for this_data_base in data_bases:
+                this_data_base[column] = this_data_base[column].cat.set_categories(all_categories)
+
+    full_data_base = pd.concat(data_bases, ignore_index=True)
+
+    return full_data_base
+
+@functools.lru_cache(maxsize=None)
+def get_student_record_store():
+    """Returns the student record store for the default student data folder. The data bases are only
+    loaded the first time this function is called.
+    
+    Returns:
+    --------
+    
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases
+    """
+    return StudentRecordStore()
+
+def get_student_data_directory():
+    """Find the folder that contains the student data files.
+
+    Returns :
+    ---------
+    
+    data_directory : string
+        path to the student data folder
+    """
     current_file_directory = os.path.dirname(os.path.abspath(__file__))
 
     # Find the data directory; this should be at ../../student_data (if running advising_tool.py)
@@ -434,10 +868,28 @@ def get_all_mms_data_bases():
 
     if os.path.exists(path_if_tool):
         data_directory = path_if_tool
-    elif os.path.exists(os.path.join(os.getcwd(), "student_data")):
+    elif os.path.exists(path_if_cwd):
         data_directory = path_if_cwd
     else:
         data_directory = os.getcwd()
+
+    return data_directory
+
+def get_mms_data_file_names(data_directory):
+    '''Find all MMS data files (.csv files) in the student data folder.
+    
+    Parameters :
+    ------------
+    
+    data_directory : string
+        the folder containing the student data files
+
+    Returns :
+    ---------
+    
+    data_files : list of strings
+        the names of all .csv files in the folder, in alphabetical order
+    '''
     potential_data_files = os.listdir(data_directory)
     data_files = []
     for candidate_filename in potential_data_files:
@@ -446,58 +898,466 @@ def get_all_mms_data_bases():
            data_files.append(candidate_filename)
     if len(data_files) == 0:
         raise FileNotFoundError("missing student data .csv file")
+    data_files.sort()
+
+    return data_files
+
+def get_all_mms_data_bases(data_directory = None):
+    '''looks into the student_data folder and loads all data bases in there that it can find into memory.
+    
+    Parameters :
+    ------------
+    
+    data_directory : string
+        the folder containing the student data files. If this is None, the folder will be found
+        with get_student_data_directory().
+
+    Returns :
+    ---------
+    
+    data_bases: list of pandas data frames
+        each entry of the list is one pandas data frame from a .csv file found in the student_data folder,
+        in the order given by get_mms_data_file_names().
+    '''
+    if data_directory is None:
+        data_directory = get_student_data_directory()
+    data_files = get_mms_data_file_names(data_directory)
     
     # turn them all into data base files
+    cache_directory = get_cache_directory(data_directory)
     data_bases = []
     for data_file_name in data_files:
         data_path = os.path.join(data_directory, data_file_name)
-        this_data_frame = pd.read_csv(data_path)
-        this_data_frame = this_data_frame.map(strip_excel_formatting)
-        data_bases.append(this_data_frame.astype({"Student ID": "int64",
-                                                  "Credits": "float64"}))
+        this_data_frame = load_mms_data_file_with_cache(data_path, cache_directory)
+        data_bases.append(this_data_frame)
 
     return data_bases
 
-def get_year_data_base():
+def get_data_file_summary(data_path, data_base):
+    '''Summarise the content of one MMS data file, so that later runs can tell which students' entries
+    have changed. Each student gets a hash of all their entries in the file.
+    
+    Parameters :
+    ------------
+    
+    data_path : string
+        path to the .csv file
+        
+    data_base : pandas data frame
+        the data base read from this file
+
+    Returns :
+    ---------
+    
+    data_file_summary : dictionary
+        contains the size and modification time of the file, and a pandas series 'student hashes' with 
+        the student IDs as index
+    '''
+    file_stats = os.stat(data_path)
+
+    data_file_summary = {'size': file_stats.st_size,
+                         'modification time': file_stats.st_mtime_ns,
+                         'student hashes': get_student_hashes(data_base)}
+
+    return data_file_summary
+
+def get_student_hashes(data_base):
+    '''Get one hash of all entries of each student in a data base, so that two versions of the data base 
+    can be compared student by student.
+    
+    Parameters :
+    ------------
+    
+    data_base : pandas data frame
+        an MMS data base, e.g. read from one file, or the merged data base of a StudentRecordStore
+
+    Returns :
+    ---------
+    
+    student_hashes : pandas series
+        the hash of the entries of each student, with the student IDs as index
+    '''
+    # include the position of each row within the student's entries, since the order of the entries matters when merging
+    row_in_student = data_base.groupby('Student ID', sort=False).cumcount()
+    row_hashes = pd.util.hash_pandas_object(data_base.assign(**{'Row in student': row_in_student}), index = False)
+    student_hashes = row_hashes.groupby(data_base['Student ID'].to_numpy()).sum()
+
+    return student_hashes
+
+def get_students_with_changed_entries(previous_student_hashes, student_hashes):
+    '''Compare two versions of the same data file, as summarised by get_data_file_summary().
+    
+    Parameters :
+    ------------
+    
+    previous_student_hashes : pandas series
+        the student hashes of the previous version of the file
+        
+    student_hashes : pandas series
+        the student hashes of the current version of the file
+
+    Returns :
+    ---------
+    
+    changed_student_ids : pandas index
+        the IDs of all students that were added, removed, or whose entries changed
+    '''
+    added_or_removed_student_ids = previous_student_hashes.index.symmetric_difference(student_hashes.index)
+    common_student_ids = previous_student_hashes.index.intersection(student_hashes.index)
+    has_changed = previous_student_hashes[common_student_ids].to_numpy() != student_hashes[common_student_ids].to_numpy()
+    changed_student_ids = added_or_removed_student_ids.union(common_student_ids[has_changed])
+
+    return changed_student_ids
+
+def merge_mms_data_bases(data_bases, data_file_names, data_file_modification_times):
+    '''Merge the data bases from several MMS downloads into one table with one row per student, module, 
+    academic year and semester. Downloads can overlap, for example when the MT2* and MT3* downloads both contain
+    a student, or when a student appears in the semester 1 and semester 2 downloads. If several files contain 
+    different entries for the same student, module, year and semester, we keep
+    
+    (1) an entry that has an assessment result over an entry that does not (the result is newer), then
+    (2) the entry from the most recently modified file, then
+    (3) the entry from the file that comes first in alphabetical order.
+    
+    Parameters :
+    ------------
+    
+    data_bases : list of pandas data frames
+        the data bases, as returned by get_all_mms_data_bases()
+        
+    data_file_names : list of strings
+        the names of the files that the data bases were read from
+        
+    data_file_modification_times : list of numbers
+        the modification times of these files
+
+    Returns :
+    ---------
+    
+    merged_data_base : pandas data frame
+        all entries without duplicates, in the order in which they appear in the files
+        
+    conflict_data_base : pandas data frame
+        all entries where the files disagree, with additional columns 'Data file' and 'Kept'
+    '''
+    data_bases = [this_data_base.assign(**{'Data file': data_base_index}) 
+                  for data_base_index, this_data_base in enumerate(data_bases)]
+    full_data_base = concatenate_mms_data_bases(data_bases)
+
+    # rank the files so that the most recently modified file comes first, ties are broken by file name
+    file_order = sorted(range(len(data_file_names)), 
+                        key = lambda file_index: (-data_file_modification_times[file_index], data_file_names[file_index]))
+    file_rank = np.empty(len(data_file_names), dtype = int)
+    file_rank[file_order] = np.arange(len(data_file_names))
+
+    full_data_base['Has no result'] = full_data_base['Assessment result'].isna()
+    full_data_base['File rank'] = file_rank[full_data_base['Data file'].to_numpy()]
+    # a stable sort keeps the order within files, so the choice of entry is deterministic
+    sorted_data_base = full_data_base.sort_values(['Has no result', 'File rank'], kind = 'stable')
+
+    key_columns = ['Student ID', 'Module code', 'Year', 'Semester']
+    content_columns = [column for column in mms_data_schema if column not in key_columns]
+    is_kept = ~sorted_data_base.duplicated(subset = key_columns, keep = 'first')
+
+    # conflicts are entries with the same key but different content
+    has_duplicate_key = sorted_data_base.duplicated(subset = key_columns, keep = False)
+    distinct_entries = sorted_data_base[has_duplicate_key].drop_duplicates(subset = key_columns + content_columns)
+    conflicting_entries = distinct_entries.duplicated(subset = key_columns, keep = False)
+    conflict_data_base = sorted_data_base.loc[distinct_entries.index[conflicting_entries]].copy()
+    conflict_data_base['Kept'] = is_kept.loc[conflict_data_base.index]
+    conflict_data_base['Data file'] = [data_file_names[file_index] for file_index in conflict_data_base['Data file']]
+    conflict_data_base = conflict_data_base.sort_values(key_columns + ['File rank']).drop(columns = ['Has no result', 'File rank'])
+
+    merged_data_base = sorted_data_base[is_kept].sort_index()
+    merged_data_base = merged_data_base.drop(columns = ['Data file', 'Has no result', 'File rank']).reset_index(drop = True)
+
+    return merged_data_base, conflict_data_base
+
+def write_merge_conflict_report(conflict_data_base, data_directory):
+    '''Save the entries where the student data files disagree, and tell the user about them. The report 
+    is saved in the cache folder, since .csv files in the student data folder would be read as data bases.
+
+    Parameters :
+    ------------
+    
+    conflict_data_base : pandas data frame
+        as returned by merge_mms_data_bases()
+        
+    data_directory : string
+        the folder containing the student data files
+    '''
+    cache_directory = get_cache_directory(data_directory)
+    if cache_directory is None:
+        report_path = None
+    else:
+        report_path = os.path.join(cache_directory, 'merge_conflicts.csv')
+
+    if len(conflict_data_base) == 0:
+        if report_path is not None and os.path.exists(report_path):
+            os.remove(report_path)
+        return
+
+    number_of_students = conflict_data_base['Student ID'].nunique()
+    message = ('The student data files disagree on ' + str(number_of_students) + ' students. Entries with an assessment result, ' +
+               'and otherwise entries from the most recent file, have been used.')
+    if report_path is not None:
+        conflict_data_base.to_csv(report_path, index = False)
+        message += ' See ' + report_path + ' for details.'
+    print(message)
+    print(' ')
+
+def read_mms_data_file(data_path):
+    '''Reads one .csv file from MMS and cleans it up. Only the columns listed in mms_data_schema 
+    are read, and they are converted to the types given there. Entries that cannot be converted are 
+    reported and set to missing values. Rows without a valid student ID are dropped.
+    
+    Parameters :
+    ------------
+    
+    data_path : string
+        path to the .csv file
+
+    Returns :
+    ---------
+    
+    data_frame : pandas data frame
+        the cleaned data base
+    '''
+    this_data_frame = pd.read_csv(data_path, usecols = lambda column: column in mms_data_schema)
+
+    missing_columns = [column for column in mms_data_schema if column not in this_data_frame.columns]
+    if len(missing_columns) > 0:
+        raise(ValueError('The student data file ' + data_path + ' is missing the columns ' + ', '.join(missing_columns)))
+
+    _, data_file_name = os.path.split(data_path)
+    for column, column_type in mms_data_schema.items():
+        this_column = this_data_frame[column]
+        # only text columns can contain excel formatting, numbers may have been wrapped in it as well
+        if this_column.dtype == object:
+            this_column = strip_excel_formatting(this_column)
+        if column_type in ['int32', 'float32']:
+            converted_column = pd.to_numeric(this_column, errors = 'coerce')
+            report_coerced_entries(this_column, converted_column, column, data_file_name)
+            if column_type == 'int32':
+                # we cannot keep rows without a valid integer here, e.g. without a student ID
+                valid_rows = converted_column.notna()
+                this_data_frame = this_data_frame[valid_rows]
+                converted_column = converted_column[valid_rows]
+            this_data_frame[column] = converted_column.astype(column_type)
+        else:
+            this_data_frame[column] = this_column.astype(column_type)
+
+    this_data_frame = this_data_frame.reset_index(drop = True)
+
+    return this_data_frame
+
+def report_coerced_entries(original_column, converted_column, column_name, data_file_name):
+    '''Print a warning if entries of a column could not be converted to numbers.
+    
+    Parameters :
+    ------------
+    
+    original_column : pandas series
+        the column before conversion
+        
+    converted_column : pandas series
+        the column after conversion, where entries that could not be converted are missing
+        
+    column_name : string
+        the name of the column
+        
+    data_file_name : string
+        the name of the file that the column was read from
+    '''
+    coerced_entries = original_column.notna() & converted_column.isna()
+    number_of_coerced_entries = coerced_entries.sum()
+    if number_of_coerced_entries > 0:
+        # rows in the .csv file start at 2 because of the header
+        coerced_rows = (original_column.index[coerced_entries] + 2).to_list()
+        rows_string = ', '.join(str(row) for row in coerced_rows[:10])
+        if number_of_coerced_entries > 10:
+            rows_string += ', ...'
+        print('Could not read ' + str(number_of_coerced_entries) + ' entries in column ' + column_name + ' of ' + 
+              data_file_name + ' (rows ' + rows_string + '), these entries will be ignored.')
+
+def load_mms_data_file_with_cache(data_path, cache_directory):
+    '''Loads one .csv file from MMS. The cleaned data frame is cached in the cache directory, and
+    the cached version is used as long as the .csv file has not changed. The cache entry is identified by 
+    the path, size, modification time and content hash of the .csv file. If the size and modification time 
+    differ but the content is unchanged (for example if the same file was downloaded twice), the cached
+    data frame is still used. Cache files that cannot be read are replaced.
+    
+    Parameters :
+    ------------
+    
+    data_path : string
+        path to the .csv file
+        
+    cache_directory : string
+        the folder where the cached data frames are stored. If this is None, no cache is used.
+
+    Returns :
+    ---------
+    
+    data_frame : pandas data frame
+        the cleaned data base
+    '''
+    if cache_directory is None:
+        return read_mms_data_file(data_path)
+
+    file_stats = os.stat(data_path)
+    fingerprint = {'path': os.path.abspath(data_path),
+                   'size': file_stats.st_size,
+                   'modification time': file_stats.st_mtime_ns,
+                   'content hash': None,
+                   'cache version': mms_cache_version}
+
+    _, data_file_name = os.path.split(data_path)
+    cache_path = os.path.join(cache_directory, data_file_name + '.pkl')
+
+    cache_entry = read_cache_file(cache_path)
+    if cache_entry is not None:
+        cached_fingerprint = cache_entry['fingerprint']
+        if cached_fingerprint['path'] == fingerprint['path'] and cached_fingerprint['cache version'] == mms_cache_version:
+            if cached_fingerprint['size'] == fingerprint['size']:
+                if cached_fingerprint['modification time'] == fingerprint['modification time']:
+                    return cache_entry['data frame']
+                fingerprint['content hash'] = get_file_content_hash(data_path)
+                if cached_fingerprint['content hash'] == fingerprint['content hash']:
+                    # the file was touched but not changed, so we only need to update the fingerprint
+                    write_cache_file(cache_path, {'fingerprint': fingerprint, 'data frame': cache_entry['data frame']})
+                    return cache_entry['data frame']
+
+    data_frame = read_mms_data_file(data_path)
+    if fingerprint['content hash'] is None:
+        fingerprint['content hash'] = get_file_content_hash(data_path)
+    write_cache_file(cache_path, {'fingerprint': fingerprint, 'data frame': data_frame})
+
+    return data_frame
+
+def get_cache_directory(data_directory):
+    '''Returns the folder in which cached versions of the student data are stored, and creates it if it
+    does not exist yet. 
+    
+    Parameters :
+    ------------
+    
+    data_directory : string
+        the folder containing the student data files
+
+    Returns :
+    ---------
+    
+    cache_directory : string
+        path to the cache folder, or None if the cache folder cannot be created
+    '''
+    cache_directory = os.path.join(data_directory, '.advising_cache')
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+    except OSError:
+        return None
+
+    return cache_directory
+
+def get_file_content_hash(file_path):
+    '''Returns a hash of the content of a file.
+    
+    Parameters :
+    ------------
+    
+    file_path : string
+        the file we want to hash
+
+    Returns :
+    ---------
+    
+    content_hash : string
+        hexadecimal sha1 hash of the file content
+    '''
+    content_hash = hashlib.sha1()
+    with open(file_path, 'rb') as this_file:
+        for block in iter(lambda: this_file.read(1024*1024), b''):
+            content_hash.update(block)
+
+    return content_hash.hexdigest()
+
+def read_cache_file(cache_path):
+    '''Reads a cache file. Returns None if the file does not exist or is corrupt.
+
+    Parameters :
+    ------------
+    
+    cache_path : string
+        path to the cache file
+
+    Returns :
+    ---------
+    
+    cache_entry : dictionary or None
+        the cached data
+    '''
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            cache_entry = pickle.load(cache_file)
+        if not isinstance(cache_entry, dict) or 'fingerprint' not in cache_entry:
+            raise(ValueError('unexpected content of cache file'))
+    except Exception:
+        print('Could not read cache file ' + cache_path + ', it will be rebuilt.')
+        return None
+
+    return cache_entry
+
+def write_cache_file(cache_path, cache_entry):
+    '''Writes a cache file. The file is written to a temporary location first so that an interrupted
+    run does not leave a corrupt cache file. Failing to write the cache is not an error.
+
+    Parameters :
+    ------------
+    
+    cache_path : string
+        path to the cache file
+        
+    cache_entry : dictionary
+        the data to be cached
+    '''
+    temporary_path = cache_path + '.tmp'
+    try:
+        with open(temporary_path, 'wb') as cache_file:
+            pickle.dump(cache_entry, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        print('Could not write cache file ' + cache_path)
+
+def get_year_data_base(data_directory = None, cache_directory = None):
     '''Loads a data base of programme years for each student. Relies on data downloaded from the advising system.
     If the database is not present, it returns 'None'.
     
+    Parameters :
+    ------------
+    
+    data_directory : string
+        the folder containing the student data files. If this is None, the folder will be found
+        with get_student_data_directory().
+        
+    cache_directory : string
+        the folder in which we remember which .xlsx files contain year data. If this is None, 
+        all .xlsx files are checked.
+
     Returns : 
     ---------
     
     year_data_base : pandas dataframe
         The year data base as pandas data frame or 'None' if not present. The pandas data frame will have columns 'Student ID' and 'Programme year'.
     '''
-    current_file_directory = os.path.dirname(os.path.abspath(__file__))
-
-    # Find the data directory; this should be at ../../student_data (if running advising_tool.py)
-    # or at the CWD[/student_data] if using as a library
-    path_if_tool = os.path.join(current_file_directory, '../..', 'student_data')
-    path_if_cwd = os.path.join(os.getcwd(), "student_data")
+    if data_directory is None:
+        data_directory = get_student_data_directory()
 
-    if os.path.exists(path_if_tool):
-        data_directory = path_if_tool
-    elif os.path.exists(path_if_cwd):
-        data_directory = path_if_cwd
-    else:
-        data_directory = os.getcwd()
+    year_data_file_path = find_year_data_file(data_directory, cache_directory)
 
-    potential_data_files = os.listdir(data_directory)
-    data_base_found = False
-    for candidate_filename in potential_data_files:
-       this_filename, file_extension = os.path.splitext(candidate_filename)
-       if file_extension == '.xlsx':
-           file_path = os.path.join(data_directory, candidate_filename)
-           try:
-               this_data_frame = pd.read_excel(file_path, engine = 'openpyxl')
-           except:
-               continue
-           if 'Year of programme' in this_data_frame.columns:
-                full_data_base = this_data_frame
-                data_base_found = True
-                break
-
-    if data_base_found:
+    if year_data_file_path is not None:
+        full_data_base = pd.read_excel(year_data_file_path, engine = 'openpyxl')
         year_data_base = full_data_base[['Student ID', 'Year of programme']].copy()
         # data_base_of_years = data_base_of_years.rename(columns={'Year of programme': 'Programme year'})
         year_data_base["Student ID"] = year_data_base["Student ID"].str.split("/").str[0].astype(int)
@@ -507,16 +1367,157 @@ def get_year_data_base():
     else:
         return None
 
-# Some data files come with data in the form `="..."`; strip this if it exists
-def strip_excel_formatting(cell_data):
-    if isinstance(cell_data, str):
-        if cell_data == '=""':
-            return None
-        elif cell_data[:3] == '"="' and cell_data[-2] == '""':
-            return cell_data[3:-2]
-        elif cell_data[:2] == '="' and cell_data[-1] == '"':
-            return cell_data[2:-1]
-    return cell_data
+def find_year_data_file(data_directory, cache_directory = None):
+    '''Find the .xlsx file in the student data folder that contains the year-of-study data from the advising 
+    system. We only read the column names of each file. Which files contain year data is remembered in the
+    cache folder, so that files that have not changed do not need to be opened again.
+
+    Parameters :
+    ------------
+    
+    data_directory : string
+        the folder containing the student data files
+        
+    cache_directory : string
+        the folder in which we remember which .xlsx files contain year data. If this is None, 
+        all .xlsx files are checked.
+
+    Returns : 
+    ---------
+    
+    year_data_file_path : string
+        path to the first .xlsx file, in alphabetical order, that contains a 'Year of programme' column, 
+        or None if there is no such file
+    '''
+    potential_data_files = sorted(os.listdir(data_directory))
+    if cache_directory is not None:
+        cache_path = os.path.join(cache_directory, 'year_data_files.pkl')
+        cache_entry = read_cache_file(cache_path)
+    else:
+        cache_entry = None
+    if cache_entry is not None and cache_entry['fingerprint'] == {'cache version': mms_cache_version}:
+        previous_file_stamps = cache_entry['file stamps']
+    else:
+        previous_file_stamps = {}
+
+    file_stamps = {}
+    year_data_file_path = None
+    for candidate_filename in potential_data_files:
+        this_filename, file_extension = os.path.splitext(candidate_filename)
+        if file_extension != '.xlsx':
+            continue
+        file_path = os.path.join(data_directory, candidate_filename)
+        file_stats = os.stat(file_path)
+        this_file_stamp = {'size': file_stats.st_size,
+                           'modification time': file_stats.st_mtime_ns}
+        previous_file_stamp = previous_file_stamps.get(candidate_filename)
+        if (previous_file_stamp is not None and previous_file_stamp['size'] == this_file_stamp['size'] and 
+            previous_file_stamp['modification time'] == this_file_stamp['modification time']):
+            this_file_stamp['contains year data'] = previous_file_stamp['contains year data']
+        else:
+            this_file_stamp['contains year data'] = 'Year of programme' in get_excel_column_names(file_path)
+        file_stamps[candidate_filename] = this_file_stamp
+        if this_file_stamp['contains year data']:
+            year_data_file_path = file_path
+            break
+
+    if cache_directory is not None and file_stamps != previous_file_stamps:
+        # keep what we know about files that we did not need to look at this time
+        for candidate_filename, previous_file_stamp in previous_file_stamps.items():
+            if candidate_filename not in file_stamps and candidate_filename in potential_data_files:
+                file_stamps[candidate_filename] = previous_file_stamp
+        write_cache_file(cache_path, {'fingerprint': {'cache version': mms_cache_version}, 'file stamps': file_stamps})
+
+    return year_data_file_path
+
+def get_excel_column_names(file_path):
+    '''Read the column names, i.e. the first row of the first sheet, of an excel file, without
+    loading the rest of the file.
+
+    Parameters :
+    ------------
+    
+    file_path : string
+        path to the excel file
+
+    Returns : 
+    ---------
+    
+    column_names : list
+        the entries of the first row, or an empty list if the file cannot be read
+    '''
+    import openpyxl
+
+    try:
+        workbook = openpyxl.load_workbook(file_path, read_only = True)
+    except Exception:
+        return []
+    try:
+        first_row = next(workbook.worksheets[0].iter_rows(min_row = 1, max_row = 1, values_only = True), ())
+        column_names = list(first_row)
+    except Exception:
+        column_names = []
+    finally:
+        workbook.close()
+
+    return column_names
+
+def get_programme_year_dictionary(year_data_base):
+    '''Turn the year data base into a dictionary, so that the year of study of a student can be
+    looked up without scanning the table.
+
+    Parameters :
+    ------------
+    
+    year_data_base : pandas data frame or None
+        as returned by get_year_data_base()
+
+    Returns : 
+    ---------
+    
+    programme_years : dictionary
+        the programme year of each student, with the student IDs as keys. Students without a 
+        programme year are left out.
+    '''
+    if year_data_base is None:
+        return {}
+    # if a student appears more than once, the first entry is used
+    first_entries = year_data_base.drop_duplicates(subset = 'Student ID', keep = 'first')
+    first_entries = first_entries[first_entries['Programme year'].notna()]
+    programme_years = dict(zip(first_entries['Student ID'].astype(int), first_entries['Programme year'].astype(int)))
+
+    return programme_years
+
+def strip_excel_formatting(column):
+    """Some data files come with data in the form `="..."`; strip this if it exists.
+    Entries of the form `=""` are turned into missing values. The entries are only stripped once for 
+    each distinct value in the column, which is much faster than going through all entries since most
+    values (module codes, years, etc.) are repeated many times.
+    
+    Parameters:
+    -----------
+    
+    column : pandas series
+        a column of strings
+        
+    Returns:
+    --------
+    
+    stripped_column : pandas series
+        the column without the excel formatting
+    """
+    value_codes, unique_values = pd.factorize(column)
+    unique_values = pd.Index(unique_values, dtype = object)
+    is_formatted = unique_values.str.startswith('="') & unique_values.str.endswith('"')
+    if not is_formatted.any():
+        return column
+
+    stripped_values = np.where(is_formatted, unique_values.str.slice(2, -1), unique_values).astype(object)
+    stripped_values[is_formatted & (stripped_values == '')] = None
+    # missing entries have the code -1
+    stripped_column = np.where(value_codes >= 0, stripped_values[value_codes], None)
+
+    return pd.Series(stripped_column, index = column.index, dtype = object)
 
 
 def reduce_official_data_base(data_frame, current_honours_year, current_calendar_year, include_credits = True):
@@ -619,6 +1620,8 @@ def colour_code_print_statement(print_statement, is_advice = False):
     is_advice : bool
         if False, strings that are not 'None' will be printed in light magenta instead of red
     """
+    import termcolor
+
     if print_statement != 'None':
         if is_advice:
             print(termcolor.colored(print_statement,'blue'))
@@ -762,6 +1765,8 @@ def save_summary_data_frame(data_frame, filename):
     filename : string
         where we want to save
     """
+    import docx
+    import openpyxl
 
     if not filename.endswith('.xlsx'):
         if filename.endswith('.docx'):
@@ -887,7 +1892,7 @@ def save_summary_data_frame(data_frame, filename):
     reloaded_workbook.save(filename)
     
   
-def process_folder(folder_name, programme_name = None):
+def process_folder(folder_name, programme_name = None, student_record_store = None):
     """Finds all student formfiles (all excel files) in a folder and performs advising checks on them
     
     Parameters:
@@ -907,6 +1912,9 @@ def process_folder(folder_name, programme_name = None):
     programme_name : string
         If this is not None than the programme requirements for this programme will be checked.
         Note that every student in the folder will be checked against these requirements.
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
     """
     
     folder_entries = os.listdir(folder_name)
@@ -923,7 +1931,8 @@ def process_folder(folder_name, programme_name = None):
     else:
         list_of_data_frames = []
         for filename in form_files:
-            this_data_frame = process_form_file_or_student_id(os.path.join(folder_name, filename), programme_name)
+            this_data_frame = process_form_file_or_student_id(os.path.join(folder_name, filename), programme_name,
+                                                              student_record_store = student_record_store)
             list_of_data_frames.append(this_data_frame)
             separation_string = '-'*60
             print(' ')
@@ -935,11 +1944,21 @@ def process_folder(folder_name, programme_name = None):
 
         return summary_data_frame
     
-def check_final_year_students():
+def check_final_year_students(student_record_store = None, incremental = False):
     '''
     Go through the data base, identify final year students, and check their
     module choices against the programme requirements
 
+    Parameters:
+    -----------
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    incremental : bool
+        if True, the saved results of the previous run of this function are reused for all students whose 
+        entries in the data base are the same as in that run.
+
     Returns:
     --------
     
@@ -947,48 +1966,86 @@ def check_final_year_students():
         Data frame with one column per student. Contains the same columns as the data frame returned
         by process_form_file()
     '''
-    # turn them all into data base files
-    data_bases = get_all_mms_data_bases()
-    processed_students = []
-    list_of_summary_data_frames = []
-    for this_data_base in data_bases:
-        these_student_ids = this_data_base['Student ID'].unique()
-        for student_id in these_student_ids:
-            if student_id not in processed_students:
-                processed_students.append(student_id)
-                student_or_warning = collect_student_data(student_id)
-                if isinstance(student_or_warning, str):
-                    colour_code_print_statement(student_or_warning)
-                else:
-                    student= student_or_warning
-                    if student.current_honours_year >= student.expected_honours_years:
-                        try:
-                            this_summary_data_frame = process_form_file_or_student_id(student_id)
-                        except Exception as e:
-                                missed_programme_requirements = 'Error occurred during processing, error message: ' + str(e)
-                                missed_prerequisites = ''
-                                not_running_modules = ''
-                                timetable_clashes = ''
-                                adviser_recommendations = ''
-                                summary_data = [student.student_id, 
-                                                student.full_name,
-                                                student.programme_name,
-                                                student.current_honours_year,
-                                                missed_programme_requirements, 
-                                                missed_prerequisites, 
-                                                not_running_modules, 
-                                                timetable_clashes, 
-                                                adviser_recommendations]
-
-                                this_summary_data_frame = summary_data_frame = generate_summary_data_frame_from_entries(summary_data)
-                                print('Error occurred during processing of student with ID ' + str(student_id) + ', error message: ' + str(e))
-
-                        list_of_summary_data_frames.append(this_summary_data_frame)
-                        separation_string = '-'*60
-                        print(' ')
-                        print(separation_string)
-                        print(' ')
+    if student_record_store is None:
+        student_record_store = get_student_record_store()
+
+    check_results_fingerprint = get_check_results_fingerprint(student_record_store)
+    # the hash of the data base entries of each student, which is saved with the check results of the student, so that 
+    # a result is only reused for the same data, no matter which runs have happened in between
+    student_hashes = get_student_hashes(student_record_store.data_base).to_dict()
+    previous_check_results = {}
+    if incremental and student_record_store.cache_directory is not None:
+        cache_entry = read_cache_file(os.path.join(student_record_store.cache_directory, 'final_year_check_results.pkl'))
+        if cache_entry is not None and cache_entry['fingerprint'] == check_results_fingerprint:
+            previous_check_results = {student_id: this_summary_data_frame 
+                                      for student_id, (student_hash, this_summary_data_frame) in cache_entry['check results'].items()
+                                      if student_hashes.get(student_id) == student_hash}
+    number_of_reused_results = len(previous_check_results)
+    if number_of_reused_results > 0:
+        print('Reusing the results of the previous run for ' + str(number_of_reused_results) + ' students whose data has not changed.')
+        print(' ')
+
+    # the summary data frame for each student, or None if the student is not in their final year
+    check_results = {}
+    final_year_students = []
+    for student_id in student_record_store.get_student_ids():
+        if student_id in previous_check_results:
+            check_results[student_id] = previous_check_results[student_id]
+            continue
+        check_results[student_id] = None
+        student_or_warning = collect_student_data(student_id, student_record_store = student_record_store)
+        if isinstance(student_or_warning, str):
+            colour_code_print_statement(student_or_warning)
+        else:
+            student= student_or_warning
+            if student.current_honours_year >= student.expected_honours_years:
+                final_year_students.append(student)
+
+    # check the programme requirements, prerequisites and module offerings of all final year students together
+    cohort_missing_programme_requirements = find_missing_programme_requirements_for_cohort(final_year_students)
+    cohort_missing_prerequisites = find_missing_prerequisites_for_cohort(final_year_students)
+    cohort_not_running_modules = find_not_running_modules_for_cohort(final_year_students)
+
+    for student in final_year_students:
+        student_id = student.student_id
+        try:
+            this_summary_data_frame = process_form_file_or_student_id(student_id, student_record_store = student_record_store,
+                                                                      missing_programme_requirements = cohort_missing_programme_requirements.get(student_id),
+                                                                      missing_prerequisites = cohort_missing_prerequisites.get(student_id),
+                                                                      not_running_modules = cohort_not_running_modules.get(student_id))
+        except Exception as e:
+                missed_programme_requirements = 'Error occurred during processing, error message: ' + str(e)
+                missed_prerequisites = ''
+                not_running_modules = ''
+                timetable_clashes = ''
+                adviser_recommendations = ''
+                summary_data = [student.student_id, 
+                                student.full_name,
+                                student.programme_name,
+                                student.current_honours_year,
+                                missed_programme_requirements, 
+                                missed_prerequisites, 
+                                not_running_modules, 
+                                timetable_clashes, 
+                                adviser_recommendations]
+
+                this_summary_data_frame = summary_data_frame = generate_summary_data_frame_from_entries(summary_data)
+                print('Error occurred during processing of student with ID ' + str(student_id) + ', error message: ' + str(e))
+
+        check_results[student_id] = this_summary_data_frame
+        separation_string = '-'*60
+        print(' ')
+        print(separation_string)
+        print(' ')
 
+    if student_record_store.cache_directory is not None:
+        write_cache_file(os.path.join(student_record_store.cache_directory, 'final_year_check_results.pkl'),
+                         {'fingerprint': check_results_fingerprint, 
+                          'check results': {student_id: (student_hashes[student_id], this_summary_data_frame) 
+                                            for student_id, this_summary_data_frame in check_results.items()}})
+
+    list_of_summary_data_frames = [this_summary_data_frame for this_summary_data_frame in check_results.values() 
+                                   if this_summary_data_frame is not None]
     summary_data_frame = pd.concat(list_of_summary_data_frames, ignore_index=True)
 
     summary_data_frame_sorted = summary_data_frame.sort_values(by='Student ID')
@@ -997,6 +2054,46 @@ def check_final_year_students():
 
     return summary_data_frame
 
+def get_check_results_fingerprint(student_record_store):
+    '''Get a fingerprint of everything other than the MMS data that the check results of a student depend on: 
+    the version of the checks, the current academic year, the year-of-study files, the module catalogue and the module offering 
+    overrides. Saved check results can only be reused if this fingerprint has not changed.
+
+    Parameters:
+    -----------
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases
+
+    Returns:
+    --------
+    
+    fingerprint : dictionary
+        the fingerprint
+    '''
+    year_data_file_stamps = []
+    for candidate_filename in sorted(os.listdir(student_record_store.data_directory)):
+        this_filename, file_extension = os.path.splitext(candidate_filename)
+        if file_extension == '.xlsx':
+            file_stats = os.stat(os.path.join(student_record_store.data_directory, candidate_filename))
+            year_data_file_stamps.append((candidate_filename, file_stats.st_size, file_stats.st_mtime_ns))
+    module_catalogue_stats = os.stat(module_catalogue_location)
+    module_offering_overrides_stats = os.stat(module_offering_overrides_location)
+
+    fingerprint = {'path': os.path.abspath(student_record_store.data_directory),
+                   'cache version': mms_cache_version,
+                   'check results version': check_results_version,
+                   'calendar year': get_current_calendar_year(),
+                   'year data files': year_data_file_stamps,
+                   'module catalogue': (module_catalogue_stats.st_size, module_catalogue_stats.st_mtime_ns),
+                   'module offering overrides': (module_offering_overrides_stats.st_size, module_offering_overrides_stats.st_mtime_ns)}
+
+    return fingerprint
+
 from .programme_requirements import *
 from .prerequisites import *
-from .timetabling import *
\ No newline at end of file
+from .timetabling import *
+from .prerequisite_graph import *
+from .module_suggestions import *
+from .forecasting import *
+from .programme_comparison import *
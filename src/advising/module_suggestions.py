@@ -0,0 +1,750 @@
+from .infrastructure import *
+from .clash_table import *
+from .offerings import *
+
+# the credits of a module that none of the students in the student data have taken
+default_module_credits = 15
+# the most credits a student can take in one semester, not counting full year modules
+maximum_semester_credits = 60
+# the credits a student needs to take in each honours year
+required_yearly_credits = 120
+
+class ModuleChoiceSearch():
+    def __init__(self, student, candidate_modules = None, module_credits = None):
+        """Constructor for the ModuleChoiceSearch class. Splits the module choices of a student into modules that can
+        stay where they are, and modules that need to be moved or replaced because they are not running, clash with another
+        module, or because their prerequisites are not met. The search then fills the free places with modules from
+        a pool of candidates.
+
+        Parameters:
+        -----------
+
+        student : instance of Student class
+            the student we are investigating
+
+        candidate_modules : list of strings
+            the modules that may be added to the module choices. The modules that need to be moved, and modules named in
+            programme requirements that the student would miss without them, are always candidates. If this is None, all 
+            MT modules at 3000 level or above in the module catalogue are candidates.
+
+        module_credits : dictionary
+            the credits of each module, as returned by get_module_credits(). Modules that are not in the dictionary
+            are counted with 15 credits.
+        """
+        self.student = student
+        self.module_catalogue = get_module_catalogue()
+        if module_credits is None:
+            module_credits = dict()
+        self.module_credits = module_credits
+
+        honours_module_choices = student.honours_module_choices.reset_index(drop = True)
+        self.honours_years = sorted(honours_module_choices['Honours year'].unique(), key = lambda honours_year: int(honours_year.split()[-1]))
+        self.academic_years = dict(zip(honours_module_choices['Honours year'], honours_module_choices['Academic year']))
+
+        # the kinds of programme requirements that the current module choices miss, which suggestions may miss as well
+        missed_requirements, _ = find_missing_programme_requirements(student)
+        self.missed_requirement_kinds = set(get_requirement_kind(missed_requirement) for missed_requirement
+                                            in missed_requirements.split('\n') if missed_requirement != 'None')
+
+        # find out which module choices need to change, and why
+        choice_problems = self.find_choice_problems(honours_module_choices)
+        choice_needs_to_change = np.array([len(problems) > 0 for problems in choice_problems], dtype = bool)
+        self.fixed_module_choices = honours_module_choices[~choice_needs_to_change].reset_index(drop = True)
+        self.changed_module_choices = honours_module_choices[choice_needs_to_change].reset_index(drop = True)
+        self.changed_module_choices['Reason'] = [', '.join(problems) for problems in choice_problems if len(problems) > 0]
+        # suggestions have the same columns as the module choices of the student
+        self.module_choice_columns = [column for column in ['Honours year', 'Academic year', 'Semester', 'Module code', 'Credits']
+                                      if column in honours_module_choices.columns]
+
+        # the places that modules can be added to, in the order in which the search fills them. Semesters in which
+        # the student already has results cannot be changed.
+        self.slots = [(honours_year, semester) for honours_year in self.honours_years for semester in ['S1', 'S2']]
+        self.open_slots = set(slot for slot in self.slots if slot not in student.passed_module_timeline)
+
+        self.passed_mask = self.module_catalogue.get_module_bitmask(student.passed_modules)
+        self.fixed_slot_modules = dict()
+        for honours_year, semester in self.slots + [(honours_year, 'Full Year') for honours_year in self.honours_years]:
+            these_module_choices = self.fixed_module_choices[(self.fixed_module_choices['Honours year'] == honours_year) &
+                                                             (self.fixed_module_choices['Semester'] == semester)]
+            self.fixed_slot_modules[(honours_year, semester)] = these_module_choices['Module code'].to_list()
+        fixed_modules = set(self.fixed_module_choices['Module code'])
+        # the bitmasks of all passed and fixed modules, and of their antirequisites
+        self.fixed_mask = self.passed_mask | self.module_catalogue.get_module_bitmask(fixed_modules)
+        self.fixed_antirequisite_mask = 0
+        for module_code in list(fixed_modules) + student.passed_modules:
+            record = self.module_catalogue.get_record(module_code)
+            if record is not None:
+                self.fixed_antirequisite_mask |= record.antirequisite_mask
+
+        # the credits of each honours year and semester that are taken up already
+        self.fixed_year_credits = dict()
+        self.fixed_semester_credits = dict()
+        for honours_year in self.honours_years:
+            for semester in ['S1', 'S2', 'Full Year']:
+                semester_credits = sum(self.get_module_choice_credits(module_table, honours_year, semester)
+                                       for module_table in [self.fixed_module_choices, student.passed_module_table])
+                self.fixed_semester_credits[(honours_year, semester)] = semester_credits
+                self.fixed_year_credits[honours_year] = self.fixed_year_credits.get(honours_year, 0) + semester_credits
+
+        # the candidates, starting with modules named in the programme requirements that the remaining module choices
+        # miss, and then the modules that need to be moved, so that suggestions that change little are found first.
+        # The other candidates are tried in each honours year starting with the modules at the level of that year.
+        if candidate_modules is None:
+            candidate_modules = sorted(module_code for module_code in self.module_catalogue.records
+                                       if re.match(r'MT[345]', module_code) is not None)
+        fixed_student = student.get_copy_with_honours_module_choices(self.fixed_module_choices[self.module_choice_columns])
+        try:
+            fixed_missed_requirements, _ = find_missing_programme_requirements(fixed_student)
+        except Exception:
+            fixed_missed_requirements = ''
+        required_modules = re.findall(r'[A-Z]{2}\d{4}', fixed_missed_requirements)
+        changed_modules = self.changed_module_choices['Module code'].to_list()
+        candidate_modules = list(dict.fromkeys(required_modules + changed_modules + list(candidate_modules)))
+        self.candidate_priorities = dict.fromkeys(changed_modules, 1)
+        self.candidate_priorities.update(dict.fromkeys(required_modules, 0))
+        # passed modules are only candidates if the student plans to retake them
+        self.candidate_modules = []
+        for module_code in candidate_modules:
+            record = self.module_catalogue.get_record(module_code)
+            if (record is None or len(record.problems) > 0 or 'Full Year' in record.semesters or module_code in fixed_modules or
+                (module_code in student.passed_modules and module_code not in changed_modules)):
+                continue
+            self.candidate_modules.append(module_code)
+
+        # the candidates that run in each open place, as positions in self.candidate_modules
+        self.slot_candidates = self.find_running_candidates()
+
+        # bitmasks for the clash check: the position of each module in the clash table of each semester,
+        # and the positions of all modules it clashes with
+        self.clash_positions = dict()
+        self.clash_masks = dict()
+        for semester in ['S1', 'S2']:
+            clash_table = get_clash_table(semester)
+            slot_modules = self.candidate_modules + [module_code for (_, this_semester), module_codes in self.fixed_slot_modules.items()
+                                                     if this_semester == semester for module_code in module_codes]
+            for module_code in slot_modules:
+                if module_code in clash_table.module_positions:
+                    position = clash_table.module_positions[module_code]
+                    self.clash_positions[(module_code, semester)] = 1 << position
+                    self.clash_masks[(module_code, semester)] = sum(1 << int(other_position) for other_position
+                                                                    in np.nonzero(clash_table.clash_matrix[position])[0])
+                else:
+                    self.clash_positions[(module_code, semester)] = 0
+                    self.clash_masks[(module_code, semester)] = 0
+
+    def find_choice_problems(self, honours_module_choices):
+        """Find out which module choices of the student need to change.
+
+        Parameters:
+        -----------
+
+        honours_module_choices : pandas data frame
+            the module choices of the student, with a fresh index
+
+        Returns:
+        --------
+
+        choice_problems : list of lists of strings
+            for each module choice, the reasons why it needs to change. The list is empty if it can stay.
+        """
+        choice_checks = get_offering_index().check_module_choices(honours_module_choices)
+        choice_problems = []
+        for row_number, row in choice_checks.iterrows():
+            module_code = row['Module code']
+            problems = []
+            record = self.module_catalogue.get_record(module_code)
+            if record is None:
+                if module_code.startswith('MT'):
+                    problems.append('does not exist')
+                choice_problems.append(problems)
+                continue
+            if not row['Runs in semester'] or not row['Runs in academic year']:
+                problems.append('not running in ' + row['Academic year'] + ' ' + row['Semester'])
+            if isinstance(record.prerequisite_expression, PrerequisiteExpression):
+                previously_taken_modules, simultaneously_taken_modules = self.student.get_modules_taken_before_and_with_module(module_code)
+                if not record.prerequisite_expression.is_met(self.module_catalogue.get_module_bitmask(previously_taken_modules),
+                                                             self.module_catalogue.get_module_bitmask(simultaneously_taken_modules)):
+                    problems.append('prerequisites not met')
+            if row['Semester'] in ['S1', 'S2']:
+                clash_table = get_clash_table(row['Semester'])
+                clashing_modules = [other_module_code for other_module_code
+                                    in self.student.get_modules_in_semester(honours_module_choices.loc[row_number, 'Honours year'], row['Semester'])
+                                    if clash_table.get_overlapping_timeslots(module_code, other_module_code) != 0]
+                if len(clashing_modules) > 0:
+                    problems.append('clashes with ' + ' and '.join(clashing_modules))
+            choice_problems.append(problems)
+
+        return choice_problems
+
+    def find_running_candidates(self):
+        """Look up in one step in which of the open places each candidate module runs.
+
+        Returns:
+        --------
+
+        slot_candidates : dictionary
+            for each open (honours year, semester) tuple, the positions in self.candidate_modules of the modules running then,
+            in the order in which the search tries them
+        """
+        slot_candidates = {slot: [] for slot in self.open_slots}
+        open_slots = [slot for slot in self.slots if slot in self.open_slots]
+        if len(open_slots) == 0 or len(self.candidate_modules) == 0:
+            return slot_candidates
+
+        module_choices = pd.DataFrame([[module_code, self.academic_years[honours_year], semester]
+                                       for honours_year, semester in open_slots for module_code in self.candidate_modules],
+                                      columns = ['Module code', 'Academic year', 'Semester'])
+        choice_checks = get_offering_index().check_module_choices(module_choices)
+        candidate_runs = (choice_checks['Runs in semester'] & choice_checks['Runs in academic year']).to_numpy()
+        candidate_runs = candidate_runs.reshape(len(open_slots), len(self.candidate_modules))
+        for slot_number, (honours_year, semester) in enumerate(open_slots):
+            honours_year_level = str(int(honours_year.split()[-1]) + 2)
+            candidate_priorities = [self.candidate_priorities.get(module_code, 2 if module_code[2] == honours_year_level else 3)
+                                    for module_code in self.candidate_modules]
+            slot_candidates[(honours_year, semester)] = sorted(np.nonzero(candidate_runs[slot_number])[0].tolist(),
+                                                               key = lambda position: (candidate_priorities[position], position))
+
+        return slot_candidates
+
+    def get_credits(self, module_code):
+        """Get the credits of a module.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code
+
+        Returns:
+        --------
+
+        credits : int
+            the credits of the module
+        """
+        return self.module_credits.get(module_code, default_module_credits)
+
+    def get_module_choice_credits(self, module_table, honours_year, semester):
+        """Add up the credits of the modules in one honours year and semester of a module table.
+
+        Parameters:
+        -----------
+
+        module_table : pandas data frame
+            a table like honours_module_choices
+
+        honours_year : string
+            the honours year, e.g. 'Year 2'
+
+        semester : string
+            the semester, e.g. 'S1' or 'Full Year'
+
+        Returns:
+        --------
+
+        credits : int
+            the total credits. Modules without credits in the table are looked up with get_credits().
+        """
+        these_rows = module_table[(module_table['Honours year'] == honours_year) & (module_table['Semester'] == semester)]
+        total_credits = 0
+        for row_number, module_code in zip(these_rows.index, these_rows['Module code']):
+            if 'Credits' in these_rows.columns and pd.notna(these_rows.loc[row_number, 'Credits']):
+                total_credits += int(these_rows.loc[row_number, 'Credits'])
+            else:
+                total_credits += self.get_credits(module_code)
+
+        return total_credits
+
+    def find_suggestions(self, maximum_number_of_suggestions = 3, maximum_number_of_requirement_checks = 100,
+                         maximum_number_of_steps = 200000):
+        """Search for module choices that are running, free of timetable clashes, meet all prerequisites and
+        do not miss any programme requirements that the current module choices of the student meet.
+
+        The search fills one semester after the other, and only adds a module to a semester if it runs then, does
+        not clash with the other modules of that semester, and the credits of the semester and the year allow it.
+        Prerequisites are checked when a semester is complete, and the programme requirements only for complete
+        module choices. Places from which no suggestion could be found are remembered, so that they are not searched
+        again when they are reached with the same modules in a different order.
+
+        Parameters:
+        -----------
+
+        maximum_number_of_suggestions : int
+            the search stops when it has found this many suggestions
+
+        maximum_number_of_requirement_checks : int
+            the search stops after checking the programme requirements for this many complete module choices
+
+        maximum_number_of_steps : int
+            the search stops after trying this many modules
+
+        Returns:
+        --------
+
+        suggestions : list of pandas data frames
+            the suggested honours module choices, with the same columns as honours_module_choices, ordered by how many
+            programme requirements they miss, and then by how many new modules they contain
+
+        missed_requirements : list of strings
+            the programme requirements that each suggestion misses, or 'None'
+        """
+        self.maximum_number_of_suggestions = maximum_number_of_suggestions
+        self.maximum_number_of_requirement_checks = maximum_number_of_requirement_checks
+        self.maximum_number_of_steps = maximum_number_of_steps
+        self.suggestions = []
+        self.suggestion_missed_requirements = []
+        self.number_of_steps = 0
+        self.requirement_check_results = dict()
+        self.unsuccessful_states = set()
+        self.possible_candidates = dict()
+        self.chosen_modules = {slot: [] for slot in self.slots}
+
+        if len(self.honours_years) > 0:
+            self.search_from_slot(0, tuple(), 0, self.fixed_year_credits[self.honours_years[0]])
+
+        suggestion_ranks = [(len(missed_requirements), len(set(suggestion['Module code']) - set(self.student.planned_honours_modules)))
+                            for suggestion, missed_requirements in zip(self.suggestions, self.suggestion_missed_requirements)]
+        suggestion_order = sorted(range(len(self.suggestions)), key = lambda index: suggestion_ranks[index])
+        suggestions = [self.suggestions[index] for index in suggestion_order]
+        missed_requirements = [merge_list_to_long_string(self.suggestion_missed_requirements[index]) for index in suggestion_order]
+
+        return suggestions, missed_requirements
+
+    def search_is_finished(self):
+        """Check whether the search has found enough suggestions, or has reached one of its limits.
+
+        Returns:
+        --------
+
+        search_is_finished : bool
+            True if the search should stop
+        """
+        return (len(self.suggestions) >= self.maximum_number_of_suggestions or
+                len(self.requirement_check_results) >= self.maximum_number_of_requirement_checks or
+                self.number_of_steps >= self.maximum_number_of_steps)
+
+    def search_from_slot(self, slot_number, year_masks, first_semester_mask, year_credits):
+        """Continue the search at the start of a semester.
+
+        Parameters:
+        -----------
+
+        slot_number : int
+            the position of the semester in self.slots
+
+        year_masks : tuple of ints
+            the bitmasks of all modules in each completed honours year
+
+        first_semester_mask : int
+            the bitmask of all modules in the first semester of this honours year, if this is the second semester
+
+        year_credits : int
+            the credits of the current honours year so far
+        """
+        if self.search_is_finished():
+            return
+        if slot_number == len(self.slots):
+            self.check_requirements()
+            return
+
+        # the rest of the search only depends on which modules are in which of the previous years, so that if this state
+        # has been reached before without success, it can be skipped
+        search_state = (slot_number, year_masks, first_semester_mask, year_credits)
+        if search_state in self.unsuccessful_states:
+            return
+        number_of_suggestions = len(self.suggestions)
+
+        honours_year, semester = self.slots[slot_number]
+        slot_modules = self.fixed_slot_modules[(honours_year, semester)]
+        slot_clash_positions = 0
+        for module_code in slot_modules:
+            slot_clash_positions |= self.clash_positions.get((module_code, semester), 0)
+        previously_taken_mask = self.passed_mask | first_semester_mask
+        for year_mask in year_masks:
+            previously_taken_mask |= year_mask
+        slot_candidates = self.get_possible_candidates(slot_number, previously_taken_mask)
+        self.add_to_slot(slot_number, slot_candidates, 0, year_masks, first_semester_mask, year_credits,
+                         self.fixed_semester_credits[(honours_year, semester)], slot_clash_positions)
+
+        if len(self.suggestions) == number_of_suggestions and not self.search_is_finished():
+            self.unsuccessful_states.add(search_state)
+
+    def get_possible_candidates(self, slot_number, previously_taken_mask):
+        """Find the candidates that run in a semester and whose prerequisites can be met, if all other candidates 
+        of the semester are taken as well. The result is remembered for each semester and set of previously taken modules.
+
+        Parameters:
+        -----------
+
+        slot_number : int
+            the position of the semester in self.slots
+
+        previously_taken_mask : int
+            the bitmask of all modules taken before this semester
+
+        Returns:
+        --------
+
+        possible_candidates : list of strings
+            the module codes of the candidates, in the order of self.candidate_modules
+        """
+        if (slot_number, previously_taken_mask) not in self.possible_candidates:
+            slot = self.slots[slot_number]
+            running_candidates = [self.candidate_modules[position] for position in self.slot_candidates.get(slot, [])]
+            semester_mask = self.module_catalogue.get_module_bitmask(self.fixed_slot_modules[slot] + running_candidates)
+            self.possible_candidates[(slot_number, previously_taken_mask)] = [module_code for module_code in running_candidates
+                                                                              if self.prerequisites_are_met([module_code], previously_taken_mask, semester_mask)]
+
+        return self.possible_candidates[(slot_number, previously_taken_mask)]
+
+    def add_to_slot(self, slot_number, slot_candidates, first_candidate_number, year_masks, first_semester_mask, year_credits,
+                    semester_credits, slot_clash_positions):
+        """Either complete the current semester, or add one more module to it, trying candidates in order.
+        Only candidates after first_candidate_number are tried, so that each combination of modules is only tried once.
+
+        Parameters:
+        -----------
+
+        slot_number : int
+            the position of the semester in self.slots
+
+        slot_candidates : list of strings
+            the candidates for this semester, as returned by get_possible_candidates()
+
+        first_candidate_number : int
+            the position in slot_candidates of the first candidate to try
+
+        year_masks : tuple of ints
+            the bitmasks of all modules in each completed honours year
+
+        first_semester_mask : int
+            the bitmask of all modules in the first semester of this honours year, if this is the second semester
+
+        year_credits : int
+            the credits of the current honours year so far
+
+        semester_credits : int
+            the credits of the current semester so far, not counting full year modules
+
+        slot_clash_positions : int
+            the bitmask of the positions of all modules in this semester in the clash table
+        """
+        honours_year, semester = self.slots[slot_number]
+        self.complete_slot(slot_number, year_masks, first_semester_mask, year_credits, semester_credits)
+
+        if (honours_year, semester) not in self.open_slots or year_credits >= required_yearly_credits:
+            return
+        chosen_modules = self.chosen_modules[(honours_year, semester)]
+        for candidate_number in range(first_candidate_number, len(slot_candidates)):
+            if self.search_is_finished():
+                return
+            self.number_of_steps += 1
+            module_code = slot_candidates[candidate_number]
+            module_credits = self.get_credits(module_code)
+            if semester_credits + module_credits > maximum_semester_credits:
+                continue
+            if self.clash_masks[(module_code, semester)] & slot_clash_positions:
+                continue
+            if self.is_chosen(module_code) or self.is_excluded_by_antirequisites(module_code):
+                continue
+            chosen_modules.append(module_code)
+            self.add_to_slot(slot_number, slot_candidates, candidate_number + 1, year_masks, first_semester_mask, year_credits + module_credits,
+                             semester_credits + module_credits, slot_clash_positions | self.clash_positions[(module_code, semester)])
+            chosen_modules.pop()
+
+    def complete_slot(self, slot_number, year_masks, first_semester_mask, year_credits, semester_credits):
+        """Check the prerequisites of all modules in the current semester, and move on to the next semester.
+
+        Parameters:
+        -----------
+
+        slot_number : int
+            the position of the semester in self.slots
+
+        year_masks : tuple of ints
+            the bitmasks of all modules in each completed honours year
+
+        first_semester_mask : int
+            the bitmask of all modules in the first semester of this honours year, if this is the second semester
+
+        year_credits : int
+            the credits of the current honours year so far
+
+        semester_credits : int
+            the credits of the current semester so far, not counting full year modules
+        """
+        honours_year, semester = self.slots[slot_number]
+        previous_years_mask = self.passed_mask
+        for year_mask in year_masks:
+            previous_years_mask |= year_mask
+        slot_module_codes = self.fixed_slot_modules[(honours_year, semester)] + self.chosen_modules[(honours_year, semester)]
+        slot_mask = self.module_catalogue.get_module_bitmask(slot_module_codes)
+        if not self.prerequisites_are_met(slot_module_codes, previous_years_mask | first_semester_mask, slot_mask):
+            return
+
+        if semester == 'S1':
+            # stop if the second semester cannot make up the missing credits of this year
+            if ((honours_year, 'S2') in self.open_slots and
+                year_credits + max(maximum_semester_credits - self.fixed_semester_credits[(honours_year, 'S2')], 0) < required_yearly_credits):
+                return
+            self.search_from_slot(slot_number + 1, year_masks, slot_mask, year_credits)
+        else:
+            year_can_change = (honours_year, 'S1') in self.open_slots or (honours_year, 'S2') in self.open_slots
+            if year_can_change and year_credits < required_yearly_credits:
+                return
+            full_year_module_codes = self.fixed_slot_modules[(honours_year, 'Full Year')]
+            full_year_mask = self.module_catalogue.get_module_bitmask(full_year_module_codes)
+            if not self.prerequisites_are_met(full_year_module_codes, previous_years_mask, full_year_mask):
+                return
+            year_mask = first_semester_mask | slot_mask | full_year_mask
+            if slot_number + 1 < len(self.slots):
+                next_year_credits = self.fixed_year_credits[self.slots[slot_number + 1][0]]
+            else:
+                next_year_credits = 0
+            self.search_from_slot(slot_number + 1, year_masks + (year_mask,), 0, next_year_credits)
+
+    def prerequisites_are_met(self, module_codes, previously_taken_mask, simultaneously_taken_mask):
+        """Check the prerequisites of all modules in one semester.
+
+        Parameters:
+        -----------
+
+        module_codes : list of strings
+            the modules of the semester
+
+        previously_taken_mask : int
+            the bitmask of all modules taken before this semester
+
+        simultaneously_taken_mask : int
+            the bitmask of all modules of this semester
+
+        Returns:
+        --------
+
+        prerequisites_are_met : bool
+            True if the prerequisites of all modules are met
+        """
+        for module_code in module_codes:
+            record = self.module_catalogue.get_record(module_code)
+            if record is None or not isinstance(record.prerequisite_expression, PrerequisiteExpression):
+                continue
+            other_modules_mask = simultaneously_taken_mask & ~self.module_catalogue.get_module_bit(module_code)
+            if not record.prerequisite_expression.is_met(previously_taken_mask, other_modules_mask):
+                return False
+
+        return True
+
+    def is_chosen(self, module_code):
+        """Check whether a module has already been added anywhere.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code
+
+        Returns:
+        --------
+
+        is_chosen : bool
+            True if the module has been added to any semester
+        """
+        return any(module_code in chosen_modules for chosen_modules in self.chosen_modules.values())
+
+    def is_excluded_by_antirequisites(self, module_code):
+        """Check whether a module is an antirequisite of a module that the student has passed or plans to take,
+        or the other way round.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code
+
+        Returns:
+        --------
+
+        is_excluded : bool
+            True if the module cannot be taken
+        """
+        all_modules_mask = self.fixed_mask
+        antirequisite_mask = self.fixed_antirequisite_mask
+        for chosen_modules in self.chosen_modules.values():
+            for chosen_module in chosen_modules:
+                all_modules_mask |= self.module_catalogue.get_module_bit(chosen_module)
+                antirequisite_mask |= self.module_catalogue.get_record(chosen_module).antirequisite_mask
+
+        return bool(self.module_catalogue.get_record(module_code).antirequisite_mask & all_modules_mask or
+                    antirequisite_mask & self.module_catalogue.get_module_bit(module_code))
+
+    def check_requirements(self):
+        """Check the programme requirements for the current module choices, and keep them as a suggestion if they do not
+        miss any requirement that the current module choices of the student meet. The results are remembered for each
+        set of modules and honours years, so that module choices that only differ by semester are only checked once.
+        """
+        chosen_module_table = []
+        for (honours_year, semester), chosen_modules in self.chosen_modules.items():
+            for module_code in chosen_modules:
+                chosen_module_table.append([honours_year, self.academic_years[honours_year], semester, module_code,
+                                            self.get_credits(module_code)][:len(self.module_choice_columns)])
+        module_choices = self.fixed_module_choices[self.module_choice_columns]
+        if len(chosen_module_table) > 0:
+            module_choices = pd.concat([module_choices, pd.DataFrame(chosen_module_table, columns = self.module_choice_columns)],
+                                       ignore_index = True)
+
+        requirement_check_key = frozenset((row[3], row[0]) for row in chosen_module_table)
+        if requirement_check_key not in self.requirement_check_results:
+            trial_student = self.student.get_copy_with_honours_module_choices(module_choices)
+            try:
+                missed_requirements, _ = find_missing_programme_requirements(trial_student)
+            except Exception:
+                # the programme requirements cannot be checked for these module choices, so we cannot suggest them
+                missed_requirements = None
+            if missed_requirements is None:
+                self.requirement_check_results[requirement_check_key] = None
+            else:
+                self.requirement_check_results[requirement_check_key] = [missed_requirement for missed_requirement 
+                                                                         in missed_requirements.split('\n') if missed_requirement != 'None']
+
+        missed_requirements = self.requirement_check_results[requirement_check_key]
+        if missed_requirements is not None and set(get_requirement_kind(missed_requirement) for missed_requirement in missed_requirements) <= self.missed_requirement_kinds:
+            module_choices['Honours year number'] = module_choices['Honours year'].str[-1].astype(int)
+            module_choices = module_choices.sort_values(by = ['Honours year number', 'Semester'], kind = 'stable', ignore_index = True)
+            self.suggestions.append(module_choices.drop(columns = 'Honours year number'))
+            self.suggestion_missed_requirements.append(missed_requirements)
+
+def get_requirement_kind(missed_requirement):
+    """Remove the module codes and numbers from a missed programme requirement, so that for example
+    'Student selected the following modules twice: MT4599, VP4001' and 'Student selected the following modules twice: MT4599'
+    count as the same requirement.
+
+    Parameters:
+    -----------
+
+    missed_requirement : string
+        one missed programme requirement, as listed by find_missing_programme_requirements()
+
+    Returns:
+    --------
+
+    requirement_kind : string
+        the missed requirement without module codes and numbers
+    """
+    requirement_kind = re.sub(r'[A-Z]{2}\d{4}|\d+', '', missed_requirement)
+    requirement_kind = re.sub(r'[\s,]+', ' ', requirement_kind).strip()
+
+    return requirement_kind
+
+def get_module_credits(student_record_store = None):
+    """Look up the credits of every module that appears in the student data.
+
+    Parameters:
+    -----------
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    Returns:
+    --------
+
+    module_credits : dictionary
+        the credits of each module code
+    """
+    if student_record_store is None:
+        student_record_store = get_student_record_store()
+    data_base = student_record_store.data_base
+
+    credits_table = data_base[['Module code', 'Credits available']].dropna()
+    module_credits = credits_table.groupby('Module code', observed = True)['Credits available'].max().astype(int).to_dict()
+
+    return module_credits
+
+def describe_module_choice_changes(honours_module_choices, suggested_module_choices):
+    """List how suggested module choices differ from the module choices of the student.
+
+    Parameters:
+    -----------
+
+    honours_module_choices : pandas data frame
+        the module choices of the student
+
+    suggested_module_choices : pandas data frame
+        the suggested module choices, as returned by ModuleChoiceSearch.find_suggestions()
+
+    Returns:
+    --------
+
+    module_choice_changes : list of strings
+        one entry for each module that is moved, added or dropped
+    """
+    planned_slots = dict()
+    for module_code, honours_year, semester in zip(honours_module_choices['Module code'], honours_module_choices['Honours year'],
+                                                   honours_module_choices['Semester']):
+        planned_slots.setdefault(module_code, honours_year + ' ' + semester)
+    suggested_slots = dict()
+    for module_code, honours_year, semester in zip(suggested_module_choices['Module code'], suggested_module_choices['Honours year'],
+                                                   suggested_module_choices['Semester']):
+        suggested_slots.setdefault(module_code, honours_year + ' ' + semester)
+
+    module_choice_changes = []
+    for module_code, planned_slot in planned_slots.items():
+        if module_code not in suggested_slots:
+            module_choice_changes.append('Drop ' + module_code + ' from ' + planned_slot)
+        elif suggested_slots[module_code] != planned_slot:
+            module_choice_changes.append('Move ' + module_code + ' from ' + planned_slot + ' to ' + suggested_slots[module_code])
+    for module_code, suggested_slot in suggested_slots.items():
+        if module_code not in planned_slots:
+            module_choice_changes.append('Add ' + module_code + ' in ' + suggested_slot)
+
+    return module_choice_changes
+
+def print_module_suggestions(student_id, student_record_store = None, candidate_modules = None, number_of_suggestions = 3):
+    """Print module choices for a student that fix all timetable clashes, modules that are not running and
+    missing prerequisites, and that meet the programme requirements. This is what 'python advising_tool.py suggest 123456789' does.
+
+    Parameters:
+    -----------
+
+    student_id : int
+        the student ID
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    candidate_modules : list of strings
+        the modules that may be added to the module choices. If this is None, all MT modules at 3000 level or above are candidates.
+
+    number_of_suggestions : int
+        the most suggestions to print
+    """
+    if student_record_store is None:
+        student_record_store = get_student_record_store()
+
+    student_or_warning = collect_student_data(student_id, student_record_store = student_record_store)
+    if isinstance(student_or_warning, str):
+        colour_code_print_statement(student_or_warning)
+        return
+    student = student_or_warning
+
+    print('Student ID: ' + str(student.student_id))
+    print('Name: ' + student.full_name)
+    print('Programme: ' + student.programme_name)
+    print(' ')
+
+    module_choice_search = ModuleChoiceSearch(student, candidate_modules, get_module_credits(student_record_store))
+    changed_module_choices = [row['Module code'] + ' in ' + row['Honours year'] + ' ' + row['Semester'] + ': ' + row['Reason']
+                              for _, row in module_choice_search.changed_module_choices.iterrows()]
+    print('The following module choices need to change:')
+    colour_code_print_statement(merge_list_to_long_string(changed_module_choices))
+
+    suggestions, missed_requirements = module_choice_search.find_suggestions(number_of_suggestions)
+    if len(suggestions) == 0:
+        print('I could not find module choices that are running, free of clashes, meet all prerequisites and meet the same programme requirements.')
+        print(' ')
+    for suggestion_number, suggestion in enumerate(suggestions):
+        print('Suggestion ' + str(suggestion_number + 1) + ':')
+        colour_code_print_statement(merge_list_to_long_string(describe_module_choice_changes(student.honours_module_choices, suggestion)),
+                                    is_advice = True)
+        print(suggestion.to_string(index = False))
+        print(' ')
+        print('With these module choices the student would still miss the following programme requirements:')
+        colour_code_print_statement(missed_requirements[suggestion_number])
@@ -0,0 +1,138 @@
+import re
+from .infrastructure import *
+
+class OfferingIndex():
+    def __init__(self, module_catalogue, offering_overrides):
+        """Constructor for the OfferingIndex class. Records in which semesters and academic years each module
+        of the catalogue runs, so that module choices can be checked with a join instead of a loop over the catalogue.
+
+        Parameters:
+        -----------
+
+        module_catalogue : instance of ModuleCatalogue
+            the module catalogue, as returned by get_module_catalogue()
+
+        offering_overrides : pandas data frame
+            the content of Module_offering_overrides.csv, with the columns 'Module code' and 'Academic year'.
+            Modules in this table only run in the academic years listed for them.
+        """
+        # one row per module, with the rule for the academic years it runs in: every year, or every
+        # second year, starting from the year in the catalogue
+        module_table = []
+        # one row per module and semester that it runs in
+        semester_offerings = []
+        for module_code, record in module_catalogue.records.items():
+            academic_year_match = re.fullmatch(r'(\d{4})/\d{4}', str(record.academic_year))
+            if academic_year_match is not None:
+                start_year = int(academic_year_match.group(1))
+            else:
+                start_year = np.nan
+            if record.is_alternating is None:
+                years_between_offerings = np.nan
+            elif record.is_alternating:
+                years_between_offerings = 2
+            else:
+                years_between_offerings = 1
+            module_table.append([module_code, str(record.academic_year), start_year, years_between_offerings, record.semesters[0],
+                                 'Full Year' in record.semesters])
+            for semester in set(record.semesters):
+                semester_offerings.append([module_code, semester])
+
+        self.module_table = pd.DataFrame(module_table, columns = ['Module code', 'Catalogue academic year', 'Start year',
+                                                                  'Years between offerings', 'Catalogue semester', 'Runs all year'])
+        self.semester_offerings = pd.DataFrame(semester_offerings, columns = ['Module code', 'Semester'])
+        self.offering_overrides = offering_overrides[['Module code', 'Academic year']].astype(str).drop_duplicates()
+        self.overridden_modules = set(self.offering_overrides['Module code'])
+
+    def check_module_choices(self, module_choices):
+        """Check for a table of module choices whether each module exists, and runs in the selected semester
+        and academic year. Works for the module choices of one student as well as for a whole cohort.
+
+        Parameters:
+        -----------
+
+        module_choices : pandas data frame
+            needs to have the columns 'Module code', 'Academic year' and 'Semester', like honours_module_choices
+
+        Returns:
+        --------
+
+        choice_checks : pandas data frame
+            one row for each row of module_choices, in the same order, with the columns 'Module code', 'Academic year',
+            'Semester' and 'Catalogue semester' (the first semester in the catalogue), and the boolean columns
+            'Module exists', 'Runs in semester' and 'Runs in academic year'. For modules that do not exist the
+            last two columns are True, since these modules are flagged elsewhere.
+        """
+        choice_checks = module_choices[['Module code', 'Academic year', 'Semester']].astype(str).reset_index(drop = True)
+        choice_checks = choice_checks.merge(self.module_table, on = 'Module code', how = 'left')
+        module_exists = choice_checks['Catalogue semester'].notna()
+
+        alternation_is_unknown = module_exists & choice_checks['Years between offerings'].isna()
+        if alternation_is_unknown.any():
+            module_code = choice_checks.loc[alternation_is_unknown.idxmax(), 'Module code']
+            raise(ValueError('cannot tell if module ' + module_code + ' is alternating or not. Check the table entry.'))
+        start_year_is_unknown = module_exists & choice_checks['Start year'].isna()
+        if start_year_is_unknown.any():
+            row = choice_checks.loc[start_year_is_unknown.idxmax()]
+            raise(ValueError('module ' + row['Module code'] + ' has an invalid academic year ' + repr(row['Catalogue academic year'])))
+
+        semester_is_offered = choice_checks.merge(self.semester_offerings, on = ['Module code', 'Semester'],
+                                                  how = 'left', indicator = True)['_merge'] == 'both'
+        runs_in_semester = ~module_exists | semester_is_offered | (choice_checks['Runs all year'] == True)
+
+        # apply the alternation rule to the first year of the selected academic year
+        selected_start_year = pd.to_numeric(choice_checks['Academic year'].str.slice(0,4), errors = 'coerce')
+        academic_year_is_valid = choice_checks['Academic year'] == (selected_start_year.astype('Int64').astype(str) + '/' +
+                                                                    (selected_start_year + 1).astype('Int64').astype(str))
+        years_since_start = selected_start_year - choice_checks['Start year']
+        runs_in_academic_year = ((academic_year_is_valid & (years_since_start >= 0) &
+                                  (years_since_start % choice_checks['Years between offerings'] == 0)) |
+                                 (choice_checks['Academic year'] == choice_checks['Catalogue academic year']))
+        year_is_overridden = choice_checks.merge(self.offering_overrides, on = ['Module code', 'Academic year'],
+                                                 how = 'left', indicator = True)['_merge'] == 'both'
+        module_is_overridden = choice_checks['Module code'].isin(self.overridden_modules)
+        runs_in_academic_year = runs_in_academic_year.where(~module_is_overridden, year_is_overridden)
+        runs_in_academic_year = ~module_exists | runs_in_academic_year.fillna(False).astype(bool)
+
+        choice_checks = choice_checks[['Module code', 'Academic year', 'Semester', 'Catalogue semester']].copy()
+        choice_checks['Module exists'] = module_exists
+        choice_checks['Runs in semester'] = runs_in_semester
+        choice_checks['Runs in academic year'] = runs_in_academic_year
+
+        return choice_checks
+
+    def get_modules_running_in_academic_year(self, academic_year):
+        """Get all modules of the catalogue that run in an academic year.
+
+        Parameters:
+        -----------
+
+        academic_year : string
+            the academic year, like '2025/2026'
+
+        Returns:
+        --------
+
+        module_codes : list of strings
+            the module codes. Modules for which the catalogue does not say when they run are left out.
+        """
+        module_table = self.module_table[self.module_table['Years between offerings'].notna() & self.module_table['Start year'].notna()]
+        module_choices = pd.DataFrame({'Module code': module_table['Module code'], 'Academic year': academic_year,
+                                       'Semester': module_table['Catalogue semester']})
+        choice_checks = self.check_module_choices(module_choices)
+
+        return choice_checks.loc[choice_checks['Runs in academic year'], 'Module code'].to_list()
+
+@functools.lru_cache(maxsize=None)
+def get_offering_index():
+    """Build the offering index of the module catalogue once per process.
+
+    Returns:
+    --------
+
+    offering_index : instance of OfferingIndex
+        the offering index
+    """
+    offering_overrides = pd.read_csv(module_offering_overrides_location, dtype = str)
+
+    return OfferingIndex(get_module_catalogue(), offering_overrides)
@@ -0,0 +1,403 @@
+import re
+import numpy as np
+
+# number words that can appear in prerequisites like 'two of (MT3505, MT4003, MT4004)'
+number_words = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6}
+
+class ModuleRequirement():
+    def __init__(self, module_code, is_corequisite = False):
+        """Constructor for the ModuleRequirement class, the leaves of a prerequisite expression.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the required module
+
+        is_corequisite : bool
+            if True, the module may also be taken at the same time as the module that requires it
+        """
+        self.module_code = module_code
+        self.is_corequisite = is_corequisite
+        # the bit of this module in module bitmasks, and its column in module matrices, set by assign_module_bits()
+        self.module_bit = 0
+        self.module_position = None
+
+    def assign_module_bits(self, module_index):
+        """Prepare the requirement for checking module bitmasks.
+
+        Parameters:
+        -----------
+
+        module_index : dictionary
+            the bit position of each module code, as in ModuleCatalogue.module_index
+        """
+        self.module_position = module_index[self.module_code]
+        self.module_bit = 1 << self.module_position
+
+    def is_met(self, previously_taken_modules, simultaneously_taken_modules):
+        """Check whether the requirement is met.
+
+        Parameters:
+        -----------
+
+        previously_taken_modules : int
+            bitmask of the modules the student has taken before the module that has the prerequisite
+
+        simultaneously_taken_modules : int
+            bitmask of the modules the student is taking in the same semester as the module that has the prerequisite
+
+        Returns:
+        --------
+
+        is_met : bool
+            True if the requirement is met
+        """
+        if previously_taken_modules & self.module_bit:
+            return True
+        return self.is_corequisite and (simultaneously_taken_modules & self.module_bit) != 0
+
+    def is_met_for_rows(self, previously_taken_matrix, simultaneously_taken_matrix):
+        """Check the requirement for many students at once.
+
+        Parameters:
+        -----------
+
+        previously_taken_matrix : numpy array of bools
+            one row per student and module that has the prerequisite, one column per module in the
+            module index. An entry is True if the student has taken that module before.
+
+        simultaneously_taken_matrix : numpy array of bools
+            the same, for the modules taken in the same semester
+
+        Returns:
+        --------
+
+        is_met : numpy array of bools
+            one entry per row, True if the requirement is met
+        """
+        if self.is_corequisite:
+            return previously_taken_matrix[:, self.module_position] | simultaneously_taken_matrix[:, self.module_position]
+        return previously_taken_matrix[:, self.module_position].copy()
+
+    def get_module_requirements(self):
+        return [self]
+
+class AllOf():
+    def __init__(self, requirements):
+        """Constructor for the AllOf class, requirements joined by 'and'.
+
+        Parameters:
+        -----------
+
+        requirements : list
+            the requirements that all need to be met
+        """
+        self.requirements = requirements
+
+    def assign_module_bits(self, module_index):
+        # modules that are required directly are checked together with one bitmask
+        self.module_mask, self.other_requirements = assign_module_bits_to_requirements(self.requirements, module_index)
+
+    def is_met(self, previously_taken_modules, simultaneously_taken_modules):
+        if (previously_taken_modules & self.module_mask) != self.module_mask:
+            return False
+        return all(requirement.is_met(previously_taken_modules, simultaneously_taken_modules) for requirement in self.other_requirements)
+
+    def is_met_for_rows(self, previously_taken_matrix, simultaneously_taken_matrix):
+        return np.logical_and.reduce([requirement.is_met_for_rows(previously_taken_matrix, simultaneously_taken_matrix)
+                                      for requirement in self.requirements])
+
+    def get_module_requirements(self):
+        return [module_requirement for requirement in self.requirements for module_requirement in requirement.get_module_requirements()]
+
+class AnyOf():
+    def __init__(self, requirements):
+        """Constructor for the AnyOf class, requirements joined by 'or'.
+
+        Parameters:
+        -----------
+
+        requirements : list
+            the requirements of which at least one needs to be met
+        """
+        self.requirements = requirements
+
+    def assign_module_bits(self, module_index):
+        # modules that are required directly are checked together with one bitmask
+        self.module_mask, self.other_requirements = assign_module_bits_to_requirements(self.requirements, module_index)
+
+    def is_met(self, previously_taken_modules, simultaneously_taken_modules):
+        if previously_taken_modules & self.module_mask:
+            return True
+        return any(requirement.is_met(previously_taken_modules, simultaneously_taken_modules) for requirement in self.other_requirements)
+
+    def is_met_for_rows(self, previously_taken_matrix, simultaneously_taken_matrix):
+        return np.logical_or.reduce([requirement.is_met_for_rows(previously_taken_matrix, simultaneously_taken_matrix)
+                                     for requirement in self.requirements])
+
+    def get_module_requirements(self):
+        return [module_requirement for requirement in self.requirements for module_requirement in requirement.get_module_requirements()]
+
+class NumberOf():
+    def __init__(self, number, requirements):
+        """Constructor for the NumberOf class, for prerequisites like 'two of (MT3505, MT4003, MT4004)'.
+
+        Parameters:
+        -----------
+
+        number : int
+            how many of the requirements need to be met
+
+        requirements : list
+            the requirements to choose from
+        """
+        self.number = number
+        self.requirements = requirements
+
+    def assign_module_bits(self, module_index):
+        for requirement in self.requirements:
+            requirement.assign_module_bits(module_index)
+
+    def is_met(self, previously_taken_modules, simultaneously_taken_modules):
+        number_of_met_requirements = sum(1 for requirement in self.requirements
+                                         if requirement.is_met(previously_taken_modules, simultaneously_taken_modules))
+        return number_of_met_requirements >= self.number
+
+    def is_met_for_rows(self, previously_taken_matrix, simultaneously_taken_matrix):
+        number_of_met_requirements = np.sum([requirement.is_met_for_rows(previously_taken_matrix, simultaneously_taken_matrix)
+                                             for requirement in self.requirements], axis = 0)
+        return number_of_met_requirements >= self.number
+
+    def get_module_requirements(self):
+        return [module_requirement for requirement in self.requirements for module_requirement in requirement.get_module_requirements()]
+
+class PrerequisiteExpression():
+    def __init__(self, prerequisites):
+        """Constructor for the PrerequisiteExpression class. Compiles the prerequisite text of a module once,
+        so that checking a student needs no string operations. 'and' binds more strongly than 'or', as in
+        python, so 'A or B and C' means 'A or (B and C)'.
+
+        Parameters:
+        -----------
+
+        prerequisites : string
+            the prerequisites as they appear in the module catalogue, e.g. 'MT2506 and (MT3504 or co-requisite MT3503)'
+        """
+        self.text = prerequisites
+        tokens = re.findall(r'\(|\)|,|[^\s(),]+', prerequisites)
+        self.requirement, position = parse_or_expression(tokens, 0)
+        if position != len(tokens):
+            raise(ValueError('unexpected ' + repr(tokens[position]) + ' in prerequisites ' + repr(prerequisites)))
+        self.module_requirements = self.requirement.get_module_requirements()
+        self.module_codes = [module_requirement.module_code for module_requirement in self.module_requirements]
+        # pieces of text between the module codes, used to show how the prerequisites were evaluated
+        self.text_pieces = re.split(r'[A-Z]{2}\d{4}', prerequisites.replace('co-requisite ', ''))
+
+    def assign_module_bits(self, module_index):
+        """Prepare the expression for checking module bitmasks. Needs to be called before the expression is checked.
+
+        Parameters:
+        -----------
+
+        module_index : dictionary
+            the bit position of each module code, as in ModuleCatalogue.module_index. Needs to contain all
+            module codes in the expression.
+        """
+        self.requirement.assign_module_bits(module_index)
+
+    def is_met(self, previously_taken_modules, simultaneously_taken_modules):
+        """Check whether a student meets the prerequisites.
+
+        Parameters:
+        -----------
+
+        previously_taken_modules : int
+            bitmask of the modules the student has taken before the module that has the prerequisite
+
+        simultaneously_taken_modules : int
+            bitmask of the modules the student is taking in the same semester as the module that has the prerequisite
+
+        Returns:
+        --------
+
+        is_met : bool
+            True if the prerequisites are met
+        """
+        return self.requirement.is_met(previously_taken_modules, simultaneously_taken_modules)
+
+    def is_met_for_rows(self, previously_taken_matrix, simultaneously_taken_matrix):
+        """Check the prerequisites for many students at once, with one array operation per module in the expression.
+
+        Parameters:
+        -----------
+
+        previously_taken_matrix : numpy array of bools
+            one row per student and module that has the prerequisite, one column per module in the
+            module index. An entry is True if the student has taken that module before.
+
+        simultaneously_taken_matrix : numpy array of bools
+            the same, for the modules taken in the same semester
+
+        Returns:
+        --------
+
+        is_met : numpy array of bools
+            one entry per row, True if the prerequisites are met
+        """
+        return self.requirement.is_met_for_rows(previously_taken_matrix, simultaneously_taken_matrix)
+
+    def get_evaluated_text(self, previously_taken_modules, simultaneously_taken_modules):
+        """Get the prerequisite text with every module code replaced by 'True' or 'False', e.g. '[True and False]',
+        to show the adviser which requirement is missing.
+
+        Parameters:
+        -----------
+
+        previously_taken_modules : int
+            bitmask of the modules the student has taken before the module that has the prerequisite
+
+        simultaneously_taken_modules : int
+            bitmask of the modules the student is taking in the same semester as the module that has the prerequisite
+
+        Returns:
+        --------
+
+        evaluated_text : string
+            the prerequisite text with evaluated module codes
+        """
+        evaluated_text = self.text_pieces[0]
+        for module_requirement, text_piece in zip(self.module_requirements, self.text_pieces[1:]):
+            evaluated_text += str(module_requirement.is_met(previously_taken_modules, simultaneously_taken_modules)) + text_piece
+
+        return evaluated_text
+
+def assign_module_bits_to_requirements(requirements, module_index):
+    """Prepare the requirements of an AllOf or AnyOf node for checking module bitmasks.
+
+    Parameters:
+    -----------
+
+    requirements : list
+        the requirements of the node
+
+    module_index : dictionary
+        the bit position of each module code
+
+    Returns:
+    --------
+
+    module_mask : int
+        bitmask of all modules that are required directly, i.e. not as co-requisites or inside brackets
+
+    other_requirements : list
+        all other requirements
+    """
+    module_mask = 0
+    other_requirements = []
+    for requirement in requirements:
+        requirement.assign_module_bits(module_index)
+        if isinstance(requirement, ModuleRequirement) and not requirement.is_corequisite:
+            module_mask |= requirement.module_bit
+        else:
+            other_requirements.append(requirement)
+
+    return module_mask, other_requirements
+
+def parse_or_expression(tokens, position):
+    """Parse requirements joined by 'or', starting at the given token.
+
+    Parameters:
+    -----------
+
+    tokens : list of strings
+        the words, brackets and commas of the prerequisite text
+
+    position : int
+        the index of the first token to parse
+
+    Returns:
+    --------
+
+    requirement : requirement object
+        the parsed requirement
+
+    position : int
+        the index of the first token after the requirement
+    """
+    requirements = []
+    requirement, position = parse_and_expression(tokens, position)
+    requirements.append(requirement)
+    while position < len(tokens) and tokens[position] == 'or':
+        requirement, position = parse_and_expression(tokens, position + 1)
+        requirements.append(requirement)
+    if len(requirements) == 1:
+        return requirements[0], position
+    return AnyOf(requirements), position
+
+def parse_and_expression(tokens, position):
+    """Parse requirements joined by 'and', starting at the given token. Takes the same arguments and
+    returns the same values as parse_or_expression().
+    """
+    requirements = []
+    requirement, position = parse_single_requirement(tokens, position)
+    requirements.append(requirement)
+    while position < len(tokens) and tokens[position] == 'and':
+        requirement, position = parse_single_requirement(tokens, position + 1)
+        requirements.append(requirement)
+    if len(requirements) == 1:
+        return requirements[0], position
+    return AllOf(requirements), position
+
+def parse_single_requirement(tokens, position):
+    """Parse a module code, a co-requisite, an expression in brackets, or a choice like 'two of (...)',
+    starting at the given token. Takes the same arguments and returns the same values as parse_or_expression().
+    """
+    if position >= len(tokens):
+        raise(ValueError('prerequisites end unexpectedly'))
+    token = tokens[position]
+    if token == '(':
+        requirement, position = parse_or_expression(tokens, position + 1)
+        if position >= len(tokens) or tokens[position] != ')':
+            raise(ValueError('missing closing bracket in prerequisites'))
+        return requirement, position + 1
+    if token == 'co-requisite':
+        if position + 1 >= len(tokens) or not is_module_code(tokens[position + 1]):
+            raise(ValueError("'co-requisite' needs to be followed by a module code"))
+        return ModuleRequirement(tokens[position + 1], is_corequisite = True), position + 2
+    if is_module_code(token):
+        return ModuleRequirement(token), position + 1
+    if (token in number_words or token.isdigit()) and position + 2 < len(tokens) and tokens[position + 1] == 'of' and tokens[position + 2] == '(':
+        if token in number_words:
+            number = number_words[token]
+        else:
+            number = int(token)
+        requirements = []
+        position += 3
+        while True:
+            requirement, position = parse_or_expression(tokens, position)
+            requirements.append(requirement)
+            if position < len(tokens) and tokens[position] == ',':
+                position += 1
+            elif position < len(tokens) and tokens[position] == ')':
+                return NumberOf(number, requirements), position + 1
+            else:
+                raise(ValueError('missing closing bracket in prerequisites'))
+    raise(ValueError('unexpected ' + repr(token) + ' in prerequisites'))
+
+def is_module_code(token):
+    """Check whether a word is a module code, like 'MT2501'.
+
+    Parameters:
+    -----------
+
+    token : string
+        the word
+
+    Returns:
+    --------
+
+    is_module_code : bool
+        True if the word is a module code
+    """
+    return re.fullmatch(r'[A-Z]{2}\d{4}', token) is not None
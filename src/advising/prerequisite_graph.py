@@ -0,0 +1,240 @@
+from .infrastructure import *
+
+class PrerequisiteGraph():
+    def __init__(self, module_catalogue):
+        """Constructor for the PrerequisiteGraph class. Links every module in the catalogue to the modules in
+        its prerequisites, and works out which modules depend on which, directly and through other modules.
+
+        Parameters:
+        -----------
+
+        module_catalogue : instance of ModuleCatalogue
+            the module catalogue, as returned by get_module_catalogue()
+        """
+        self.module_catalogue = module_catalogue
+
+        # the modules that appear in the prerequisites of each module, including co-requisites
+        self.required_modules = dict()
+        # the reverse index, i.e. the modules that list each module in their prerequisites
+        self.dependent_modules = dict()
+        for module_code, record in module_catalogue.records.items():
+            if isinstance(record.prerequisite_expression, PrerequisiteExpression):
+                self.required_modules[module_code] = set(record.prerequisite_expression.module_codes)
+            else:
+                self.required_modules[module_code] = set()
+            for required_module_code in self.required_modules[module_code]:
+                self.dependent_modules.setdefault(required_module_code, set()).add(module_code)
+
+        # the transitive closures of both
+        self.all_required_modules = dict()
+        self.all_dependent_modules = dict()
+        for module_code in module_catalogue.module_index:
+            self.all_required_modules[module_code] = get_reachable_modules(module_code, self.required_modules)
+            self.all_dependent_modules[module_code] = get_reachable_modules(module_code, self.dependent_modules)
+
+        # every module in the module index, as a bitmask
+        self.all_modules_mask = (1 << len(module_catalogue.module_index)) - 1
+
+        # the results of get_blocked_modules(), which are worked out when they are first needed
+        self.blocked_modules = dict()
+
+    def get_blocked_modules(self, module_code):
+        """Find all modules that a student cannot take without the given module, because their prerequisites
+        cannot be met without it, or without another module that is blocked. Modules that can be taken with
+        an alternative prerequisite, like MT4003 for 'MT3505 or MT4003', are not blocked.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module that is missing or failed
+
+        Returns:
+        --------
+
+        blocked_modules : list of strings
+            the module codes of all blocked modules, sorted
+        """
+        if module_code not in self.blocked_modules:
+            blocked_modules = {module_code}
+            candidate_modules = self.all_dependent_modules.get(module_code, set())
+            found_new_blocked_module = True
+            while found_new_blocked_module:
+                found_new_blocked_module = False
+                # assume that the student has taken every module that is not blocked
+                available_mask = self.all_modules_mask & ~self.module_catalogue.get_module_bitmask(blocked_modules)
+                for candidate_module in candidate_modules - blocked_modules:
+                    prerequisite_expression = self.module_catalogue.get_record(candidate_module).prerequisite_expression
+                    if not prerequisite_expression.is_met(available_mask, available_mask):
+                        blocked_modules.add(candidate_module)
+                        found_new_blocked_module = True
+            blocked_modules.discard(module_code)
+            self.blocked_modules[module_code] = sorted(blocked_modules)
+
+        return list(self.blocked_modules[module_code])
+
+    def get_required_modules(self, module_code):
+        """Get all modules that appear in the prerequisites of a module, directly or in the prerequisites of
+        these modules.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code
+
+        Returns:
+        --------
+
+        required_modules : list of strings
+            the module codes, sorted
+        """
+        return sorted(self.all_required_modules.get(module_code, set()))
+
+def get_reachable_modules(module_code, module_links):
+    """Find all modules that can be reached from a module by following links, e.g. from a module to its
+    prerequisites, and from these to their prerequisites.
+
+    Parameters:
+    -----------
+
+    module_code : string
+        the module to start from
+
+    module_links : dictionary
+        the linked module codes for each module code
+
+    Returns:
+    --------
+
+    reachable_modules : set of strings
+        all reachable module codes, not including the start module unless the links contain a cycle
+    """
+    reachable_modules = set()
+    modules_to_visit = list(module_links.get(module_code, set()))
+    while modules_to_visit:
+        this_module_code = modules_to_visit.pop()
+        if this_module_code not in reachable_modules:
+            reachable_modules.add(this_module_code)
+            modules_to_visit += module_links.get(this_module_code, set())
+
+    return reachable_modules
+
+@functools.lru_cache(maxsize=None)
+def get_prerequisite_graph():
+    """Build the prerequisite graph of the module catalogue once per process.
+
+    Returns:
+    --------
+
+    prerequisite_graph : instance of PrerequisiteGraph
+        the prerequisite graph
+    """
+    return PrerequisiteGraph(get_module_catalogue())
+
+def find_students_blocked_by(module_code, student_record_store = None):
+    """Find all students who plan to take a module that they cannot take without the given module,
+    and who have not passed the given module. As in collect_student_data(), z-coded, deferred and s-coded modules, 
+    and failed modules that are awaiting reassessment, count as passed.
+
+    Parameters:
+    -----------
+
+    module_code : string
+        the module that is missing or failed
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    Returns:
+    --------
+
+    blocked_students : pandas data frame
+        one row per student, with the columns 'Student ID', 'Name', 'Programme' and 'Blocked modules'
+    """
+    if student_record_store is None:
+        student_record_store = get_student_record_store()
+    data_base = student_record_store.data_base
+
+    blocked_modules = get_prerequisite_graph().get_blocked_modules(module_code)
+    planned_blocked_entries = data_base[data_base['Module code'].isin(blocked_modules) & data_base['Assessment result'].isna()]
+    # count the module as passed in the same cases as the checks of individual students do
+    module_entries = data_base[data_base['Module code'] == module_code]
+    passed_entries = module_entries[get_passed_module_mask(module_entries)]
+    planned_blocked_entries = planned_blocked_entries[~planned_blocked_entries['Student ID'].isin(passed_entries['Student ID'])]
+
+    # one row per student, with the blocked modules in one string
+    planned_blocked_entries = pd.DataFrame({'Student ID': planned_blocked_entries['Student ID'],
+                                            'Name': planned_blocked_entries['Given names'].astype(str) + ' ' + 
+                                                    planned_blocked_entries['Family name'].astype(str),
+                                            'Programme': planned_blocked_entries['Programme name'].astype(str),
+                                            'Module code': planned_blocked_entries['Module code'].astype(str)})
+    planned_blocked_entries = planned_blocked_entries.drop_duplicates(subset = ['Student ID', 'Module code'])
+    planned_blocked_entries = planned_blocked_entries.sort_values(by = ['Student ID', 'Module code'])
+    blocked_module_lists = dict()
+    for student_id, blocked_module in zip(planned_blocked_entries['Student ID'], planned_blocked_entries['Module code']):
+        blocked_module_lists.setdefault(student_id, []).append(blocked_module)
+
+    blocked_students = planned_blocked_entries.drop_duplicates(subset = 'Student ID')[['Student ID', 'Name', 'Programme']]
+    blocked_students = blocked_students.reset_index(drop = True)
+    blocked_students['Blocked modules'] = [', '.join(blocked_module_lists[student_id]) for student_id in blocked_students['Student ID']]
+
+    return blocked_students
+
+def print_modules_blocked_by(module_code, student_record_store = None):
+    """Print all modules that cannot be taken without the given module, and all students whose module
+    choices depend on it. This is what 'python advising_tool.py blocked-by MT2501' does.
+
+    Parameters:
+    -----------
+
+    module_code : string
+        the module that is missing or failed
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+    """
+    prerequisite_graph = get_prerequisite_graph()
+    if module_code not in prerequisite_graph.module_catalogue.module_index:
+        raise(ValueError('module ' + module_code + ' does not appear in the module catalogue'))
+
+    blocked_modules = prerequisite_graph.get_blocked_modules(module_code)
+    print('Without ' + module_code + ' students cannot take the following modules:')
+    colour_code_print_statement(merge_list_to_long_string(blocked_modules))
+
+    directly_dependent_modules = sorted(prerequisite_graph.dependent_modules.get(module_code, set()) - set(blocked_modules))
+    if len(directly_dependent_modules) > 0:
+        print('The following modules list ' + module_code + ' as a prerequisite, but can also be taken with other modules:')
+        colour_code_print_statement(merge_list_to_long_string(directly_dependent_modules), is_advice = True)
+
+    blocked_students = find_students_blocked_by(module_code, student_record_store)
+    print('The following students have selected these modules and have not passed ' + module_code + ':')
+    if blocked_students.empty:
+        colour_code_print_statement('None')
+    else:
+        print(blocked_students.to_string(index = False))
+        print(' ')
+
+def print_modules_required_by(module_code):
+    """Print all modules in the prerequisites of the given module, directly or through other modules.
+    This is what 'python advising_tool.py requires MT4599' does.
+
+    Parameters:
+    -----------
+
+    module_code : string
+        the module that we are investigating
+    """
+    prerequisite_graph = get_prerequisite_graph()
+    module_record = prerequisite_graph.module_catalogue.get_record(module_code)
+    if module_record is None:
+        raise(ValueError('module ' + module_code + ' is not in the module catalogue'))
+
+    print('Prerequisites of ' + module_code + ':')
+    if isinstance(module_record.prerequisites, str):
+        print(module_record.prerequisites)
+    else:
+        print('None')
+    print(' ')
+    print('Modules that ' + module_code + ' depends on, directly or through their own prerequisites:')
+    colour_code_print_statement(merge_list_to_long_string(prerequisite_graph.get_required_modules(module_code)), is_advice = True)
@@ -1,4 +1,3 @@
-import re
 from .infrastructure import *
 
 def find_missing_prerequisites(student):
@@ -24,7 +23,7 @@ def find_missing_prerequisites(student):
     list_of_recommendations = []
     
     for module in student.planned_honours_modules:
-        module_honours_year = student.honours_module_choices[student.honours_module_choices['Module code'] == module]['Honours year'].values[0]
+        module_honours_year, _ = student.module_slots[module]
         if int(module_honours_year.split()[1]):
             these_missing_prerequisites, these_adviser_recommendations = get_missing_prerequisites_for_module(module, student)
             list_of_missed_prerequisites += [these_missing_prerequisites]
@@ -36,6 +35,132 @@ def find_missing_prerequisites(student):
 
     return missed_prerequisites, adviser_recommendations
     
+def find_missing_prerequisites_for_cohort(students):
+    """find any missing prerequisites or violated anti-requisites for many students at once.
+    Gives the same results as calling find_missing_prerequisites() for each student, but evaluates
+    the prerequisites of each module only once for all students that selected it.
+    
+    Parameters :
+    -----------
+    
+    students : list of instances of Student class
+        the students to check, e.g. all final year students
+        
+    Returns :
+    ---------
+
+    missing_prerequisites : dictionary
+        the result of find_missing_prerequisites() for each student ID, i.e. a tuple (missed_prerequisites, 
+        adviser_recommendations). Students whose modules cannot be checked are left out, so that they can be
+        checked individually and the error can be reported for them.
+    """
+    module_catalogue = get_module_catalogue()
+
+    # collect one row for each planned honours module of each student
+    row_student_ids = []
+    row_modules = []
+    row_previously_taken_modules = []
+    row_simultaneously_taken_modules = []
+    checked_student_ids = []
+    for student in students:
+        try:
+            these_rows = []
+            for module in student.planned_honours_modules:
+                module_honours_year, _ = student.module_slots[module]
+                if int(module_honours_year.split()[1]):
+                    previously_taken_modules, simultaneously_taken_modules = student.get_modules_taken_before_and_with_module(module)
+                    these_rows.append((module, previously_taken_modules, simultaneously_taken_modules))
+        except Exception:
+            # the student is left out, so that the error is reported when the student is checked individually
+            continue
+        checked_student_ids.append(student.student_id)
+        for module, previously_taken_modules, simultaneously_taken_modules in these_rows:
+            row_student_ids.append(student.student_id)
+            row_modules.append(module)
+            row_previously_taken_modules.append(previously_taken_modules)
+            row_simultaneously_taken_modules.append(simultaneously_taken_modules)
+
+    # the modules of each row as boolean matrices, with one column per module in the module index
+    number_of_rows = len(row_modules)
+    previously_taken_matrix = np.zeros((number_of_rows, len(module_catalogue.module_index)), dtype = bool)
+    simultaneously_taken_matrix = np.zeros_like(previously_taken_matrix)
+    for row_number in range(number_of_rows):
+        previously_taken_matrix[row_number, get_module_positions(row_previously_taken_modules[row_number], module_catalogue)] = True
+        simultaneously_taken_matrix[row_number, get_module_positions(row_simultaneously_taken_modules[row_number], module_catalogue)] = True
+    taken_matrix = previously_taken_matrix | simultaneously_taken_matrix
+
+    # evaluate the pre- and antirequisites of each selected module for all rows at once. Rows that pass all checks
+    # need no further work, all other rows are described with the same code as for a single student
+    row_modules = np.array(row_modules, dtype = object)
+    needs_description = np.zeros(number_of_rows, dtype = bool)
+    for module in np.unique(row_modules):
+        rows = np.flatnonzero(row_modules == module)
+        if module == 'ID4001':
+            needs_description[rows] = True
+        module_record = module_catalogue.get_record(module)
+        if module_record is None:
+            continue
+        prerequisite_expression = module_record.prerequisite_expression
+        if isinstance(prerequisite_expression, PrerequisiteExpression):
+            needs_description[rows] |= ~prerequisite_expression.is_met_for_rows(previously_taken_matrix[rows], 
+                                                                                simultaneously_taken_matrix[rows])
+        elif isinstance(module_record.prerequisites, str):
+            # letters of agreement, MSc modules, and prerequisites that cannot be read
+            needs_description[rows] = True
+        if module_record.antirequisite_codes:
+            antirequisite_positions = get_module_positions(module_record.antirequisite_codes, module_catalogue)
+            needs_description[rows] |= taken_matrix[np.ix_(rows, antirequisite_positions)].any(axis = 1)
+
+    missed_prerequisites_lists = {student_id: [] for student_id in checked_student_ids}
+    recommendations_lists = {student_id: [] for student_id in checked_student_ids}
+    failed_student_ids = set()
+    for row_number in range(number_of_rows):
+        student_id = row_student_ids[row_number]
+        if not needs_description[row_number]:
+            missed_prerequisites_lists[student_id].append('None')
+            recommendations_lists[student_id].append('None')
+            continue
+        try:
+            previously_taken_mask = module_catalogue.get_module_bitmask(row_previously_taken_modules[row_number])
+            simultaneously_taken_mask = module_catalogue.get_module_bitmask(row_simultaneously_taken_modules[row_number])
+            these_missing_prerequisites, these_adviser_recommendations = describe_missing_prerequisites(row_modules[row_number],
+                                                                                                        previously_taken_mask,
+                                                                                                        simultaneously_taken_mask)
+        except Exception:
+            failed_student_ids.add(student_id)
+            continue
+        missed_prerequisites_lists[student_id].append(these_missing_prerequisites)
+        recommendations_lists[student_id].append(these_adviser_recommendations)
+
+    missing_prerequisites = dict()
+    for student_id in checked_student_ids:
+        if student_id not in failed_student_ids:
+            missing_prerequisites[student_id] = (merge_list_to_long_string(missed_prerequisites_lists[student_id]),
+                                                 merge_list_to_long_string(recommendations_lists[student_id]))
+
+    return missing_prerequisites
+
+def get_module_positions(module_codes, module_catalogue):
+    """Get the columns of the given modules in module matrices, i.e. their positions in the module index.
+    
+    Parameters :
+    ------------
+    
+    module_codes : list of strings
+        the module codes
+        
+    module_catalogue : instance of ModuleCatalogue
+        the module catalogue
+        
+    Returns :
+    ---------
+
+    module_positions : list of ints
+        the positions. Modules that the catalogue does not know about are left out.
+    """
+    return [module_catalogue.module_index[module_code] for module_code in module_codes 
+            if module_code in module_catalogue.module_index]
+
 def get_missing_prerequisites_for_module(module, student):
     """Find which prerequisites the student is missing for the given module.
     Will also check anti-requisites.
@@ -52,6 +177,40 @@ def get_missing_prerequisites_for_module(module, student):
     Returns :
     ---------
 
+    missed_prerequisites : string
+        missing prerequisites and violated anti-requisites
+        
+    adviser_recommendation : string
+        any relevant adviser recommndations for this module
+    """
+    previously_taken_modules, simultaneously_taken_modules = student.get_modules_taken_before_and_with_module(module)
+
+    # turn the lists of modules into bitmasks, so that each pre- and antirequisite can be checked with a bitwise operation
+    module_catalogue = get_module_catalogue()
+    previously_taken_mask = module_catalogue.get_module_bitmask(previously_taken_modules)
+    simultaneously_taken_mask = module_catalogue.get_module_bitmask(simultaneously_taken_modules)
+
+    return describe_missing_prerequisites(module, previously_taken_mask, simultaneously_taken_mask)
+
+def describe_missing_prerequisites(module, previously_taken_mask, simultaneously_taken_mask):
+    """Write down which prerequisites of a module are missing and which anti-requisites are violated,
+    given the modules that the student has taken.
+    
+    Parameters :
+    ------------
+    
+    module : string
+        module code for the module that we are investigating
+        
+    previously_taken_mask : int
+        bitmask of the modules the student has taken before the module
+        
+    simultaneously_taken_mask : int
+        bitmask of the modules the student is taking in the same semester as the module
+        
+    Returns :
+    ---------
+
     missed_prerequisites : string
         missing prerequisites and violated anti-requisites
         
@@ -62,36 +221,11 @@ def get_missing_prerequisites_for_module(module, student):
     missed_prerequisites_list = []
     adviser_recommendations_list = []
 
-    # find which year and semester the module is selected for
-    year_of_this_module = student.honours_module_choices[student.honours_module_choices['Module code'] == module]['Honours year'].values[0]
-    year_number_of_this_module = int(year_of_this_module[-1])
-    semester_of_this_module = student.honours_module_choices[student.honours_module_choices['Module code'] == module]['Semester'].values[0]
-
-    # construct a list of all courses the student has taken by then
-    # and construct a list of all modules the student is taking concurrently
-    previously_taken_modules = student.passed_modules.copy()
-    simultaneously_taken_modules = []
-    # we need this one for anti-requisites below
-    modules_taken_in_same_year=[]
-
-    for _, row in student.honours_module_choices.iterrows():
-        year_number = int(row['Honours year'][-1])
-        if year_number < year_number_of_this_module:
-            previously_taken_modules.append(row['Module code'])
-        if semester_of_this_module == 'S2':
-            if row['Honours year'] == year_of_this_module and row['Semester'] == 'S1' :
-                previously_taken_modules.append(row['Module code'])
-        if (row['Honours year'] == year_of_this_module 
-            and row['Semester'] == semester_of_this_module
-            and row['Module code'] != module):
-            simultaneously_taken_modules.append(row['Module code'])
-        if (row['Honours year'] == year_of_this_module 
-            and row['Module code'] != module):
-            modules_taken_in_same_year.append(row['Module code'])
-
+    module_catalogue = get_module_catalogue()
     # get pre-requisite string for that module
-    if len(module_catalogue[module_catalogue['Module code'] == module])> 0:
-        prerequisites = module_catalogue[module_catalogue['Module code'] == module]['Prerequisites'].values[0]
+    module_record = module_catalogue.get_record(module)
+    if module_record is not None:
+        prerequisites = module_record.prerequisites
     else:
         # The student has chosen a module that doesn't exist. We have flagged this already in the programme requirements,
         # so don't need to do that again here.
@@ -99,63 +233,28 @@ def get_missing_prerequisites_for_module(module, student):
         prerequisites = float('nan')
 
     # if the prerequsites are not empty
-    if  isinstance(prerequisites,str) and module!='MT5867':
-        prerequisite_list = prerequisites.split()
-        # if there is only one prerequisite we can easily parse that
-        if len(prerequisite_list) == 1:
-            # this must be a module code now
-            required_module = prerequisite_list[0]
-            if required_module not in previously_taken_modules:
-                missed_prerequisites_list.append('Student is missing prerequisite ' + required_module + ' for module ' + module)
+    if isinstance(prerequisites,str):
         # sometiems it's just a letter of agreement that we need to know about
-        elif prerequisites == 'Letter of Agreement':
-                adviser_recommendations_list.append('Module ' + module + ' requires a letter of agreement')
+        if prerequisites == 'Letter of Agreement':
+            adviser_recommendations_list.append('Module ' + module + ' requires a letter of agreement')
         elif prerequisites == 'Students must have gained admission onto an MSc programme':
             missed_prerequisites_list.append('Student cannot take module ' + module + ' as this module is only available to Msc students')
-        else:
-            #now there is a boolean statement coming, so we turn the module codes into boolean strings and evaluate the outcome
-            # (thanks, ChatGPT)
-            module_codes = re.findall(r'[A-Z]{2}\d{4}', prerequisites)
-            parsed_prerequisites = prerequisites
-            for module_code in module_codes:
-                # co-requisites are preceded by the word co-requisite and don't have brackets after
-                if module_code in prerequisite_list:
-                    location_index = prerequisite_list.index(module_code)
-                    if location_index > 0:
-                        if prerequisite_list[location_index - 1] == 'co-requisite':
-                            if module_code in previously_taken_modules or module_code in simultaneously_taken_modules:
-                                parsed_prerequisites = parsed_prerequisites.replace(module_code, 'True')
-                            else:
-                                parsed_prerequisites = parsed_prerequisites.replace(module_code, 'False')
-                            parsed_prerequisites = parsed_prerequisites.replace('co-requisite ', '')
-                        else: 
-                            # the location index is larger than one but we are not at a co-requisite
-                            if module_code in previously_taken_modules:
-                                parsed_prerequisites = parsed_prerequisites.replace(module_code, 'True')
-                            else:
-                                parsed_prerequisites = parsed_prerequisites.replace(module_code, 'False')
-                    # the location index is zero and we just check the module code
-                    if module_code in previously_taken_modules:
-                        parsed_prerequisites = parsed_prerequisites.replace(module_code, 'True')
-                    else:
-                        parsed_prerequisites = parsed_prerequisites.replace(module_code, 'False')
+        elif module_record.prerequisite_expression is not None:
+            # the prerequisites have been compiled into an expression when the catalogue was loaded
+            prerequisite_expression = module_record.prerequisite_expression
+            if isinstance(prerequisite_expression, Exception):
+                raise prerequisite_expression
+            if not prerequisite_expression.is_met(previously_taken_mask, simultaneously_taken_mask):
+                requirement = prerequisite_expression.requirement
+                if isinstance(requirement, ModuleRequirement) and not requirement.is_corequisite:
+                    # if there is only one prerequisite we just name it
+                    missed_prerequisites_list.append('Student is missing prerequisite ' + requirement.module_code + ' for module ' + module)
+                elif isinstance(requirement, NumberOf):
+                    missed_prerequisites_list.append('Student is missing prerequisite [' + prerequisites + '] for module ' + module)
                 else:
-                    if module_code in previously_taken_modules:
-                        parsed_prerequisites = parsed_prerequisites.replace(module_code, 'True')
-                    else:
-                        parsed_prerequisites = parsed_prerequisites.replace(module_code, 'False')
-            prerequisites_are_met = eval(parsed_prerequisites)
-            if not prerequisites_are_met:
-                missed_prerequisites_list.append('Student is missing prerequisite [' + prerequisites+ '] for module ' + module + 
-                                                 ' ([' + parsed_prerequisites + '])')
-            
-    # MT5867 is a special case that I don't know how to parse automatically:
-    if module == 'MT5867':
-        prerequisites = 'two of (MT3505, MT4003, MT4004, MT4512, MT4514, MT4515, MT4526)'
-        list_of_modules = ['MT3505', 'MT4003', 'MT4004', 'MT4512', 'MT4514', 'MT4515', 'MT4526']
-        number_of_matching_modules = len(set.intersection(set(list_of_modules), set(previously_taken_modules)))
-        if number_of_matching_modules <2:
-            missed_prerequisites_list.append('Student is missing prerequisite [' + prerequisites + '] for module MT5867')
+                    evaluated_prerequisites = prerequisite_expression.get_evaluated_text(previously_taken_mask, simultaneously_taken_mask)
+                    missed_prerequisites_list.append('Student is missing prerequisite [' + prerequisites + '] for module ' + module + 
+                                                     ' ([' + evaluated_prerequisites + '])')
     
     if module == 'ID4001':
         adviser_recommendations_list.append('Module ID4001 requires application and interview in the previous semester.')
@@ -163,19 +262,19 @@ def get_missing_prerequisites_for_module(module, student):
     
     # now check anti-requisites:
     # to do so, get the anti-requisites
-    if len(module_catalogue[module_catalogue['Module code'] == module])> 0:
-        antirequisites = module_catalogue[module_catalogue['Module code'] == module]['Antirequisites'].values[0]
+    if module_record is not None:
+        antirequisites = module_record.antirequisites
     else:
         # The student has chosen a module that doesn't exist. We have flagged this already in the programme requirements,
         # so don't need to do that again here.
         # choosing this because that's what pandas would return if the entry was just empty
         antirequisites = float('nan')
 
-    if isinstance(antirequisites, str):
+    taken_mask = previously_taken_mask | simultaneously_taken_mask
+    if isinstance(antirequisites, str) and taken_mask & module_record.antirequisite_mask:
         # check any listed module code individually
-        anti_module_codes = re.findall(r'[A-Z]{2}\d{4}', antirequisites)
-        for module_code in anti_module_codes:
-            if module_code in previously_taken_modules or module_code in simultaneously_taken_modules:
+        for module_code in module_record.antirequisite_codes:
+            if taken_mask & module_catalogue.get_module_bit(module_code):
                 missed_prerequisites_list.append('Student selected antirequisite ' + module_code + ' for module ' + module)
 
     
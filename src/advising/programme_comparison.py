@@ -0,0 +1,136 @@
+from .infrastructure import *
+
+def load_student_for_programme(argument, programme_name = None, year_of_study = None, student_record_store = None):
+    """Load a student from a module choice form or from the student data base, as process_form_file_or_student_id() does.
+
+    Parameters:
+    -----------
+
+    argument : string or int
+        the name of a module choice form, or a student ID
+
+    programme_name : string
+        the programme of the student, which sets the length of their programme and their honours years.
+        If this is None, the programme in the student data base is used.
+
+    year_of_study : int
+        the year of study if it should be overwritten and not taken from the student data base
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    Returns:
+    --------
+
+    student : instance of Student class or string
+        the student. If it's a string then it's a warning
+    """
+    if isinstance(argument, str):
+        return parse_excel_form(argument, programme_name = programme_name, year_of_study = year_of_study,
+                                student_record_store = student_record_store)
+    elif isinstance(argument, numbers.Integral):
+        return collect_student_data(argument, programme_name = programme_name, year_of_study = year_of_study,
+                                    student_record_store = student_record_store)
+    else:
+        raise(ValueError('Could not read argument of load_student_for_programme, it is not an int or a string'))
+
+def compare_programmes_for_student(argument, year_of_study = None, student_record_store = None):
+    """Check a student against the requirements of every programme in programme_rule_dictionary, e.g. to advise a
+    student who is considering a transfer. Gives the same results as checking the student with each programme
+    given as programme_name, but the student is only loaded once for each length of programme, since their honours
+    years depend on it, and their modules are only collected once for all programmes of that length.
+
+    Parameters:
+    -----------
+
+    argument : string or int
+        the name of a module choice form, or a student ID
+
+    year_of_study : int
+        the year of study if it should be overwritten and not taken from the student data base
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+
+    Returns:
+    --------
+
+    programme_comparison : pandas data frame or string
+        one row per programme, with the columns 'Programme name', 'Current programme', 'Number of unmet requirements',
+        'Unmet requirements' and 'Adviser recommendations', sorted by the number of unmet requirements. If it's a string
+        then it's a warning
+    """
+    student_or_warning = load_student_for_programme(argument, year_of_study = year_of_study, student_record_store = student_record_store)
+    if isinstance(student_or_warning, str):
+        return student_or_warning
+    student = student_or_warning
+    current_programme_name = student.programme_name
+
+    # the programmes of each length, and the student loaded for that length
+    programme_names_by_programme_length = dict()
+    for programme_name in programme_rule_dictionary:
+        programme_names_by_programme_length.setdefault(get_programme_years(programme_name), []).append(programme_name)
+    students_by_programme_length = {get_programme_years(current_programme_name): student}
+
+    programme_comparison_list = []
+    for programme_length, programme_names in programme_names_by_programme_length.items():
+        if programme_length not in students_by_programme_length:
+            students_by_programme_length[programme_length] = load_student_for_programme(argument, programme_names[0], year_of_study,
+                                                                                        student_record_store)
+        this_student = students_by_programme_length[programme_length]
+        if isinstance(this_student, str):
+            colour_code_print_statement(this_student)
+            continue
+        programme_results = find_missing_programme_requirements_for_programmes(this_student, programme_names)
+        for programme_name, (missed_requirements, adviser_recommendations, number_of_missed_requirements) in programme_results.items():
+            programme_comparison_list.append([programme_name, 'Yes' if programme_name == current_programme_name else '',
+                                              number_of_missed_requirements, missed_requirements, adviser_recommendations])
+
+    programme_comparison = pd.DataFrame(programme_comparison_list, columns = ['Programme name', 'Current programme', 'Number of unmet requirements',
+                                                                              'Unmet requirements', 'Adviser recommendations'])
+    programme_comparison = programme_comparison.sort_values(by = ['Number of unmet requirements', 'Programme name'], ignore_index = True)
+
+    return programme_comparison
+
+def save_programme_comparison(argument, filename, year_of_study = None, student_record_store = None):
+    """Rank all programmes by the number of requirements that a student does not meet, and save the ranking
+    into an excel file. This is what 'python advising_tool.py STUDENT_ID --all-programmes' does.
+
+    Parameters:
+    -----------
+
+    argument : string or int
+        the name of a module choice form, or a student ID
+
+    filename : string
+        an excel file
+
+    year_of_study : int
+        the year of study if it should be overwritten and not taken from the student data base
+
+    student_record_store : instance of StudentRecordStore
+        the loaded student data bases. If this is None, the data bases will be loaded once per process.
+    """
+    print('Comparing all programmes for file or student')
+    print(str(argument))
+    print(' ')
+
+    programme_comparison = compare_programmes_for_student(argument, year_of_study, student_record_store)
+    if isinstance(programme_comparison, str):
+        colour_code_print_statement('Could not process ' + str(argument) + '. ' + programme_comparison)
+        return
+
+    for programme_name, current_programme, number_of_missed_requirements in programme_comparison[['Programme name', 'Current programme',
+                                                                                                  'Number of unmet requirements']].itertuples(index = False):
+        programme_line = str(number_of_missed_requirements) + ' unmet requirements: ' + programme_name
+        if current_programme == 'Yes':
+            programme_line += ' (current programme)'
+        print(programme_line)
+    print(' ')
+
+    file_root, file_extension = os.path.splitext(filename)
+    if file_extension != '.xlsx':
+        filename = file_root + '.xlsx'
+    programme_comparison.to_excel(filename, sheet_name = 'Programmes', index = False)
+
+    print('Saved the ranking of ' + str(len(programme_comparison)) + ' programmes in ' + filename)
@@ -1,6 +1,6 @@
 import collections
 from .infrastructure import *
-import pandas as pd
+from .programme_rules import *
 
 # a dictionary of possible joint projects
 joint_project_dictionary = {}
@@ -17,8 +17,245 @@ joint_project_dictionary['Master of Arts (Honours) International Relations and M
 joint_project_dictionary['Master of Arts (Honours) Arabic and Mathematics'] = ['ML4794']
 joint_project_dictionary['Master of Arts (Honours) Mathematics and Psychology'] = ['PN4797']
 
-def find_missing_programme_requirements(student):
-    """check that the student fulfils their honours requirements
+def compile_programme_rules():
+    """Compile the programme requirements into rule objects. Each programme has a list of rules, which
+    are checked in order by find_missing_programme_requirements(). To add a programme, add its list of rules here.
+
+    Returns:
+    --------
+
+    programme_rules : dictionary
+        the list of rules for each programme name
+    """
+    MT350X_modules = ['MT3501', 'MT3502', 'MT3503', 'MT3504', 'MT3505', 'MT3506', 'MT3507', 'MT3508']
+    statistics_modules = ['MT4527', 'MT4528', 'MT4530', 'MT4537', 'MT4539', 'MT4607', 'MT4608', 'MT4609', 'MT4614']
+    dip_down_message = 'Student is taking more than 2 modules as dip-down or dip-across, which is not allowed'
+
+    # rules that are shared between programmes
+    no_joint_projects = ForbiddenModules(['MT4794', 'MT4795', 'MT4796', 'MT4797'], 'Student is taking a module in MT4794-MT4797')
+    planned_2000_level_modules = MatchingModules(('planned modules',), module_is_in_categories('MT2'),
+                                                 'Student is planning to take 2000 level modules (which will require permission)',
+                                                 maximum_number = 0, is_recommendation = True)
+    planned_non_MT_modules = MatchingModules(('planned modules',), module_is_in_none_of_categories('MT2', 'MT3', 'MT4', 'MT5', 'ID5059'),
+                                             'Student is planning to take non-MT modules, which requires permission and may affect credit balance',
+                                             maximum_number = 0, is_recommendation = True)
+    planned_joint_dip_down_modules = MatchingModules(('planned modules',), module_is_in_categories('MT2', 'ID4001', 'VP'),
+                                                     'Student is planning to take 2000 level modules or ID4001 or VP modules (which all require permission)',
+                                                     maximum_number = 0, is_recommendation = True)
+    joint_honours_credits = HonoursCredits(240, (4, 5), 90, 'Student is not taking a total of 90 credits at 4000 level.',
+                                           'This is a joint honours programme and the adviser needs to manually check that the student ' +
+                                           'takes a total of 120 credits per year and that they take at least 90 credits at 4000 level')
+
+    programme_rules = dict()
+
+    ### BSC MATHEMATICS REQUIREMENTS
+    programme_rules['Bachelor of Science (Honours) Mathematics'] = [
+        YearlyCredits(),
+        ModulesFromList(MT350X_modules, 4, 'Student is only taking {number}out of MT3501-MT3508'),
+        ModulesFromList(['MT3510', 'MT4111', 'MT4112', 'MT4113'], 1, 'Student is not taking a computing module'),
+        FinalYearProject(['MT4598', 'MT4599'], 'Year 2', several_projects_message = 'Student selected multiple final year projects'),
+        no_joint_projects,
+        MatchingModules(('honours modules',), module_is_in_categories('MT3', 'MT4', 'MT5', 'ID4001', 'ID5059'), dip_down_message, minimum_number = 14),
+        MatchingModules(('honours modules',), module_is_in_categories('MT4', 'MT5'),
+                        'Student is not planning to take enough credits at 4000 level or above', minimum_number = 6),
+        MatchingModules(('planned modules',), module_is_in_categories('MT5', 'ID5059'),
+                        'Student is planning to take 5000 level modules (which will require permission)', maximum_number = 0, is_recommendation = True),
+        planned_2000_level_modules,
+        planned_non_MT_modules]
+    programme_rules['Master of Arts (Honours) Mathematics'] = programme_rules['Bachelor of Science (Honours) Mathematics']
+
+    ### MMATH REQUIREMENTS ###
+    programme_rules['Master in Mathematics (Honours) Mathematics'] = [
+        YearlyCredits(),
+        ModulesFromList(['MT3501', 'MT3502', 'MT3503', 'MT3504'], 4, 'Student is only taking {number} modules out of MT3501-MT3504'),
+        ModulesFromList(['MT3507', 'MT3508'], 1, 'Student is not taking a module in [MT3507,MT3508]'),
+        ModulesFromList(['MT3510', 'MT4111', 'MT4112', 'MT4113', 'MT5611'], 1, 'Student is not taking a computing module'),
+        FinalYearProject(['MT5599'], 'Year 3'),
+        MatchingModules(('honours modules',), module_is_in_categories('MT3', 'MT4', 'MT5', 'ID4001', 'ID5059'), dip_down_message, minimum_number = 21),
+        MatchingModules(('honours modules',), module_is_in_categories('MT5', 'ID5059'),
+                        'Student is not planning to take enough credits at 5000 level', minimum_number = 7),
+        planned_2000_level_modules,
+        planned_non_MT_modules]
+
+    ### MMATH APPLIED REQUIREMENTS ###
+    programme_rules['Master in Mathematics (Honours) Applied Mathematics'] = [
+        YearlyCredits(),
+        ModulesFromList(['MT3501', 'MT3502', 'MT3503', 'MT3504', 'MT3506'], 5,
+                        'Student is not taking all of [MT3501, MT3502, MT3503, MT3504, MT3506]'),
+        ModulesFromList(['MT3510', 'MT4111', 'MT4112'], 1, 'Student is not taking a computing module'),
+        ModulesFromList(['MT4005', 'MT4507', 'MT4508', 'MT4509', 'MT4510', 'MT4511', 'MT4551', 'MT4552', 'MT4553'], 3,
+                        'Student is not taking sufficiently many 4000 level applied modules'),
+        ModulesFromList(['MT5802', 'MT5806', 'MT5809', 'MT5810', 'MT5840', 'MT5842', 'MT5846', 'MT5849', 'MT5850', 'MT5853',
+                         'MT5854', 'MT5855', 'MT5856', 'MT5590', 'MT5990'], 3,
+                        'Student is not taking sufficiently many 5000 level applied modules'),
+        FinalYearProject(['MT5599'], 'Year 3'),
+        MatchingModules(('honours modules',), module_is_in_categories('MT3', 'MT4', 'MT5', 'ID4001', 'ID5059'), dip_down_message, minimum_number = 21),
+        MatchingModules(('honours modules',), module_is_in_categories('MT5'),
+                        'Student is not planning to take enough credits at 5000 level', minimum_number = 7),
+        planned_2000_level_modules,
+        planned_non_MT_modules]
+
+    ### MMATH PURE REQUIREMENTS ###
+    programme_rules['Master in Mathematics (Honours) Pure Mathematics'] = [
+        YearlyCredits(),
+        ModulesFromList(['MT3501', 'MT3502', 'MT3503', 'MT3504', 'MT3505', 'MT4003', 'MT4004'], 4,
+                        'Student is only taking {number} modules out of MT3501, MT3502, MT3503, MT3504, MT3505, MT4003, MT4004'),
+        ModulesFromList(['MT3510', 'MT4111', 'MT4112'], 1, 'Student is not taking a computing module'),
+        ModulesFromList(['MT5821', 'MT5823', 'MT5824', 'MT5825', 'MT5826', 'MT5827', 'MT5828', 'MT5829', 'MT5830', 'MT5836',
+                         'MT5837', 'MT5861', 'MT5862', 'MT5863', 'MT5864', 'MT5865', 'MT5866', 'MT5867', 'MT5868', 'MT5869',
+                         'MT5870', 'MT5876', 'MT5877', 'MT5590', 'MT5990'], 4,
+                        'Student is not taking sufficiently many pure modules'),
+        FinalYearProject(['MT5599'], 'Year 3'),
+        MatchingModules(('honours modules',), module_is_in_categories('MT3', 'MT4', 'MT5', 'ID5059'), dip_down_message, minimum_number = 21),
+        planned_2000_level_modules,
+        planned_non_MT_modules]
+
+    ### MMATH STATISTICS REQUIREMENTS ###
+    programme_rules['Master in Mathematics (Honours) Statistics'] = [
+        YearlyCredits(),
+        ModulesFromList(['MT3501', 'MT3507', 'MT3508', 'MT4113', 'MT4606', 'MT5761', 'MT5764'], 7,
+                        'Student is only taking {number} out of [MT3501, MT3507, MT3508, MT4113, MT4606, MT5761, MT5764]'),
+        ModulesFromList(['MT4531', 'MT5731'], 1, 'Student is not taking a module out of [MT4531, MT5731]'),
+        ModulesFromList(statistics_modules, 2, 'Student is only taking {number} instead of 2 out of [' + ', '.join(statistics_modules) + ']',
+                        code_prefix = 'MT457'),
+        ModulesFromList(['MT5751', 'MT5758', 'MT5761', 'MT5762', 'MT5763', 'MT5764', 'MT5765', 'MT5766', 'MT5767', 'ID5059'], 2,
+                        'Student is only taking {number} instead of 2 out MT5751-MT5799, ID5059'),
+        FinalYearProject(['MT5599'], 'Year 3'),
+        MatchingModules(('honours modules',), module_is_in_categories('MT3', 'MT4', 'MT5', 'ID5059'), dip_down_message, minimum_number = 21),
+        MatchingModules(('honours modules',), module_is_in_categories('MT5', 'ID5059'),
+                        'Student is not planning to take enough credits at 5000 level', minimum_number = 7),
+        planned_2000_level_modules,
+        planned_non_MT_modules]
+
+    ### MA STATISTICS REQUIREMENTS ###
+    programme_rules['Bachelor of Science (Honours) Statistics'] = [
+        YearlyCredits(),
+        ModulesFromList(['MT3501', 'MT3507', 'MT3508', 'MT4606', 'MT4531'], 5,
+                        'Student is not taking all of MT3501, MT3507, MT3508, MT4606, MT4531'),
+        ModulesFromList(['MT4113'], 1, 'Student is not taking a computing module'),
+        ModulesFromList(statistics_modules, 2, 'Student is not taking sufficiently many statistics modules', code_prefix = 'MT457'),
+        FinalYearProject(['MT4598', 'MT4599'], 'Year 2'),
+        no_joint_projects,
+        MatchingModules(('honours modules',), module_is_in_categories('MT3', 'MT4', 'MT5', 'ID4001', 'ID5059'), dip_down_message, minimum_number = 14),
+        MatchingModules(('honours modules',), module_is_in_categories('MT4', 'MT5'),
+                        'Student is not planning to take enough credits at 4000 level or above', minimum_number = 6),
+        MatchingModules(('planned modules',), module_is_in_categories('MT5'),
+                        'Student is planning to take 5000 level modules (which will require permission)', maximum_number = 0, is_recommendation = True),
+        planned_2000_level_modules,
+        planned_non_MT_modules]
+    programme_rules['Master of Arts (Honours) Statistics'] = programme_rules['Bachelor of Science (Honours) Statistics']
+
+    ### MASTER IN CHEMISTRY WITH MATHEMATICS REQUIREMENTS ###
+    # the conditions on year 4 and 5 are different for this programme
+    programme_rules['Master in Chemistry (Honours) Chemistry with Mathematics'] = [
+        ModulesFromList(MT350X_modules, 3, 'Student is only taking {number} modules out of MT3501-MT3508 in years 3 and 4 (instead of 3)',
+                        module_sets = ('Year 1', 'Year 2')),
+        MatchingModules(('Year 1', 'Year 2'), module_is_in_categories('MT3', 'MT4'),
+                        'Student is not taking 90 credits in MT modules in year 3 and 4', minimum_number = 6),
+        MatchingModules(('Year 3',), module_number_is_between('MT', 5600, 5899),
+                        'Student is taking taking more than 2 MT modules in year 5 (which is not allowed)', maximum_number = 2),
+        MatchingModules(('Year 3',), module_number_is_between('MT', 5600, 5899, is_between = False),
+                        'Student is taking a MT module in year 5 which they are not allowed to take (i.e. outside of MT5600-MT5899)',
+                        maximum_number = 0),
+        ForbiddenModules(['MT4599'], 'Student is taking taking MT4599 (which is not allowed)', module_sets = ('honours modules',)),
+        HonoursCredits(360, (5,), 120, 'Student is not taking a total of 120 credits at 5000 level.',
+                       'This is a joint honours programme and the adviser needs to manually check that the student ' +
+                       'takes a total of 120 credits per year')]
+
+    ### BSC MATH AND PHYSICS REQUIREMENTS
+    # the conditions on year 3 are different for this programme
+    programme_rules['Bachelor of Science (Honours) Mathematics and Physics'] = [
+        AnalysisModules(),
+        MatchingModules(('honours modules',), module_is_in_categories('MT3', 'MT4', 'ID4001'),
+                        'Student planning less than 90 credits (6 modules) in MT modules', minimum_number = 6),
+        FinalYearProject(['MT4796', 'MT4599', 'PH4111'], 'Year 2'),
+        HonoursCredits(240, (4, 5), 90, 'Student is not taking a total of 90 credits at 4000 level.',
+                       'This is a joint honours programme and the adviser needs to manually check that the student ' +
+                       'takes a total of 120 credits per year and that the student takes at least 90 credits at 4000 level')]
+
+    ### MASTER MATHEMATICS AND THEORETICAL PHYSICS REQUIREMENTS
+    all_MT_modules = module_is_in_categories('MT2', 'MT3', 'MT4', 'MT5', 'ID5059')
+    programme_rules['Master in Physics (Honours) Mathematics and Theoretical Physics'] = [
+        AnalysisModules(),
+        ModulesFromList(['MT3501'], 1, 'Student is not taking MT3501 in year 3, which is a requirement',
+                        module_sets = ('Year 1', 'passed modules')),
+        ModulesFromList(['MT3503', 'PH4028'], 1, 'Student is not taking one of [MT3503, PH4028] in year 4', module_sets = ('Year 2',)),
+        MatchingModules(('honours modules',), all_MT_modules, 'Student planning less then 135 credits (9 modules) in MT modules',
+                        minimum_number = 9, only_without_module = 'MT5599'),
+        MatchingModules(('honours modules',), all_MT_modules, 'Student planning less then 135 credits (8 modules + MT5599) in MT modules',
+                        minimum_number = 8, only_with_module = 'MT5599'),
+        MatchingModules(('honours modules',), module_is_in_categories('MT2'),
+                        'Student is taking more than 2 modules as dip-down, which is not allowed', maximum_number = 2),
+        FinalYearProject(['MT5599', 'PH5103'], 'Year 3'),
+        planned_2000_level_modules,
+        HonoursCredits(360, (5,), 120, 'Student is not taking a total of 120 credits at 5000 level.',
+                       'This is a joint honours programme and the adviser needs to manually check that the student ' +
+                       'takes a total of 120 credits per year and that the student takes at least 120 credits at 5000 level')]
+
+    ## Joint honours programms with statistics
+    for programme_name in ['Bachelor of Science (Honours) Computer Science and Statistics',
+                           'Bachelor of Science (Honours) Psychology and Statistics',
+                           'Bachelor of Science (Honours) Economics and Statistics',
+                           'Master of Arts (Honours) Economics and Statistics',
+                           'Bachelor of Science (Honours) Management Science and Statistics']:
+        project_codes = joint_project_dictionary.get(programme_name, []) + ['MT4794', 'MT4796', 'MT4599']
+        programme_rules[programme_name] = [
+            ModulesFromList(MT350X_modules, 3, 'Student is only taking {number} modules out of MT3501-MT3508 (instead of 3)'),
+            ModulesFromList(['MT4531', 'MT4606'], 1, 'Student not taking a module in [MT4531,MT4606]'),
+            ModulesFromList(['MT4113'] + statistics_modules, 1, 'Student not taking a module in [' + ', '.join(['MT4113'] + statistics_modules) + ']',
+                            code_prefix = 'MT457'),
+            FinalYearProject(project_codes, 'Year 2'),
+            JointHonoursModuleBalance(other_allowed_modules = ['CS4796']),
+            planned_joint_dip_down_modules,
+            joint_honours_credits]
+
+    ### JOINT HONOURS REQUIREMENTS ###
+    for programme_name in ['Bachelor of Science (Honours) Computer Science and Mathematics',
+                           'Master of Arts (Honours) Mathematics and Philosophy',
+                           'Bachelor of Science (Honours) Chemistry and Mathematics',
+                           'Bachelor of Science (Honours) Mathematics and Psychology (BPS Recognition Route)',
+                           'Bachelor of Science (Honours) Mathematics and Psychology',
+                           'Master of Arts (Honours) Mathematics and Psychology',
+                           'Master of Arts (Honours) English and Mathematics',
+                           'Bachelor of Science (Honours) Mathematics and Philosophy',
+                           'Master of Arts (Honours) Mathematics and Russian',
+                           'Bachelor of Science (Honours) Economics and Mathematics',
+                           'Bachelor of Science (Honours) Geography and Mathematics',
+                           'Bachelor of Science (Honours) Financial Economics and Mathematics',
+                           'Master of Arts (Honours) Financial Economics and Mathematics',
+                           'Master of Arts (Honours) Art History and Mathematics',
+                           'Master of Arts (Honours) Mathematics and Medieval History',
+                           'Bachelor of Science (Honours) Biology and Mathematics',
+                           'Master of Arts (Honours) International Relations and Mathematics',
+                           'Master of Arts (Honours) Economics and Mathematics',
+                           'Master of Arts (Honours) Arabic and Mathematics',
+                           'Master of Arts (Honours) Mathematics and Modern History',
+                           'Bachelor of Science (Honours) Management Science and Mathematics']:
+        project_codes = joint_project_dictionary.get(programme_name, []) + ['MT4794', 'MT4796', 'MT4599']
+        if programme_name == 'Bachelor of Science (Honours) Computer Science and Mathematics':
+            is_5000_level_module = module_is_in_categories('MT5')
+        else:
+            is_5000_level_module = module_is_in_categories('MT5', 'ID5059')
+        programme_rules[programme_name] = [
+            ModulesFromList(MT350X_modules, 3, 'Student is only taking {number} modules out of MT3501-MT3504 (instead of 3)'),
+            FinalYearProject(project_codes, 'Year 2', several_projects_message = 'Student is taking too many final year projects',
+                             wrong_year_message = 'Student is not taking their final year project in their final year',
+                             projects_without_agreement = ['MT4599']),
+            JointHonoursModuleBalance(project_codes = project_codes),
+            MatchingModules(('honours modules',), is_5000_level_module,
+                            'Student is planning to take 5000 level modules (which is not allowed for joint honours students)', maximum_number = 0),
+            planned_joint_dip_down_modules,
+            joint_honours_credits]
+
+    return programme_rules
+
+# the compiled rules of each programme
+programme_rule_dictionary = compile_programme_rules()
+
+
+def find_general_module_choice_issues(student):
+    """flag the issues with the module choices of a student that do not depend on their programme, i.e. duplicate
+    modules, z-coded, deferred, s-coded modules, modules awaiting reassessment, and study abroad.
     
     Parameters :
     -----------
@@ -29,11 +266,11 @@ def find_missing_programme_requirements(student):
     Returns :
     ---------
 
-    missed_requirements : string
-        Unmet programme requirements. Will return 'None' if all programme requirements are met
+    list_of_missed_requirements : list of strings
+        the issues that count as unmet programme requirements
         
-    adviser_recommendations : string
-        advising recommendations that don't strictly count as unmet programme requirements
+    list_of_adviser_recommendations : list of strings
+        the issues that the adviser should look at
     """
     
     list_of_missed_requirements = []
@@ -100,779 +337,37 @@ def find_missing_programme_requirements(student):
         list_of_adviser_recommendations.append(advise_string)
     
     # Check for study abroad
-    student_studied_abroad = (any('J' in item for item in student.full_module_list) or 
-                              any('MTSAU' in item for item in student.full_module_list) or
-                              any('MT30' in item for item in student.full_module_list))
-
-    if student_studied_abroad:
+    if student.studied_abroad:
         list_of_missed_requirements.append('Student studied abroad and will require manual checking - flagged issues can be wrong')
-    
-    ### BSC MATHEMATICS REQUIREMENTS
-    if ( student.programme_name  == 'Bachelor of Science (Honours) Mathematics' or
-         student.programme_name  == 'Master of Arts (Honours) Mathematics'):
-        # check the credit load
-        missed_requirement, adviser_recommendation = check_for_120_credits_each_year(student)
-        list_of_missed_requirements.append(missed_requirement)
-        list_of_adviser_recommendations.append(adviser_recommendation)
-
-        # check there are four modules in MT3501 to MT3508
-        list_of_MT350X_modules = ['MT3501', 'MT3502', 'MT3503', 'MT3504', 'MT3505', 'MT3506', 'MT3507', 'MT3508']
-        number_of_MT350X_modules = student.get_number_of_modules_in_list(list_of_MT350X_modules)
-        if number_of_MT350X_modules < 4:
-            list_of_missed_requirements.append('Student is only taking ' + str(number_of_MT350X_modules) + 'out of MT3501-MT3508')
-            
-        # check there is a computing module
-        list_of_computing_modules = ['MT3510', 'MT4111', 'MT4112', 'MT4113']
-        number_of_computing_modules = student.get_number_of_modules_in_list(list_of_computing_modules)
-        if number_of_computing_modules ==0:
-            list_of_missed_requirements.append('Student is not taking a computing module')
-        
-        # check there is a final year project
-        list_of_project_codes = ['MT4598', 'MT4599']
-        number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-        if number_final_year_projects <1:
-            list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        elif number_final_year_projects >1:
-            list_of_missed_requirements.append('Student selected multiple final year projects')
-        else:
-            # check that the student is actually taking it in year 4
-            if 'MT4598' in student.full_module_list:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT4598']['Honours year'].iloc[0]
-            else:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT4599']['Honours year'].iloc[0]
-            if this_year != 'Year 2':
-                list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
-        
-        # check that unallowed modules are not taken
-        unallowed_modules = ['MT4794', 'MT4795', 'MT4796', 'MT4797']
-        number_of_unallowed_modules = student.get_number_of_modules_in_list(unallowed_modules)
-        if number_of_unallowed_modules >0:
-            list_of_missed_requirements.append('Student is taking a module in MT4794-MT4797')
-            
-        # # check dip-down and dip-across: no more than two modules should be outside of MT3X to MT5X
-        # list_of_all_non_honours_modules = [module for module in student.all_honours_modules if 'MT3' not in module 
-        #                                                                                 and 'MT4' not in module 
-        #                                                                                 and 'MT5' not in module
-        #                                                                                 and 'ID4001' not in module
-        #                                                                                 and 'ID5059' not in module]
-        # if len(list_of_all_non_honours_modules) >2:
-        #     list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed.')
-            
-        list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT3' in module 
-                                                                                        or 'MT4' in module 
-                                                                                        or 'MT5' in module
-                                                                                        or 'ID4001' in module
-                                                                                        or 'ID5059' in module]
-
-        if len(list_of_all_MT_modules) <14:
-            list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed')
- 
-        # check that there are at least 90 credits (6 modules) at 4000 level or above
-        list_of_4000_and_5000_modules = [module for module in student.all_honours_modules if 'MT4' in module or 'MT5' in module]
-        if len(list_of_4000_and_5000_modules) <6:
-            list_of_missed_requirements.append('Student is not planning to take enough credits at 4000 level or above')
-
-        # remind advisers to get permissions
-        list_of_planned_5000_level_modules = [module for module in student.planned_honours_modules if 'MT5' in module or 'ID5059' in module]
-        if len(list_of_planned_5000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 5000 level modules (which will require permission)')
-
-        list_of_2000_level_modules = [module for module in student.planned_honours_modules if 'MT2' in module]
-        if len(list_of_2000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 2000 level modules (which will require permission)')
-
-        list_of_planned_non_maths_modules = [module for module in student.planned_honours_modules if 'MT2' not in module 
-                                                                                        and 'MT3' not in module 
-                                                                                        and 'MT4' not in module 
-                                                                                        and 'MT5' not in module
-                                                                                        and 'ID5059' not in module]
-
-        if len(list_of_planned_non_maths_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take non-MT modules, which requires permission and may affect credit balance')
-
-    ### MMATH REQUIREMENTS ###
-    elif student.programme_name == 'Master in Mathematics (Honours) Mathematics':
-        # check the credit load
-        missed_requirement, adviser_recommendation = check_for_120_credits_each_year(student)
-        list_of_missed_requirements.append(missed_requirement)
-        list_of_adviser_recommendations.append(adviser_recommendation)
-
-        # check there are four modules in MT3501 to MT3508
-        list_of_MT350X_modules = ['MT3501', 'MT3502', 'MT3503', 'MT3504']
-        number_of_MT350X_modules = student.get_number_of_modules_in_list(list_of_MT350X_modules)
-        if number_of_MT350X_modules < 4:
-            list_of_missed_requirements.append('Student is only taking ' + str(number_of_MT350X_modules) + ' modules out of MT3501-MT3504')
-            
-        # check there is a module selected from MT3507 and MT3508
-        list_of_statistics_modules = ['MT3507', 'MT3508']
-        number_of_statistics_modules = student.get_number_of_modules_in_list(list_of_statistics_modules)
-        if number_of_statistics_modules == 0:
-            list_of_missed_requirements.append('Student is not taking a module in [MT3507,MT3508]')
- 
-        # check there is a computing module
-        list_of_computing_modules = ['MT3510', 'MT4111', 'MT4112', 'MT4113','MT5611']
-        number_of_computing_modules = student.get_number_of_modules_in_list(list_of_computing_modules)
-        if number_of_computing_modules ==0:
-            list_of_missed_requirements.append('Student is not taking a computing module')
-        
-        # check there is a final year project
-        list_of_project_codes = ['MT5599']
-        number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-        if number_final_year_projects !=1:
-            list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        else:
-            # check that the student is actually taking it in year 5
-            this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT5599']['Honours year'].iloc[0]
-            if this_year != 'Year 3':
-                list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
-        
-        # check dip-down and dip-across: no more than two modules should be outside of MT3X to MT5X
-        list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT3' in module 
-                                                                                        or 'MT4' in module 
-                                                                                        or 'MT5' in module
-                                                                                        or 'ID4001' in module
-                                                                                        or 'ID5059' in module]
-
-        if len(list_of_all_MT_modules) <21:
-            list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed')
-
-        # check that there are at least 120 credits (7 modules) at 5000 level
-        list_of_5000_modules = [module for module in student.all_honours_modules if 'MT5' in module or 'ID5059' in module]
-        if len(list_of_5000_modules) <7:
-            list_of_missed_requirements.append('Student is not planning to take enough credits at 5000 level')
-
-        list_of_2000_level_modules = [module for module in student.planned_honours_modules if 'MT2' in module]
-        if len(list_of_2000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 2000 level modules (which will require permission)')
-
-        list_of_planned_non_maths_modules = [module for module in student.planned_honours_modules if 'MT2' not in module 
-                                                                                        and 'MT3' not in module 
-                                                                                        and 'MT4' not in module 
-                                                                                        and 'MT5' not in module
-                                                                                        and 'ID5059' not in module]
-        if len(list_of_planned_non_maths_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take non-MT modules, which requires permission and may affect credit balance')
-            
-    ### MMATH APPLIED REQUIREMENTS ###
-    elif student.programme_name == 'Master in Mathematics (Honours) Applied Mathematics':
-        # check the credit load
-        missed_requirement, adviser_recommendation = check_for_120_credits_each_year(student)
-        list_of_missed_requirements.append(missed_requirement)
-        list_of_adviser_recommendations.append(adviser_recommendation)
-
-        # check there are four modules in MT3501, MT3502, MT3503, MT3504, MT3506
-        list_of_MT350X_modules = ['MT3501', 'MT3502', 'MT3503', 'MT3504','MT3506']
-        number_of_MT350X_modules = student.get_number_of_modules_in_list(list_of_MT350X_modules)
-        if number_of_MT350X_modules < 5:
-            list_of_missed_requirements.append('Student is not taking all of [MT3501, MT3502, MT3503, MT3504, MT3506]')
-            
-        # check there is a computing module
-        list_of_computing_modules = ['MT3510', 'MT4111', 'MT4112']
-        number_of_computing_modules = student.get_number_of_modules_in_list(list_of_computing_modules)
-        if number_of_computing_modules ==0:
-            list_of_missed_requirements.append('Student is not taking a computing module')
-        
-        # check there are enough applied modules
-        list_of_applied_modules_1 = ['MT4005', 'MT4507', 'MT4508', 'MT4509', 'MT4510', 'MT4511', 'MT4551', 'MT4552', 'MT4553']
-        number_of_applied_modules_1 = student.get_number_of_modules_in_list(list_of_applied_modules_1)
-        if number_of_applied_modules_1 < 3:
-            list_of_missed_requirements.append('Student is not taking sufficiently many 4000 level applied modules')
-      
-        list_of_applied_modules_2 = ['MT5802', 'MT5806', 'MT5809', 'MT5810', 'MT5840', 'MT5842',
-                                     'MT5846','MT5849','MT5850','MT5853','MT5854','MT5855','MT5856','MT5590', 'MT5990']
-        number_of_applied_modules_2 = student.get_number_of_modules_in_list(list_of_applied_modules_2)
-        if number_of_applied_modules_2 < 3:
-            list_of_missed_requirements.append('Student is not taking sufficiently many 5000 level applied modules')
-
-        # check there is a final year project
-        list_of_project_codes = ['MT5599']
-        number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-        if number_final_year_projects !=1:
-            list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        else:
-            # check that the student is actually taking it in year 5
-            this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT5599']['Honours year'].iloc[0]
-            if this_year != 'Year 3':
-                list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
-        
-        # check dip-down and dip-across: no more than two modules should be outside of MT3X to MT5X
-        # list_of_all_non_honours_modules = [module for module in student.all_honours_modules if 'MT3' not in module 
-                                                                                        # and 'MT4' not in module 
-                                                                                        # and 'MT5' not in module
-                                                                                        # and 'ID5059' not in module]
-        # if len(list_of_all_non_honours_modules) >2:
-            # list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed')
-        # check dip-down and dip-across: no more than two modules should be outside of MT3X to MT5X
-        list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT3' in module 
-                                                                                        or 'MT4' in module 
-                                                                                        or 'MT5' in module
-                                                                                        or 'ID4001' in module
-                                                                                        or 'ID5059' in module]
-
-        if len(list_of_all_MT_modules) <21:
-            list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed')
-
-        # check that there are at least 120 credits (7 modules) at 5000 level or above
-        list_of_5000_modules = [module for module in student.all_honours_modules if 'MT5' in module]
-        if len(list_of_5000_modules) <7:
-            list_of_missed_requirements.append('Student is not planning to take enough credits at 5000 level')
-
-        list_of_2000_level_modules = [module for module in student.planned_honours_modules if 'MT2' in module]
-        if len(list_of_2000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 2000 level modules (which will require permission)')
-
-        list_of_planned_non_maths_modules = [module for module in student.planned_honours_modules if 'MT2' not in module 
-                                                                                        and 'MT3' not in module 
-                                                                                        and 'MT4' not in module 
-                                                                                        and 'MT5' not in module
-                                                                                        and 'ID5059' not in module]
-        if len(list_of_planned_non_maths_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take non-MT modules, which requires permission and may affect credit balance')
-
-    ### MMATH PURE REQUIREMENTS ###
-    elif student.programme_name == 'Master in Mathematics (Honours) Pure Mathematics':
-        # check the credit load
-        missed_requirement, adviser_recommendation = check_for_120_credits_each_year(student)
-        list_of_missed_requirements.append(missed_requirement)
-        list_of_adviser_recommendations.append(adviser_recommendation)
-
-        # check there are four modules in MT3501, MT3502, MT3503, MT3504, MT3505, MT4003, MT4004
-        list_of_MT350X_modules = ['MT3501', 'MT3502', 'MT3503', 'MT3504', 'MT3505', 'MT4003', 'MT4004']
-        number_of_MT350X_modules = student.get_number_of_modules_in_list(list_of_MT350X_modules)
-        if number_of_MT350X_modules < 4:
-            list_of_missed_requirements.append('Student is only taking ' + str(number_of_MT350X_modules) + ' modules out of MT3501, MT3502, MT3503, MT3504, MT3505, MT4003, MT4004')
-            
-        # check there is a computing module
-        list_of_computing_modules = ['MT3510', 'MT4111', 'MT4112']
-        number_of_computing_modules = student.get_number_of_modules_in_list(list_of_computing_modules)
-        if number_of_computing_modules ==0:
-            list_of_missed_requirements.append('Student is not taking a computing module')
-        
-        # check there are enough pure modules
-        list_of_pure_modules = ['MT5821', 'MT5823', 'MT5824', 'MT5825', 'MT5826', 'MT5827', 'MT5828', 'MT5829','MT5830', 'MT5836','MT5837', 'MT5861', 'MT5862','MT5863', 'MT5864',
-                                'MT5865','MT5866', 'MT5867', 'MT5868', 'MT5869', 'MT5870', 'MT5876','MT5877', 'MT5590', 'MT5990']
-        number_of_pure_modules = student.get_number_of_modules_in_list(list_of_pure_modules)
-        if number_of_pure_modules < 4:
-            list_of_missed_requirements.append('Student is not taking sufficiently many pure modules')
-      
-        # check there is a final year project
-        list_of_project_codes = ['MT5599']
-        number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-        if number_final_year_projects !=1:
-            list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        else:
-            # check that the student is actually taking it in year 5
-            if len(student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT5599']['Honours year'])>0:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT5599']['Honours year'].iloc[0]
-                if this_year != 'Year 3':
-                    list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
-            else: 
-                list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
-
-        
-        # check dip-down and dip-across: no more than two modules should be outside of MT3X to MT5X
-        # list_of_all_non_honours_modules = [module for module in student.all_honours_modules if 'MT3' not in module 
-        #                                                                                 and 'MT4' not in module 
-        #                                                                                 and 'MT5' not in module
-        #                                                                                 and 'ID5059' not in module]
-
-        list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT3' in module 
-                                                                                        or 'MT4' in module 
-                                                                                        or 'MT5' in module
-                                                                                        or 'ID5059' in module]
-
-        if len(list_of_all_MT_modules) <21:
-            list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed')
-            
-        list_of_2000_level_modules = [module for module in student.planned_honours_modules if 'MT2' in module]
-        if len(list_of_2000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 2000 level modules (which will require permission)')
-
-        list_of_planned_non_maths_modules = [module for module in student.planned_honours_modules if 'MT2' not in module 
-                                                                                        and 'MT3' not in module 
-                                                                                        and 'MT4' not in module 
-                                                                                        and 'MT5' not in module
-                                                                                        and 'ID5059' not in module]
-        if len(list_of_planned_non_maths_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take non-MT modules, which requires permission and may affect credit balance')
- 
-            
-    ### MMATH STATISTICS REQUIREMENTS ###
-    elif student.programme_name == 'Master in Mathematics (Honours) Statistics':
-        # check the credit load
-        missed_requirement, adviser_recommendation = check_for_120_credits_each_year(student)
-        list_of_missed_requirements.append(missed_requirement)
-        list_of_adviser_recommendations.append(adviser_recommendation)
-
-        # Students need to take all fo these:
-        list_of_essential_modules = ['MT3501', 'MT3507', 'MT3508', 'MT4113', 'MT4606', 'MT5761', 'MT5764'] 
-        
-        number_of_essential_modules = student.get_number_of_modules_in_list(list_of_essential_modules)
-        if number_of_essential_modules < 7:
-            list_of_missed_requirements.append('Student is only taking ' + str(number_of_essential_modules) + ' out of [MT3501, MT3507, MT3508, MT4113, MT4606, MT5761, MT5764]')
-        
-        list_one_of_selective_modules = ['MT4531', 'MT5731']
-        number_of_selective_modules_one = student.get_number_of_modules_in_list(list_one_of_selective_modules)
-        if number_of_selective_modules_one < 1:
-            list_of_missed_requirements.append('Student is not taking a module out of [MT4531, MT5731]')
-            
-        list_of_specific_stats_modules = ['MT4527', 'MT4528', 'MT4530', 'MT4537', 'MT4539', 'MT4607', 'MT4608', 'MT4609', 'MT4614']
-        number_of_specific_stats_modules = student.get_number_of_modules_in_list(list_of_specific_stats_modules)
-        number_in_stats_range = sum(module.startswith("MT457") for module in student.full_module_list)
-        number_of_stats_modules = number_of_specific_stats_modules + number_in_stats_range
-        if number_of_stats_modules < 2:
-            list_of_missed_requirements.append('Student is only taking ' + str(number_of_stats_modules) + ' instead of 2 out of [MT4527, MT4528, MT4530, MT4537, MT4539, MT4607, MT4608, MT4609, MT4614]')
-
-        list_of_5000_level_stats_modules = ['MT5751', 'MT5758', 'MT5761', 'MT5762', 'MT5763', 'MT5764', 'MT5765', 'MT5766', 'MT5767', 'ID5059']
-        number_of_5000_level_stats_modules = student.get_number_of_modules_in_list(list_of_5000_level_stats_modules)
-        if number_of_5000_level_stats_modules < 2:
-            list_of_missed_requirements.append('Student is only taking ' + str(number_of_stats_modules) + ' instead of 2 out MT5751-MT5799, ID5059')
-      
-        # check there is a final year project
-        list_of_project_codes = ['MT5599']
-        number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-        if number_final_year_projects !=1:
-            list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        else:
-            # check that the student is actually taking it in year 5
-            this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT5599']['Honours year'].iloc[0]
-            if this_year != 'Year 3':
-                list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
-        
-        # check dip-down and dip-across: no more than two modules should be outside of MT3X to MT5X
-        # list_of_all_non_honours_modules = [module for module in student.all_honours_modules if 'MT3' not in module 
-        #                                                                                 and 'MT4' not in module 
-        #                                                                                 and 'MT5' not in module
-        #                                                                                 and 'ID5059' not in module]
-        # if len(list_of_all_non_honours_modules) >2:
-        #     list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed')
-            
-        list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT3' in module 
-                                                                                        or 'MT4' in module 
-                                                                                        or 'MT5' in module
-                                                                                        or 'ID5059' in module]
-
-        if len(list_of_all_MT_modules) <21:
-            list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed')
-      
-        # check that there are at least 120 credits (7 modules) at 5000 level or above
-        list_of_5000_modules = [module for module in student.all_honours_modules if 'MT5' in module or 'ID5059' in module]
-        if len(list_of_5000_modules) <7:
-            list_of_missed_requirements.append('Student is not planning to take enough credits at 5000 level')
-
-        list_of_2000_level_modules = [module for module in student.planned_honours_modules if 'MT2' in module]
-        if len(list_of_2000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 2000 level modules (which will require permission)')
-
-        list_of_planned_non_maths_modules = [module for module in student.planned_honours_modules if 'MT2' not in module 
-                                                                                        and 'MT3' not in module 
-                                                                                        and 'MT4' not in module 
-                                                                                        and 'MT5' not in module
-                                                                                        and 'ID5059' not in module]
-        if len(list_of_planned_non_maths_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take non-MT modules, which requires permission and may affect credit balance')
-
-    ### MA STATISTICS REQUIREMENTS ###
-    elif ( student.programme_name  == 'Bachelor of Science (Honours) Statistics' or 
-           student.programme_name == 'Master of Arts (Honours) Statistics') :
-        # check the credit load
-        missed_requirement, adviser_recommendation = check_for_120_credits_each_year(student)
-        list_of_missed_requirements.append(missed_requirement)
-        list_of_adviser_recommendations.append(adviser_recommendation)
-
-        # check there are four modules in MT3501, MT3502, MT3503, MT3504, MT3505, MT4003, MT4004
-        list_of_MT350X_modules = ['MT3501', 'MT3507', 'MT3508', 'MT4606', 'MT4531']
-        number_of_MT350X_modules = student.get_number_of_modules_in_list(list_of_MT350X_modules)
-        if number_of_MT350X_modules < 5:
-            list_of_missed_requirements.append('Student is not taking all of MT3501, MT3507, MT3508, MT4606, MT4531')
-            
-        # check there is a computing module
-        list_of_computing_modules = ['MT4113']
-        number_of_computing_modules = student.get_number_of_modules_in_list(list_of_computing_modules)
-        if number_of_computing_modules ==0:
-            list_of_missed_requirements.append('Student is not taking a computing module')
-        
-        # check there are enough statistics modules
-        list_of_specific_stats_modules = ['MT4527', 'MT4528', 'MT4530', 'MT4537', 'MT4539', 'MT4607', 'MT4608', 'MT4609', 'MT4614']
-        number_of_specific_stats_modules = student.get_number_of_modules_in_list(list_of_specific_stats_modules)
-        number_in_stats_range = sum(module.startswith("MT457") for module in student.full_module_list)
-        number_of_statistics_modules = number_of_specific_stats_modules + number_in_stats_range
-        if number_of_statistics_modules < 2:
-            list_of_missed_requirements.append('Student is not taking sufficiently many statistics modules')
-      
-        # check there is a final year project
-        list_of_project_codes = ['MT4598', 'MT4599']
-        number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-        if number_final_year_projects !=1:
-            list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        else:
-            # check that the student is actually taking it in year 4
-            if 'MT4598' in student.full_module_list:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT4598']['Honours year'].iloc[0]
-            else:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT4599']['Honours year'].iloc[0]
-            if this_year != 'Year 2':
-                list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
-
-        # check that unallowed modules are not taken
-        unallowed_modules = ['MT4794', 'MT4795', 'MT4796', 'MT4797']
-        number_of_unallowed_modules = student.get_number_of_modules_in_list(unallowed_modules)
-        if number_of_unallowed_modules >0:
-            list_of_missed_requirements.append('Student is taking a module in MT4794-MT4797')
- 
-        # check dip-down and dip-across: no more than two modules should be outside of MT3X to MT5X
-        # list_of_all_non_honours_modules = [module for module in student.all_honours_modules if 'MT3' not in module 
-        #                                                                                 and 'MT4' not in module 
-        #                                                                                 and 'MT5' not in module
-        #                                                                                 and 'ID5059' not in module]
-        # if len(list_of_all_non_honours_modules) >2:
-        #     list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed')
-            
-        list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT3' in module 
-                                                                                        or 'MT4' in module 
-                                                                                        or 'MT5' in module
-                                                                                        or 'ID4001' in module
-                                                                                        or 'ID5059' in module]
-
-        if len(list_of_all_MT_modules) <14:
-            list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down or dip-across, which is not allowed')
-
-        # check that there are at least 90 credits (6 modules) at 4000 level or above
-        list_of_4000_and_5000_modules = [module for module in student.all_honours_modules if 'MT4' in module or 'MT5' in module]
-        if len(list_of_4000_and_5000_modules) <6:
-            list_of_missed_requirements.append('Student is not planning to take enough credits at 4000 level or above')
-
-        # remind advisers to get permissions
-        list_of_planned_5000_level_modules = [module for module in student.planned_honours_modules if 'MT5' in module]
-        if len(list_of_planned_5000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 5000 level modules (which will require permission)')
-
-        list_of_2000_level_modules = [module for module in student.planned_honours_modules if 'MT2' in module]
-        if len(list_of_2000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 2000 level modules (which will require permission)')
-
-        list_of_planned_non_maths_modules = [module for module in student.planned_honours_modules if 'MT2' not in module 
-                                                                                        and 'MT3' not in module 
-                                                                                        and 'MT4' not in module 
-                                                                                        and 'MT5' not in module
-                                                                                        and 'ID5059' not in module]
-        if len(list_of_planned_non_maths_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take non-MT modules, which requires permission and may affect credit balance')
- 
-
-    ### MASTER IN CHEMISTRY WITH MATHEMATICS REQUIREMENTS ###
-    elif student.programme_name == 'Master in Chemistry (Honours) Chemistry with Mathematics':
-        # This next code is different from other requirements because the conditions on year 4 and 5 are different for this particular
-        # programme
-        full_module_table = pd.concat([student.passed_module_table, student.honours_module_choices], ignore_index=True)
-        reduced_module_table = full_module_table[(full_module_table['Honours year'] == 'Year 1') | (full_module_table['Honours year']=='Year 2')]
-        year_three_and_four_modules = reduced_module_table['Module code'].to_list()
-        
-        second_reduced_module_table = full_module_table[full_module_table['Honours year'] == 'Year 3']
-        year_five_modules = second_reduced_module_table['Module code'].to_list()
-
-        # check there are three modules in MT3501 to MT3508
-        list_of_MT350X_modules = ['MT3501', 'MT3502', 'MT3503', 'MT3504', 'MT3505', 'MT3506', 'MT3507', 'MT3508']
-        number_of_MT350X_modules = len(set.intersection(set(year_three_and_four_modules),set(list_of_MT350X_modules)))
-        if number_of_MT350X_modules < 3:
-            list_of_missed_requirements.append('Student is only taking ' + str(number_of_MT350X_modules) + ' modules out of MT3501-MT3508 in years 3 and 4 (instead of 3)')
-            
-        # check there are 90 credits (6 modules) in MT modules for year 3 and 4
-        list_of_all_MT_modules = [module for module in year_three_and_four_modules if 'MT3' in module 
-                                                                                   or 'MT4' in module]
-
-        if len(list_of_all_MT_modules) < 6:
-            list_of_missed_requirements.append('Student is not taking 90 credits in MT modules in year 3 and 4')
-
-        # check year 5 modules have maximally 30 credits in MT5600-MT5899:
-        number_of_counting_year_5_modules = 0
-        number_of_unallowed_modules = 0
-        for module in year_five_modules:
-            if module.startswith('MT'):
-                module_number = int(module[2:])
-                if module_number > 5600 and module_number< 5899:
-                    number_of_counting_year_5_modules += 1
-                else:
-                    number_of_unallowed_modules += 1
-        
-        if number_of_counting_year_5_modules>2:
-            list_of_missed_requirements.append('Student is taking taking more than 2 MT modules in year 5 (which is not allowed)')
-        
-        if number_of_unallowed_modules > 0:
-            list_of_missed_requirements.append('Student is taking a MT module in year 5 which they are not allowed to take (i.e. outside of MT5600-MT5899)')
-            
-        # Students are not allowed to take MT4599
-        if 'MT4599' in student.all_honours_modules:
-            list_of_missed_requirements.append('Student is taking taking MT4599 (which is not allowed)')
-                
-
-        if 'Credits' in student.passed_module_table and not student.honours_module_choices['Credits'].isnull().any():
-            if get_total_honours_credits(student)<360:
-                list_of_missed_requirements.append('Student is not taking a total of 360 credits across honours.')
-            if get_total_credits_at_level(student,5)<120:
-                list_of_missed_requirements.append('Student is not taking a total of 120 credits at 5000 level.')
-        else:
-            list_of_adviser_recommendations.append('This is a joint honours programme and the adviser needs to manually check that the student \
-takes a total of 120 credits per year')
-
-    ### BSC MATH AND PHYSICS REQUIREMENTS
-    elif student.programme_name == 'Bachelor of Science (Honours) Mathematics and Physics':
-        # This next code is different from other requirements because the conditions on year 3 are different for this particular
-        # programme
-        full_module_table = pd.concat([student.passed_module_table, student.honours_module_choices], ignore_index=True)
-        reduced_module_table = full_module_table[(full_module_table['Honours year'] == 'Year 1')]
-        year_three_modules = reduced_module_table['Module code'].to_list()
-        
-        relevant_subhonours_modules = student.passed_module_table['Module code'].to_list()
-        # Check the analysis part of the requirements
-        student_took_MT2507_and_MT2506 = 'MT2507' in relevant_subhonours_modules and 'MT2506' in relevant_subhonours_modules
-        student_took_MT2502_and_MT2505 = 'MT2502' in relevant_subhonours_modules and 'MT2505' in relevant_subhonours_modules
-        if student.current_honours_year==1:
-            student_takes_3504 = 'MT3504' in year_three_modules or 'MT3504' in student.passed_modules
-            student_takes_3502_and_3505 = ('MT3502' in year_three_modules or 'MT3502' in student.passed_modules) and ('MT3505' in year_three_modules or 'MT3505' in student.passed_modules)
-        else:
-            student_takes_3504 = 'MT3504' in student.planned_honours_modules or 'MT3504' in student.passed_modules
-            student_takes_3502_and_3505 = (('MT3502' in student.planned_honours_modules or 'MT3502' in student.passed_modules) and 
-                                          ('MT3505' in student.planned_honours_modules or 'MT3505' in student.passed_modules))
-
-        if student_took_MT2507_and_MT2506 and student_took_MT2502_and_MT2505:
-            if not student_takes_3504 and not student_takes_3502_and_3505:
-                list_of_missed_requirements.append('Student is not taking MT3504 or (MT3502 and MT3505) (which is required for them)')
-        elif student_took_MT2507_and_MT2506:
-            if not student_takes_3504:
-                list_of_missed_requirements.append('Student is not taking MT3504 in year 3 (which is required for them)')
-        elif student_took_MT2502_and_MT2505:
-            if not student_takes_3502_and_3505:
-                list_of_missed_requirements.append('Student is not taking MT3505 and MT3502 in year 3 (which is a requirement for them)')
-        else:
-            list_of_missed_requirements.append('Student has not yet passed an allowed selection of subhonours MT modules')
- 
-        # check that there are at least 90 credits of MT modules across both honours years
-        list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT3' in module 
-                                                                                   or 'MT4' in module
-                                                                                   or 'ID4001' in module]
-        if len(list_of_all_MT_modules) < 6:
-            list_of_missed_requirements.append('Student planning less than 90 credits (6 modules) in MT modules')
-
-        # check there is a final year project
-        list_of_project_codes = ['MT4796', 'MT4599', 'PH4111']
-        number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-        if number_final_year_projects !=1:
-            list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        else:
-            # check that the student is actually taking it in year 4
-            if 'MT4796' in student.full_module_list:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT4796']['Honours year'].iloc[0]
-            elif 'MT4599' in student.full_module_list:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT4599']['Honours year'].iloc[0]
-            else:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'PH4111']['Honours year'].iloc[0]
-            if this_year != 'Year 2':
-                list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
- 
 
-        if 'Credits' in student.passed_module_table and not student.honours_module_choices['Credits'].isnull().any():
-            if get_total_honours_credits(student)<240:
-                list_of_missed_requirements.append('Student is not taking a total of 240 credits across honours.')
-            if (get_total_credits_at_level(student,4) + get_total_credits_at_level(student,5) ) <90:
-                list_of_missed_requirements.append('Student is not taking a total of 90 credits at 4000 level.')
-        else:
-            list_of_adviser_recommendations.append('This is a joint honours programme and the adviser needs to manually check that the student \
-takes a total of 120 credits per year and that the student takes at least 90 credits at 4000 level')
+    return list_of_missed_requirements, list_of_adviser_recommendations
 
-    ### MASTER MATHEMATICS AND THEORETICAL PHYSICS REQUIREMENTS
-    elif student.programme_name == 'Master in Physics (Honours) Mathematics and Theoretical Physics':
-        # This next code is different from other requirements because the conditions on year 3 are different for this particular
-        # programme
-        full_module_table = pd.concat([student.passed_module_table, student.honours_module_choices], ignore_index=True)
-        reduced_module_table = full_module_table[(full_module_table['Honours year'] == 'Year 1')]
-        year_three_modules = reduced_module_table['Module code'].to_list()
-        
-        second_reduced_module_table = full_module_table[full_module_table['Honours year'] == 'Year 0']
-        relevant_subhonours_modules = student.passed_module_table['Module code'].to_list()
-        
-        third_reduced_module_table = full_module_table[full_module_table['Honours year'] == 'Year 2']
-        year_four_modules = third_reduced_module_table['Module code'].to_list()
-
-        # Check the analysis part of the requirements
-        student_took_MT2507_and_MT2506 = 'MT2507' in relevant_subhonours_modules and 'MT2506' in relevant_subhonours_modules
-        student_took_MT2502_and_MT2505 = 'MT2502' in relevant_subhonours_modules and 'MT2505' in relevant_subhonours_modules
-        if student.current_honours_year==1:
-            student_takes_3504 = 'MT3504' in year_three_modules or 'MT3504' in student.passed_modules
-            student_takes_3502_and_3505 = ('MT3502' in year_three_modules or 'MT3502' in student.passed_modules) and ('MT3505' in year_three_modules or 'MT3505' in student.passed_modules)
-        else:
-            student_takes_3504 = 'MT3504' in student.planned_honours_modules or 'MT3504' in student.passed_modules
-            student_takes_3502_and_3505 = (('MT3502' in student.planned_honours_modules or 'MT3502' in student.passed_modules) and 
-                                          ('MT3505' in student.planned_honours_modules or 'MT3505' in student.passed_modules))
-
-        if student_took_MT2507_and_MT2506 and student_took_MT2502_and_MT2505:
-            if not student_takes_3504 and not student_takes_3502_and_3505:
-                list_of_missed_requirements.append('Student is not taking MT3504 or (MT3502 and MT3505) (which is required for them)')
-        elif student_took_MT2507_and_MT2506:
-            if not student_takes_3504:
-                list_of_missed_requirements.append('Student is not taking MT3504 in year 3 (which is required for them)')
-        elif student_took_MT2502_and_MT2505:
-            if not student_takes_3502_and_3505:
-                list_of_missed_requirements.append('Student is not taking MT3505 and MT3502 in year 3 (which is a requirement for them)')
-        else:
-            list_of_missed_requirements.append('Student has not yet passed an allowed selection of subhonours MT modules')
-                
-        # Check the linear mathematics part of the requirements:
-        if 'MT3501' not in year_three_modules and 'MT3501' not in student.passed_modules:
-            list_of_missed_requirements.append('Student is not taking MT3501 in year 3, which is a requirement')
+def find_missing_programme_requirements(student):
+    """check that the student fulfils their honours requirements
+    
+    Parameters :
+    -----------
+    
+    student : instance of Student class
+        can be generated with 'parse_excel_form()'
         
-        # check fourth year requirement
-        list_of_required_fourth_year_modules = ['MT3503', 'PH4028']
-        number_of_required_fourth_year_modules = len(set.intersection(set(year_four_modules),set(list_of_required_fourth_year_modules)))
-        if number_of_required_fourth_year_modules == 0:
-            list_of_missed_requirements.append('Student is not taking one of [MT3503, PH4028] in year 4')
-            
-        # check that there are at least 135 credits of MT modules (9 modules) across all honours years
-        list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT2' in module 
-                                                                                   or 'MT3' in module 
-                                                                                   or 'MT4' in module
-                                                                                   or 'MT5' in module
-                                                                                   or 'ID5059' in module]
-
-        if len(list_of_all_MT_modules) < 9 and 'MT5599' not in student.all_honours_modules:
-            list_of_missed_requirements.append('Student planning less then 135 credits (9 modules) in MT modules')
-        elif len(list_of_all_MT_modules) < 8 and 'MT5599' in student.all_honours_modules:
-            list_of_missed_requirements.append('Student planning less then 135 credits (8 modules + MT5599) in MT modules')
-
-        # check dip-down 
-        list_of_all_dip_down_modules = [module for module in student.all_honours_modules if 'MT2' in module]
-        if len(list_of_all_dip_down_modules) >2:
-            list_of_missed_requirements.append('Student is taking more than 2 modules as dip-down, which is not allowed')
-
-        # check there is a final year project
-        list_of_project_codes = ['MT5599', 'PH5103']
-        number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-        if number_final_year_projects !=1:
-            list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        else:
-            # check that the student is actually taking it in year 4
-            if 'MT5599' in student.full_module_list:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'MT5599']['Honours year'].iloc[0]
-            elif 'PH5103' in student.full_module_list:
-                this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == 'PH5103']['Honours year'].iloc[0]
-            if this_year != 'Year 3':
-                list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
- 
-        list_of_2000_level_modules = [module for module in student.planned_honours_modules if 'MT2' in module]
-        if len(list_of_2000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 2000 level modules (which will require permission)')
-
-        if 'Credits' in student.passed_module_table and not student.honours_module_choices['Credits'].isnull().any():
-            if get_total_honours_credits(student)<360:
-                list_of_missed_requirements.append('Student is not taking a total of 360 credits across honours.')
-            if get_total_credits_at_level(student,5)<120:
-                list_of_missed_requirements.append('Student is not taking a total of 120 credits at 5000 level.')
-        else:
-            list_of_adviser_recommendations.append('This is a joint honours programme and the adviser needs to manually check that the student \
-takes a total of 120 credits per year and that the student takes at least 120 credits at 5000 level')
-
-    ## Joint honours programms with statistics
-    elif ( student.programme_name == 'Bachelor of Science (Honours) Computer Science and Statistics' or
-           student.programme_name == 'Bachelor of Science (Honours) Psychology and Statistics' or 
-           student.programme_name == 'Bachelor of Science (Honours) Economics and Statistics' or 
-           student.programme_name == 'Master of Arts (Honours) Economics and Statistics' or 
-           student.programme_name == 'Bachelor of Science (Honours) Management Science and Statistics'):
-
-        list_of_MT350X_modules = ['MT3501', 'MT3502', 'MT3503', 'MT3504', 'MT3505', 'MT3506', 'MT3507', 'MT3508']
-        number_of_MT350X_modules = student.get_number_of_modules_in_list(list_of_MT350X_modules)
-        if number_of_MT350X_modules < 3:
-            list_of_missed_requirements.append('Student is only taking ' + str(number_of_MT350X_modules) + ' modules out of MT3501-MT3508 (instead of 3)')
-            
-        list_of_stats_modules_1 = ['MT4531','MT4606']
-        number_of_stats_modules_1 = student.get_number_of_modules_in_list(list_of_stats_modules_1)
-        if number_of_stats_modules_1 == 0:
-            list_of_missed_requirements.append('Student not taking a module in [MT4531,MT4606]')
-
-        list_of_stats_modules_2 = ['MT4113', 'MT4527', 'MT4528', 'MT4530', 'MT4537', 'MT4539', 'MT4607', 'MT4608', 'MT4609', 'MT4614']
-        number_of_specific_stats_modules = student.get_number_of_modules_in_list(list_of_stats_modules_2)
-        number_in_stats_range = sum(module.startswith("MT457") for module in student.full_module_list)
-        number_of_stats_modules_2 = number_of_specific_stats_modules + number_in_stats_range
-        if number_of_stats_modules_2 == 0:
-            list_of_missed_requirements.append('Student not taking a module in [MT4113, MT4527, MT4528, MT4530, MT4537, MT4539, MT4607, MT4608, MT4609, MT4614]')
-
-        # check there is a final year project
-        if student.programme_name in joint_project_dictionary.keys():
-            list_of_project_codes = joint_project_dictionary[student.programme_name]
-        else:
-            list_of_project_codes = []
-        list_of_project_codes += ['MT4794', 'MT4796','MT4599']
+    Returns :
+    ---------
 
-        number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-        if number_final_year_projects !=1:
-            list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        else:
-            (final_year_module_code,) = set.intersection(set(student.full_module_list),set(list_of_project_codes))
-            # check that the student is actually taking it in year 4
-            this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == final_year_module_code]['Honours year'].iloc[0]
-            if this_year != 'Year 2':
-                list_of_missed_requirements.append('Student is not taking their final year project in their final year.')
+    missed_requirements : string
+        Unmet programme requirements. Will return 'None' if all programme requirements are met
         
-        # check that the student is taking at least 120 credits (8 modules) in MT modules (60 modules any code + 15 modules final year project + 45 credits of MT3501-MT3508)
-        # while also checking that there are not too many dip-down ID/VP modules
-        list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT3' in module 
-                                                                                      or 'MT4' in module]
-    
-        list_of_all_allowed_modules = [module for module in student.all_honours_modules if 'MT2' in module 
-                                                                                        or 'MT3' in module 
-                                                                                        or 'MT4' in module
-                                                                                        or 'ID4001' in module
-                                                                                        or 'VP' in module
-                                                                                        or 'CS4796' in module]
-
-        if len(list_of_all_allowed_modules) <8 or len(list_of_all_MT_modules) < 7:
-            if len(list_of_all_MT_modules) < 7 and len(list_of_all_allowed_modules) > 7:
-                list_of_missed_requirements.append('Student is taking too many modules as dip-down or in ID/VP moduels (which is not allowed)')
-            else:
-                list_of_missed_requirements.append('Student is not taking enough credits (less than 8 modules) among MT modules')
+    adviser_recommendations : string
+        advising recommendations that don't strictly count as unmet programme requirements
+    """
     
-        # check planned dip-down
-        list_of_planned_2000_level_modules = [module for module in student.planned_honours_modules if 'MT2' in module
-                                                                                                    or 'ID4001' in module
-                                                                                                    or 'VP' in module]
-        if len(list_of_planned_2000_level_modules) >0:
-            list_of_adviser_recommendations.append('Student is planning to take 2000 level modules or ID4001 or VP modules (which all require permission)')
+    list_of_missed_requirements, list_of_adviser_recommendations = find_general_module_choice_issues(student)
     
-        if 'Credits' in student.passed_module_table and not student.honours_module_choices['Credits'].isnull().any():
-            if get_total_honours_credits(student)<240:
-                list_of_missed_requirements.append('Student is not taking a total of 240 credits across honours.')
-            if ( get_total_credits_at_level(student,4) + get_total_credits_at_level(student,5) )<90:
-                list_of_missed_requirements.append('Student is not taking a total of 90 credits at 4000 level.')
-        else:
-            list_of_adviser_recommendations.append('This is a joint honours programme and the adviser needs to manually check that the student \
-takes a total of 120 credits per year and that they take at least 90 credits at 4000 level')
-
-    ### JOINT HONOURS REQUIREMENTS ###
-    elif student.programme_name in ['Bachelor of Science (Honours) Computer Science and Mathematics',
-                                    'Master of Arts (Honours) Mathematics and Philosophy',
-                                    'Bachelor of Science (Honours) Chemistry and Mathematics',
-                                    'Bachelor of Science (Honours) Mathematics and Psychology (BPS Recognition Route)',
-                                    'Bachelor of Science (Honours) Mathematics and Psychology',
-                                    'Master of Arts (Honours) Mathematics and Psychology',
-                                    'Master of Arts (Honours) English and Mathematics',
-                                    'Bachelor of Science (Honours) Mathematics and Philosophy',
-                                    'Master of Arts (Honours) Mathematics and Russian',
-                                    'Bachelor of Science (Honours) Economics and Mathematics',
-                                    'Bachelor of Science (Honours) Geography and Mathematics',
-                                    'Bachelor of Science (Honours) Financial Economics and Mathematics',
-                                    'Master of Arts (Honours) Financial Economics and Mathematics',
-                                    'Master of Arts (Honours) Art History and Mathematics',
-                                    'Master of Arts (Honours) Mathematics and Medieval History',
-                                    'Bachelor of Science (Honours) Biology and Mathematics',
-                                    'Master of Arts (Honours) International Relations and Mathematics',
-                                    'Master of Arts (Honours) Economics and Mathematics',
-                                    'Master of Arts (Honours) Arabic and Mathematics',
-                                    'Master of Arts (Honours) Mathematics and Modern History',
-                                    'Bachelor of Science (Honours) Management Science and Mathematics']:
-        
-        missed_requirement, adviser_recommendation = check_joint_honours_requirements(student)
-        list_of_missed_requirements.append(missed_requirement)
-        list_of_adviser_recommendations.append(adviser_recommendation)
-        
+    # check the rules of the programme
+    if student.programme_name in programme_rule_dictionary:
+        these_missed_requirements, these_adviser_recommendations = check_programme_rules(student, programme_rule_dictionary[student.programme_name])
+        list_of_missed_requirements += these_missed_requirements
+        list_of_adviser_recommendations += these_adviser_recommendations
     else:
         list_of_missed_requirements.append('No programme requirements available')
 
@@ -881,244 +376,94 @@ takes a total of 120 credits per year and that they take at least 90 credits at
     adviser_recommendations = merge_list_to_long_string(list_of_adviser_recommendations)
 
     return missed_requirements, adviser_recommendations
-    
-def get_total_honours_credits(student):
-    """Calculate and return the total credits the student took at honours
-    
-    Parameters :
-    ------------
-    
-    student : Student object
-        the student we want to investigate
-    
-    Returns :
-    ---------
-    
-    total_credits : int
-        total number of credtis the student took at honours
-    """
-    passed_honours_module_table = student.passed_module_table[student.passed_module_table['Module code'].isin(student.passed_honours_modules)]
- 
-    passed_honours_credits = passed_honours_module_table['Credits'].sum()
-    planned_honours_credits = student.honours_module_choices['Credits'].sum()
-    total_credits = passed_honours_credits + planned_honours_credits
-
-    return total_credits
 
-def get_total_credits_at_level(student, level):
-    """Calculate and return the total credits the student took at honours
+def find_missing_programme_requirements_for_cohort(students):
+    """check that many students fulfil their honours requirements at once. Gives the same results as calling
+    find_missing_programme_requirements() for each student, but checks the rules of each programme only once
+    for all students on that programme, by counting their modules in one matrix.
     
     Parameters :
-    ------------
-    
-    student : Student object
-        the student we want to investigate
-    
-    level : int
-        the level we want to sum up. Needs to be 1, 2, 3, 4, or 5.
+    -----------
     
+    students : list of instances of Student class
+        the students to check, e.g. all final year students
+        
     Returns :
     ---------
-    
-    total_credits : int
-        total number of credits the student took at this level
+
+    missing_programme_requirements : dictionary
+        the result of find_missing_programme_requirements() for each student ID, i.e. a tuple (missed_requirements, 
+        adviser_recommendations). Students whose requirements cannot be checked are left out, so that they can be
+        checked individually and the error can be reported for them.
     """
-    passed_modules_at_level = student.passed_module_table[student.passed_module_table['Module code'].str[2] == str(level)]
-    passed_credits_at_level = passed_modules_at_level['Credits'].sum()
+    # the issues that do not depend on the programme, and the students of each programme
+    general_issues = dict()
+    students_by_programme = dict()
+    for student in students:
+        try:
+            general_issues[student.student_id] = find_general_module_choice_issues(student)
+        except Exception:
+            # the student is left out, so that the error is reported when the student is checked individually
+            continue
+        students_by_programme.setdefault(student.programme_name, []).append(student)
+
+    missing_programme_requirements = dict()
+    for programme_name, these_students in students_by_programme.items():
+        if programme_name in programme_rule_dictionary:
+            try:
+                programme_rule_results = check_programme_rules_for_cohort(these_students, programme_rule_dictionary[programme_name])
+            except Exception:
+                # the students of this programme are left out, so that the error is reported for the student that causes it
+                continue
+        else:
+            programme_rule_results = [(['No programme requirements available'], []) for student in these_students]
 
-    planned_modules_at_level = student.honours_module_choices[student.honours_module_choices['Module code'].str[2] == str(level)]
-    planned_credits_at_level = planned_modules_at_level['Credits'].sum()
-    total_credits = passed_credits_at_level + planned_credits_at_level
-    
-    return total_credits
+        for student, (these_missed_requirements, these_adviser_recommendations) in zip(these_students, programme_rule_results):
+            list_of_missed_requirements, list_of_adviser_recommendations = general_issues[student.student_id]
+            missing_programme_requirements[student.student_id] = (
+                merge_list_to_long_string(list_of_missed_requirements + these_missed_requirements),
+                merge_list_to_long_string(list_of_adviser_recommendations + these_adviser_recommendations))
 
-def check_joint_honours_requirements(student):
-    """Check whether a student meets the requirements for a joint honours programme, 
-    such as the Bachelor of Science (Honours) Chemistry and Mathematics or the
-    Master of Arts (Honours) Mathematics and Philosophy. These requirements can be used as a
-    reference for these conditions.
+    return missing_programme_requirements
 
+def find_missing_programme_requirements_for_programmes(student, programme_names):
+    """check the student against the honours requirements of several programmes, e.g. to advise a student
+    who is considering a transfer. Gives the same results as calling find_missing_programme_requirements()
+    with each programme as the programme of the student, but finds the issues that do not depend on the 
+    programme and collects the modules of the student only once.
+    
     Parameters :
-    ------------
-
-    student : instance of Student() class
-        the student for which we are checking the requirements.
+    -----------
     
-    approved_honours_projects : list of strings
-        list of project codes for approved honours projects
-
+    student : instance of Student class
+        can be generated with 'parse_excel_form()'. The honours years of the student need to fit the length
+        of the programmes, see get_programme_years().
+        
+    programme_names : list of strings
+        the programmes to check
+        
     Returns :
     ---------
 
-    missed_requirements : string
-        Unmet programme requirements. Will return 'None' if all programme requirements are met
-        
-    adviser_recommendations : string
-        advising recommendations that don't strictly count as unmet programme requirements. Here,
-        this includes conditions that the adviser needs to check manually
+    programme_results : dictionary
+        for each programme name a tuple (missed_requirements, adviser_recommendations, number_of_missed_requirements),
+        where the first two are the strings returned by find_missing_programme_requirements(), and the number
+        counts the missed requirements in the first string
     """
-    list_of_missed_requirements = []
-    list_of_adviser_recommendations = []
-
-    # check there are three modules in MT3501 to MT3508
-    list_of_MT350X_modules = ['MT3501', 'MT3502', 'MT3503', 'MT3504', 'MT3505', 'MT3506', 'MT3507', 'MT3508']
-    number_of_MT350X_modules = student.get_number_of_modules_in_list(list_of_MT350X_modules)
-    if number_of_MT350X_modules < 3:
-        list_of_missed_requirements.append('Student is only taking ' + str(number_of_MT350X_modules) + ' modules out of MT3501-MT3504 (instead of 3)')
-        
-    # check there is a final year project
-    if student.programme_name in joint_project_dictionary.keys():
-        list_of_project_codes = joint_project_dictionary[student.programme_name]
-    else:
-        list_of_project_codes = []
-    list_of_project_codes += ['MT4794', 'MT4796','MT4599']
-    number_final_year_projects= student.get_number_of_modules_in_list(list_of_project_codes)
-    if number_final_year_projects ==0:
-        list_of_missed_requirements.append('Student is not taking an allowed final year project')
-        final_year_module_code = '000000'
-    elif number_final_year_projects >1:
-        list_of_missed_requirements.append('Student is taking too many final year projects')
-    else:
-        (final_year_module_code,) = set.intersection(set(student.full_module_list),set(list_of_project_codes))
-        # check that the student is actually taking it in year 4
-        this_year = student.honours_module_choices[student.honours_module_choices['Module code'] == final_year_module_code]['Honours year'].iloc[0]
-        if this_year != 'Year 2':
-            list_of_missed_requirements.append('Student is not taking their final year project in their final year')
-        if final_year_module_code != 'MT4599':
-            list_of_adviser_recommendations.append('Student has chosen the joint honours project ' + final_year_module_code + ' which requires a letter of agreement')
+    list_of_general_missed_requirements, list_of_general_adviser_recommendations = find_general_module_choice_issues(student)
+    student_module_sets = StudentModuleSets(student)
     
-    # check that the student is taking at least 120 credits (8 modules) in MT modules (60 modules any code + 15 modules final year project + 45 credits of MT3501-MT3508)
-    # while also checking that there are not too many dip-down ID/VP modules
-    list_of_all_MT_modules = [module for module in student.all_honours_modules if 'MT3' in module 
-                                                                                  or 'MT4' in module]
-
-    list_of_all_allowed_modules = [module for module in student.all_honours_modules if 'MT2' in module 
-                                                                                    or 'MT3' in module 
-                                                                                    or 'MT4' in module
-                                                                                    or 'ID4001' in module
-                                                                                    or 'VP' in module
-                                                                                    or final_year_module_code in module]
-
-    if len(list_of_all_allowed_modules) <8 or len(list_of_all_MT_modules) < 7:
-        if len(list_of_all_MT_modules) < 7 and len(list_of_all_allowed_modules) > 7:
-            list_of_missed_requirements.append('Student is taking too many modules as dip-down or in ID/VP moduels (which is not allowed)')
+    programme_results = dict()
+    for programme_name in programme_names:
+        if programme_name in programme_rule_dictionary:
+            these_missed_requirements, these_adviser_recommendations = check_programme_rules(student, programme_rule_dictionary[programme_name],
+                                                                                             student_module_sets)
         else:
-            list_of_missed_requirements.append('Student is not taking enough credits (less than 8 modules) among MT modules')
-            
-    # check 5000 level modules
-    if student.programme_name == 'Bachelor of Science (Honours) Computer Science and Mathematics':
-        list_of_5000_level_modules =  [module for module in student.all_honours_modules if 'MT5' in module]
-    else:
-        list_of_5000_level_modules =  [module for module in student.all_honours_modules if 'MT5' in module or 'ID5059' in module]
-
-    if len(list_of_5000_level_modules) > 0:
-        list_of_missed_requirements.append('Student is planning to take 5000 level modules (which is not allowed for joint honours students)')
-
-    # check planned dip-down
-    list_of_planned_2000_level_modules = [module for module in student.planned_honours_modules if 'MT2' in module
-                                                                                                or 'ID4001' in module
-                                                                                                or 'VP' in module]
-    if len(list_of_planned_2000_level_modules) >0:
-        list_of_adviser_recommendations.append('Student is planning to take 2000 level modules or ID4001 or VP modules (which all require permission)')
-
-    if 'Credits' in student.passed_module_table and not student.honours_module_choices['Credits'].isnull().any():
-            if get_total_honours_credits(student)<240:
-                list_of_missed_requirements.append('Student is not taking a total of 240 credits across honours.')
-            if ( get_total_credits_at_level(student,4) + get_total_credits_at_level(student,5) )<90:
-                list_of_missed_requirements.append('Student is not taking a total of 90 credits at 4000 level.')
-    else:
-        list_of_adviser_recommendations.append('This is a joint honours programme and the adviser needs to manually check that the student \
-takes a total of 120 credits per year and that they take at least 90 credits at 4000 level')
-
-
-    missed_requirements = merge_list_to_long_string(list_of_missed_requirements)
-    adviser_recommendations = merge_list_to_long_string(list_of_adviser_recommendations)
-    
-    return missed_requirements, adviser_recommendations
-
-def check_for_120_credits_each_year(student):
-    """check whether the student is actually taking 120 credits each acacemic year, and whether they 
-       have an even split of modules.
-
-    Parameters:
-    -----------
-
-    student : instance of Student()
-        the student we are investigating
-
-    Returns:
-    --------
-
-    missed_requirement : string
-        a note if credits are not satisfied
-
-    adviser_recommendation : string
-        a note if module split is uneven 
-    """
-    honours_years = student.honours_module_choices['Honours year'].unique()
-    list_of_missed_requirements = []
-    list_of_adviser_recommendations = []
-    
-    current_honours_year_string = 'Year ' + str(student.current_honours_year)
-    
-    #checking total number of modules
-    for honours_year in honours_years:
-        this_planned_data_base = student.honours_module_choices[student.honours_module_choices['Honours year'] == honours_year]
-        this_passed_data_base = student.passed_module_table[student.passed_module_table['Honours year'] == honours_year]
-        this_data_base = pd.concat([this_planned_data_base, this_passed_data_base], ignore_index=True) 
-
-        if honours_year == 'Year 1' or honours_year == 'Year 2':
-            if len(this_data_base)<8:
-                if 'Credits' in this_data_base.columns:
-                    if this_data_base['Credits'].sum()<120:
-                        definitely_undercrediting = True
-                    else:
-                        definitely_undercrediting = False
-                else:
-                    definitely_undercrediting = True
-                if definitely_undercrediting:
-                    list_of_missed_requirements.append('Not collecting 120 credits in ' + honours_year)
-            elif len(this_data_base) > 8 and honours_year ==current_honours_year_string :
-                list_of_adviser_recommendations.append('Student is planning to overcredit, which requires permission')
-        if honours_year == 'Year 3':
-            if len(this_data_base)<7:
-                if 'Credits' in this_data_base.columns:
-                    if this_data_base['Credits'].sum()<120:
-                        definitely_undercrediting = True
-                    else:
-                        definitely_undercrediting = False
-                else:
-                    definitely_undercrediting = True
-                if definitely_undercrediting:
-                    list_of_missed_requirements.append('Not collecting 120 credits in ' + honours_year)
-            if ( len(this_data_base)>7 and honours_year == current_honours_year_string ):
-                list_of_adviser_recommendations.append('Student is planning to overcredit, which requires permission')
-    
-    #checking moduel splits
-    for honours_year in honours_years:
-        this_planned_data_base = student.honours_module_choices[student.honours_module_choices['Honours year'] == honours_year]
-        this_passed_data_base = student.passed_module_table[student.passed_module_table['Honours year'] == honours_year]
-        this_data_base = pd.concat([this_planned_data_base, this_passed_data_base], ignore_index=True) 
-        if honours_year == 'Year 1' or (honours_year == 'Year 2' and student.expected_honours_years == 3):
-            for semester in ['S1', 'S2']:
-                this_smaller_data_base = this_data_base[this_data_base['Semester'] == semester]
-                if len(this_smaller_data_base) !=4:
-                    list_of_adviser_recommendations.append('Not taking even credit split in ' + honours_year)
-        elif honours_year == 'Year 2':
-            this_reduced_data_base = this_data_base[this_data_base['Module code'] != 'MT4599']
-            semester_1_modules = this_reduced_data_base[this_reduced_data_base['Semester'] == 'S1']['Module code']
-            semester_2_modules = this_reduced_data_base[this_reduced_data_base['Semester'] == 'S2']['Module code']
-            if len(semester_1_modules) != 4 or len(semester_2_modules) != 3:
-                list_of_adviser_recommendations.append('Student is taking a high course load in second semester of final honours year so should ensure the majority of their project is completed before the start of S2')
-        elif honours_year == 'Year 3':
-            this_reduced_data_base = this_data_base[this_data_base['Module code'] != 'MT5599']
-            semester_1_modules = this_reduced_data_base[this_reduced_data_base['Semester'] == 'S1']['Module code']
-            semester_2_modules = this_reduced_data_base[this_reduced_data_base['Semester'] == 'S2']['Module code']
-            if not ((len(semester_1_modules) == 3 and len(semester_2_modules) == 3) or (len(semester_1_modules) == 4 and len(semester_2_modules) == 2)):
-                list_of_adviser_recommendations.append('Student is taking a high course load second semester of final honours year (which may make project completion difficult)')
-    
-    missed_requirement = merge_list_to_long_string(list_of_missed_requirements)
-    adviser_recommendation = merge_list_to_long_string(list_of_adviser_recommendations)
-    
-    return missed_requirement, adviser_recommendation
-
+            these_missed_requirements, these_adviser_recommendations = ['No programme requirements available'], []
+        list_of_missed_requirements = list_of_general_missed_requirements + these_missed_requirements
+        list_of_adviser_recommendations = list_of_general_adviser_recommendations + these_adviser_recommendations
+        programme_results[programme_name] = (merge_list_to_long_string(list_of_missed_requirements),
+                                             merge_list_to_long_string(list_of_adviser_recommendations),
+                                             len([item for item in list_of_missed_requirements if item != 'None']))
+
+    return programme_results
@@ -0,0 +1,968 @@
+import collections
+from .infrastructure import *
+
+class StudentModuleSets():
+    def __init__(self, student):
+        """Constructor for the StudentModuleSets class. Collects the module counts of a student by name, so that all
+        programme rules can be checked against the same counts.
+
+        Parameters:
+        -----------
+
+        student : instance of Student class
+            the student whose programme requirements we are checking
+        """
+        self.student = student
+        # the module sets by name, including the passed and planned modules of each honours year, e.g. 'Year 1'
+        self.module_counts = {'all modules': student.full_module_counts,
+                              'honours modules': student.honours_module_counts,
+                              'planned modules': student.planned_module_counts,
+                              'passed modules': student.passed_module_counts}
+        self.module_counts.update(student.honours_year_module_counts)
+        self.module_classifications = student.module_classifications
+        self.module_honours_years = student.module_honours_years
+
+    def get_module_counts(self, module_sets):
+        """Get the modules of one or more module sets.
+
+        Parameters:
+        -----------
+
+        module_sets : tuple of strings
+            the names of the module sets, i.e. 'all modules', 'honours modules', 'planned modules',
+            'passed modules', or an honours year like 'Year 1'
+
+        Returns:
+        --------
+
+        module_counts : collections.Counter
+            how often each module appears in the given sets
+        """
+        if len(module_sets) == 1:
+            return self.module_counts.get(module_sets[0], collections.Counter())
+        module_counts = collections.Counter()
+        for module_set in module_sets:
+            module_counts.update(self.module_counts.get(module_set, collections.Counter()))
+
+        return module_counts
+
+    def count_modules(self, module_sets, module_test):
+        """Count the modules of one or more module sets that pass a test.
+
+        Parameters:
+        -----------
+
+        module_sets : tuple of strings
+            the names of the module sets, as in get_module_counts()
+
+        module_test : function
+            takes a ModuleClassification and returns True for the modules that count, e.g. from module_is_in_categories()
+
+        Returns:
+        --------
+
+        number_of_modules : int
+            the number of modules that pass the test, where a module counts as often as it appears in the sets
+        """
+        return sum(number for module_code, number in self.get_module_counts(module_sets).items()
+                   if module_test(self.module_classifications[module_code]))
+
+    def get_final_year_project(self, project_codes):
+        """Find the final year project of the student.
+
+        Parameters:
+        -----------
+
+        project_codes : collection of strings
+            the allowed final year projects
+
+        Returns:
+        --------
+
+        final_year_projects : list of strings
+            the allowed final year projects that the student has passed or is planning to take
+        """
+        return [module_code for module_code in project_codes if module_code in self.student.full_module_set]
+
+class CohortModuleSets():
+    def __init__(self, students):
+        """Constructor for the CohortModuleSets class. Counts the modules of many students in matrices with one row
+        per student and one column per module, so that the programme rules can be checked for all students at once.
+
+        Parameters:
+        -----------
+
+        students : list of instances of Student class
+            the students whose programme requirements we are checking
+        """
+        self.students = students
+        self.student_module_sets = [StudentModuleSets(student) for student in students]
+
+        # one column for each module that any of the students has passed or selected
+        module_codes = set()
+        for student_module_sets in self.student_module_sets:
+            for module_counts in student_module_sets.module_counts.values():
+                module_codes.update(module_counts)
+        self.module_codes = sorted(module_codes)
+        self.module_positions = {module_code: position for position, module_code in enumerate(self.module_codes)}
+        self.module_classifications = [get_module_classification(module_code) for module_code in self.module_codes]
+
+        # the count matrix of each tuple of module sets and the test vector of each module test, built when they are first needed
+        self.count_matrices = dict()
+        self.test_vectors = dict()
+
+    def get_count_matrix(self, module_sets):
+        """Get how often each student has each module in one or more module sets.
+
+        Parameters:
+        -----------
+
+        module_sets : tuple of strings
+            the names of the module sets, as in StudentModuleSets.get_module_counts()
+
+        Returns:
+        --------
+
+        count_matrix : numpy array
+            one row per student and one column per module, with the number of times the module appears in the sets.
+            The matrix is shared between the rules and must not be changed.
+        """
+        if module_sets not in self.count_matrices:
+            count_matrix = np.zeros((len(self.students), len(self.module_codes)), dtype = np.int32)
+            if len(module_sets) == 1:
+                rows = []
+                columns = []
+                numbers = []
+                for row, student_module_sets in enumerate(self.student_module_sets):
+                    for module_code, number in student_module_sets.module_counts.get(module_sets[0], collections.Counter()).items():
+                        rows.append(row)
+                        columns.append(self.module_positions[module_code])
+                        numbers.append(number)
+                count_matrix[rows, columns] = numbers
+            else:
+                for module_set in module_sets:
+                    count_matrix += self.get_count_matrix((module_set,))
+            self.count_matrices[module_sets] = count_matrix
+
+        return self.count_matrices[module_sets]
+
+    def get_module_vector(self, module_codes):
+        """Mark the columns of some modules.
+
+        Parameters:
+        -----------
+
+        module_codes : collection of strings
+            the modules. Modules that none of the students take are ignored.
+
+        Returns:
+        --------
+
+        module_vector : numpy array
+            True for the columns of the given modules
+        """
+        module_vector = np.zeros(len(self.module_codes), dtype = bool)
+        module_vector[[self.module_positions[module_code] for module_code in module_codes if module_code in self.module_positions]] = True
+
+        return module_vector
+
+    def get_test_vector(self, module_test):
+        """Mark the columns of the modules that pass a test.
+
+        Parameters:
+        -----------
+
+        module_test : function
+            takes a ModuleClassification and returns True for the modules that count, e.g. from module_is_in_categories()
+
+        Returns:
+        --------
+
+        test_vector : numpy array
+            True for the columns of the modules that pass the test
+        """
+        if module_test not in self.test_vectors:
+            self.test_vectors[module_test] = np.array([bool(module_test(module_classification))
+                                                       for module_classification in self.module_classifications], dtype = bool)
+
+        return self.test_vectors[module_test]
+
+    def get_module_column(self, module_sets, module_code):
+        """Get how often each student has one module in one or more module sets.
+
+        Parameters:
+        -----------
+
+        module_sets : tuple of strings
+            the names of the module sets, as in StudentModuleSets.get_module_counts()
+
+        module_code : string
+            the module
+
+        Returns:
+        --------
+
+        module_column : numpy array
+            the number of times the module appears in the sets of each student
+        """
+        if module_code not in self.module_positions:
+            return np.zeros(len(self.students), dtype = np.int32)
+
+        return self.get_count_matrix(module_sets)[:, self.module_positions[module_code]]
+
+def module_is_in_categories(*categories):
+    """Make a test for modules in any of the given categories, as in ModuleClassification.is_in_categories().
+
+    Parameters:
+    -----------
+
+    categories : strings
+        subjects and levels like 'MT3', subjects like 'VP', or module codes like 'ID5059'
+
+    Returns:
+    --------
+
+    module_test : function
+        takes a ModuleClassification and returns True for a module in one of the categories
+    """
+    categories = frozenset(categories)
+    return lambda module_classification: module_classification.is_in_categories(categories)
+
+def module_is_in_none_of_categories(*categories):
+    """Make a test for modules in none of the given categories, e.g. to find non-MT modules.
+
+    Parameters:
+    -----------
+
+    categories : strings
+        subjects and levels like 'MT3', subjects like 'VP', or module codes like 'ID5059'
+
+    Returns:
+    --------
+
+    module_test : function
+        takes a ModuleClassification and returns True for a module in none of the categories
+    """
+    categories = frozenset(categories)
+    return lambda module_classification: not module_classification.is_in_categories(categories)
+
+def module_number_is_between(subject_code, lower_number, upper_number, is_between = True):
+    """Make a test for the modules of a subject whose number is strictly between two numbers, like MT5600-MT5899.
+
+    Parameters:
+    -----------
+
+    subject_code : string
+        the subject of the modules, e.g. 'MT'
+
+    lower_number : int
+        the lower bound, which is not included
+
+    upper_number : int
+        the upper bound, which is not included
+
+    is_between : bool
+        if False, the test returns True for modules of the subject outside of the numbers instead
+
+    Returns:
+    --------
+
+    module_test : function
+        takes a ModuleClassification and returns True for modules of the subject that are (or are not) between the numbers
+    """
+    return lambda module_classification: (module_classification.subject == subject_code and module_classification.number is not None and
+                                          (lower_number < module_classification.number < upper_number) == is_between)
+
+def get_rule_results(fails_rule, missed_requirement = None, adviser_recommendation = None):
+    """Turn the outcome of a rule for each student of a cohort into lists of missed requirements and adviser recommendations.
+
+    Parameters:
+    -----------
+
+    fails_rule : numpy array
+        True for each student that fails the rule
+
+    missed_requirement : string
+        the missed requirement for the students that fail the rule, if any
+
+    adviser_recommendation : string
+        the adviser recommendation for the students that fail the rule, if any
+
+    Returns:
+    --------
+
+    rule_results : list of tuples
+        a tuple (missed_requirements, adviser_recommendations) of lists for each student, as from check()
+    """
+    missed_requirements = [] if missed_requirement is None else [missed_requirement]
+    adviser_recommendations = [] if adviser_recommendation is None else [adviser_recommendation]
+
+    return [(list(missed_requirements), list(adviser_recommendations)) if student_fails_rule else ([], [])
+            for student_fails_rule in fails_rule]
+
+class ProgrammeRule():
+    def check_cohort(self, cohort_module_sets):
+        """Check the rule for all students of a cohort. Rules that can count the modules of all students at once
+        replace this, all other rules are checked one student at a time.
+
+        Parameters:
+        -----------
+
+        cohort_module_sets : instance of CohortModuleSets
+            the modules of the students
+
+        Returns:
+        --------
+
+        rule_results : list of tuples
+            a tuple (missed_requirements, adviser_recommendations) of lists for each student, as from check()
+        """
+        return [self.check(student_module_sets) for student_module_sets in cohort_module_sets.student_module_sets]
+
+class ModulesFromList(ProgrammeRule):
+    def __init__(self, module_codes, minimum_number, message, module_sets = ('all modules',), code_prefix = None):
+        """Constructor for the ModulesFromList class, a rule that the student needs to take at least a number of
+        modules from a list, e.g. 'a computing module' or 'four modules out of MT3501-MT3508'.
+
+        Parameters:
+        -----------
+
+        module_codes : list of strings
+            the modules in the list
+
+        minimum_number : int
+            the smallest number of different modules from the list that the student needs to take
+
+        message : string
+            the missed requirement. '{number}' is replaced by the number of modules the student takes from the list.
+
+        module_sets : tuple of strings
+            the module sets in which the modules are counted, as in StudentModuleSets.get_module_counts()
+
+        code_prefix : string
+            if this is given, all modules starting with it count as well, like 'MT457' for MT4571-MT4579
+        """
+        self.module_codes = set(module_codes)
+        self.minimum_number = minimum_number
+        self.message = message
+        self.module_sets = module_sets
+        self.code_prefix = code_prefix
+
+    def check(self, student_module_sets):
+        """Check the rule for a student.
+
+        Parameters:
+        -----------
+
+        student_module_sets : instance of StudentModuleSets
+            the modules of the student
+
+        Returns:
+        --------
+
+        missed_requirements : list of strings
+            the missed requirement, if any
+
+        adviser_recommendations : list of strings
+            always empty for this rule
+        """
+        number_of_modules = len(self.module_codes.intersection(student_module_sets.get_module_counts(self.module_sets)))
+        if self.code_prefix is not None:
+            number_of_modules += sum(number for module_code, number in student_module_sets.get_module_counts(('all modules',)).items()
+                                     if module_code.startswith(self.code_prefix))
+        if number_of_modules < self.minimum_number:
+            return [self.message.format(number = number_of_modules)], []
+
+        return [], []
+
+    def check_cohort(self, cohort_module_sets):
+        """Check the rule for all students of a cohort at once. Returns a tuple of lists for each student, as ProgrammeRule.check_cohort()."""
+        count_matrix = cohort_module_sets.get_count_matrix(self.module_sets)
+        numbers_of_modules = (count_matrix[:, cohort_module_sets.get_module_vector(self.module_codes)] > 0).sum(axis = 1)
+        if self.code_prefix is not None:
+            numbers_of_modules = numbers_of_modules + (cohort_module_sets.get_count_matrix(('all modules',)) @
+                                                       cohort_module_sets.get_test_vector(self.has_code_prefix))
+
+        return [([self.message.format(number = int(number_of_modules))], []) if number_of_modules < self.minimum_number else ([], [])
+                for number_of_modules in numbers_of_modules]
+
+    def has_code_prefix(self, module_classification):
+        """Test whether a module starts with the code prefix of the rule, so that the test vector is only built once per cohort."""
+        return module_classification.module_code.startswith(self.code_prefix)
+
+class ForbiddenModules(ProgrammeRule):
+    def __init__(self, module_codes, message, module_sets = ('all modules',)):
+        """Constructor for the ForbiddenModules class, a rule that the student must not take any module from a list.
+
+        Parameters:
+        -----------
+
+        module_codes : list of strings
+            the modules that are not allowed
+
+        message : string
+            the missed requirement
+
+        module_sets : tuple of strings
+            the module sets that are checked, as in StudentModuleSets.get_module_counts()
+        """
+        self.module_codes = set(module_codes)
+        self.message = message
+        self.module_sets = module_sets
+
+    def check(self, student_module_sets):
+        """Check the rule for a student. Returns lists of missed requirements and adviser recommendations, as ModulesFromList.check()."""
+        if not self.module_codes.isdisjoint(student_module_sets.get_module_counts(self.module_sets)):
+            return [self.message], []
+
+        return [], []
+
+    def check_cohort(self, cohort_module_sets):
+        """Check the rule for all students of a cohort at once. Returns a tuple of lists for each student, as ProgrammeRule.check_cohort()."""
+        count_matrix = cohort_module_sets.get_count_matrix(self.module_sets)
+        takes_forbidden_module = (count_matrix[:, cohort_module_sets.get_module_vector(self.module_codes)] > 0).any(axis = 1)
+
+        return get_rule_results(takes_forbidden_module, missed_requirement = self.message)
+
+class MatchingModules(ProgrammeRule):
+    def __init__(self, module_sets, module_test, message, minimum_number = None, maximum_number = None,
+                 is_recommendation = False, only_with_module = None, only_without_module = None):
+        """Constructor for the MatchingModules class, a rule on the number of modules that pass a test,
+        e.g. 'at least 6 modules at 4000 level or above' or 'no planned 2000 level modules'. Modules are counted
+        as often as they appear in the module sets.
+
+        Parameters:
+        -----------
+
+        module_sets : tuple of strings
+            the module sets in which the modules are counted, as in StudentModuleSets.get_module_counts()
+
+        module_test : function
+            takes a ModuleClassification and returns True for the modules that count, e.g. from module_is_in_categories()
+
+        message : string
+            the missed requirement or adviser recommendation
+
+        minimum_number : int
+            the smallest allowed number of matching modules, if any
+
+        maximum_number : int
+            the largest allowed number of matching modules, if any
+
+        is_recommendation : bool
+            if True, the message is an adviser recommendation rather than a missed requirement
+
+        only_with_module : string
+            if this is given, the rule only applies to students who take this honours module
+
+        only_without_module : string
+            if this is given, the rule only applies to students who do not take this honours module
+        """
+        self.module_sets = module_sets
+        self.module_test = module_test
+        self.message = message
+        self.minimum_number = minimum_number
+        self.maximum_number = maximum_number
+        self.is_recommendation = is_recommendation
+        self.only_with_module = only_with_module
+        self.only_without_module = only_without_module
+
+    def check(self, student_module_sets):
+        """Check the rule for a student. Returns lists of missed requirements and adviser recommendations, as ModulesFromList.check()."""
+        honours_modules = student_module_sets.get_module_counts(('honours modules',))
+        if self.only_with_module is not None and self.only_with_module not in honours_modules:
+            return [], []
+        if self.only_without_module is not None and self.only_without_module in honours_modules:
+            return [], []
+
+        number_of_modules = student_module_sets.count_modules(self.module_sets, self.module_test)
+        if ((self.minimum_number is not None and number_of_modules < self.minimum_number) or
+            (self.maximum_number is not None and number_of_modules > self.maximum_number)):
+            if self.is_recommendation:
+                return [], [self.message]
+            else:
+                return [self.message], []
+
+        return [], []
+
+    def check_cohort(self, cohort_module_sets):
+        """Check the rule for all students of a cohort at once. Returns a tuple of lists for each student, as ProgrammeRule.check_cohort()."""
+        numbers_of_modules = cohort_module_sets.get_count_matrix(self.module_sets) @ cohort_module_sets.get_test_vector(self.module_test)
+        fails_rule = np.zeros(len(numbers_of_modules), dtype = bool)
+        if self.minimum_number is not None:
+            fails_rule |= numbers_of_modules < self.minimum_number
+        if self.maximum_number is not None:
+            fails_rule |= numbers_of_modules > self.maximum_number
+        if self.only_with_module is not None:
+            fails_rule &= cohort_module_sets.get_module_column(('honours modules',), self.only_with_module) > 0
+        if self.only_without_module is not None:
+            fails_rule &= cohort_module_sets.get_module_column(('honours modules',), self.only_without_module) == 0
+
+        if self.is_recommendation:
+            return get_rule_results(fails_rule, adviser_recommendation = self.message)
+        else:
+            return get_rule_results(fails_rule, missed_requirement = self.message)
+
+class FinalYearProject(ProgrammeRule):
+    def __init__(self, project_codes, final_honours_year, several_projects_message = None,
+                 wrong_year_message = 'Student is not taking their final year project in their final year.',
+                 projects_without_agreement = None):
+        """Constructor for the FinalYearProject class, a rule that the student takes exactly one of the allowed
+        final year projects, in their final honours year.
+
+        Parameters:
+        -----------
+
+        project_codes : list of strings
+            the allowed final year projects
+
+        final_honours_year : string
+            the honours year in which the project needs to be taken, e.g. 'Year 2'
+
+        several_projects_message : string
+            the missed requirement if the student takes more than one project. If this is None, the student
+            is flagged as not taking an allowed final year project.
+
+        wrong_year_message : string
+            the missed requirement if the project is not taken in the final honours year
+
+        projects_without_agreement : list of strings
+            if this is given, all other projects are joint honours projects, and the adviser is reminded
+            that they require a letter of agreement
+        """
+        self.project_codes = list(dict.fromkeys(project_codes))
+        self.final_honours_year = final_honours_year
+        self.several_projects_message = several_projects_message
+        self.wrong_year_message = wrong_year_message
+        self.projects_without_agreement = projects_without_agreement
+
+    def check(self, student_module_sets):
+        """Check the rule for a student. Returns lists of missed requirements and adviser recommendations, as ModulesFromList.check()."""
+        final_year_projects = student_module_sets.get_final_year_project(self.project_codes)
+        if len(final_year_projects) == 0 or (len(final_year_projects) > 1 and self.several_projects_message is None):
+            return ['Student is not taking an allowed final year project'], []
+        elif len(final_year_projects) > 1:
+            return [self.several_projects_message], []
+
+        missed_requirements = []
+        adviser_recommendations = []
+        (final_year_project,) = final_year_projects
+        if student_module_sets.module_honours_years.get(final_year_project) != self.final_honours_year:
+            missed_requirements.append(self.wrong_year_message)
+        if self.projects_without_agreement is not None and final_year_project not in self.projects_without_agreement:
+            adviser_recommendations.append('Student has chosen the joint honours project ' + final_year_project +
+                                           ' which requires a letter of agreement')
+
+        return missed_requirements, adviser_recommendations
+
+class JointHonoursModuleBalance(ProgrammeRule):
+    def __init__(self, other_allowed_modules = (), project_codes = ()):
+        """Constructor for the JointHonoursModuleBalance class, a rule that a joint honours student takes at least
+        120 credits (8 modules) in MT modules, of which at most one may be a dip-down or ID/VP module.
+
+        Parameters:
+        -----------
+
+        other_allowed_modules : tuple of strings
+            further modules that count towards the 8 modules, like 'CS4796'
+
+        project_codes : list of strings
+            the allowed final year projects. If the student takes exactly one of these, it counts towards the 8 modules.
+        """
+        self.allowed_categories = frozenset(('MT2', 'MT3', 'MT4', 'ID4001', 'VP') + tuple(other_allowed_modules))
+        self.project_codes = list(dict.fromkeys(project_codes))
+        self.is_MT_module = module_is_in_categories('MT3', 'MT4')
+        self.is_allowed_module = module_is_in_categories(*self.allowed_categories)
+
+    def check(self, student_module_sets):
+        """Check the rule for a student. Returns lists of missed requirements and adviser recommendations, as ModulesFromList.check()."""
+        allowed_categories = self.allowed_categories
+        final_year_projects = student_module_sets.get_final_year_project(self.project_codes)
+        if len(final_year_projects) == 1:
+            allowed_categories = allowed_categories.union(final_year_projects)
+        number_of_MT_modules = student_module_sets.count_modules(('honours modules',), self.is_MT_module)
+        number_of_allowed_modules = student_module_sets.count_modules(('honours modules',),
+                                                                      lambda module_classification: module_classification.is_in_categories(allowed_categories))
+
+        if number_of_allowed_modules < 8 or number_of_MT_modules < 7:
+            if number_of_MT_modules < 7 and number_of_allowed_modules > 7:
+                return ['Student is taking too many modules as dip-down or in ID/VP moduels (which is not allowed)'], []
+            else:
+                return ['Student is not taking enough credits (less than 8 modules) among MT modules'], []
+
+        return [], []
+
+    def check_cohort(self, cohort_module_sets):
+        """Check the rule for all students of a cohort at once. Returns a tuple of lists for each student, as ProgrammeRule.check_cohort()."""
+        honours_count_matrix = cohort_module_sets.get_count_matrix(('honours modules',))
+        numbers_of_MT_modules = honours_count_matrix @ cohort_module_sets.get_test_vector(self.is_MT_module)
+        allowed_module_vector = cohort_module_sets.get_test_vector(self.is_allowed_module)
+        numbers_of_allowed_modules = honours_count_matrix @ allowed_module_vector
+
+        # a single final year project counts as well, unless it is already among the allowed modules
+        project_positions = np.array([cohort_module_sets.module_positions[module_code] for module_code in self.project_codes
+                                      if module_code in cohort_module_sets.module_positions], dtype = int)
+        if len(project_positions) > 0:
+            takes_project = cohort_module_sets.get_count_matrix(('all modules',))[:, project_positions] > 0
+            project_columns = project_positions[takes_project.argmax(axis = 1)]
+            project_counts = honours_count_matrix[np.arange(len(project_columns)), project_columns]
+            counts_project = (takes_project.sum(axis = 1) == 1) & ~allowed_module_vector[project_columns]
+            numbers_of_allowed_modules = numbers_of_allowed_modules + np.where(counts_project, project_counts, 0)
+
+        rule_results = []
+        for number_of_MT_modules, number_of_allowed_modules in zip(numbers_of_MT_modules, numbers_of_allowed_modules):
+            if number_of_allowed_modules < 8 or number_of_MT_modules < 7:
+                if number_of_MT_modules < 7 and number_of_allowed_modules > 7:
+                    rule_results.append((['Student is taking too many modules as dip-down or in ID/VP moduels (which is not allowed)'], []))
+                else:
+                    rule_results.append((['Student is not taking enough credits (less than 8 modules) among MT modules'], []))
+            else:
+                rule_results.append(([], []))
+
+        return rule_results
+
+class HonoursCredits(ProgrammeRule):
+    def __init__(self, total_credits, levels, level_credits, level_message, manual_check_message):
+        """Constructor for the HonoursCredits class, a rule on the total credits across honours and the credits at
+        the higher levels. If the module tables of the student do not contain credits, the adviser is asked to
+        check this manually.
+
+        Parameters:
+        -----------
+
+        total_credits : int
+            the smallest number of credits across honours
+
+        levels : tuple of ints
+            the levels at which credits are counted, e.g. (4, 5) for 4000 level or above
+
+        level_credits : int
+            the smallest number of credits at these levels
+
+        level_message : string
+            the missed requirement if there are not enough credits at these levels
+
+        manual_check_message : string
+            the adviser recommendation if the credits cannot be checked
+        """
+        self.total_credits = total_credits
+        self.levels = levels
+        self.level_credits = level_credits
+        self.level_message = level_message
+        self.manual_check_message = manual_check_message
+
+    def check(self, student_module_sets):
+        """Check the rule for a student. Returns lists of missed requirements and adviser recommendations, as ModulesFromList.check()."""
+        student = student_module_sets.student
+        if student.credit_ledger.credits_are_complete:
+            missed_requirements = []
+            if get_total_honours_credits(student) < self.total_credits:
+                missed_requirements.append('Student is not taking a total of ' + str(self.total_credits) + ' credits across honours.')
+            if sum(get_total_credits_at_level(student, level) for level in self.levels) < self.level_credits:
+                missed_requirements.append(self.level_message)
+            return missed_requirements, []
+
+        return [], [self.manual_check_message]
+
+    def check_cohort(self, cohort_module_sets):
+        """Check the rule for all students of a cohort at once, from the credit ledgers of the students. Returns a
+        tuple of lists for each student, as ProgrammeRule.check_cohort()."""
+        credit_ledgers = [student.credit_ledger for student in cohort_module_sets.students]
+        credits_are_complete = np.array([credit_ledger.credits_are_complete for credit_ledger in credit_ledgers], dtype = bool)
+        honours_credits = np.array([credit_ledger.honours_credits for credit_ledger in credit_ledgers], dtype = float)
+        level_credits = np.array([sum(credit_ledger.credits_by_level[level] for level in self.levels)
+                                  for credit_ledger in credit_ledgers], dtype = float)
+
+        misses_total_credits = credits_are_complete & (honours_credits < self.total_credits)
+        misses_level_credits = credits_are_complete & (level_credits < self.level_credits)
+        rule_results = []
+        for student_misses_total_credits, student_misses_level_credits, student_credits_are_complete in zip(
+                misses_total_credits, misses_level_credits, credits_are_complete):
+            missed_requirements = []
+            if student_misses_total_credits:
+                missed_requirements.append('Student is not taking a total of ' + str(self.total_credits) + ' credits across honours.')
+            if student_misses_level_credits:
+                missed_requirements.append(self.level_message)
+            if student_credits_are_complete:
+                rule_results.append((missed_requirements, []))
+            else:
+                rule_results.append(([], [self.manual_check_message]))
+
+        return rule_results
+
+class YearlyCredits(ProgrammeRule):
+    def check(self, student_module_sets):
+        """Check that the student takes 120 credits in each honours year, with an even split of modules, as in
+        check_for_120_credits_each_year(). Returns lists of missed requirements and adviser recommendations,
+        as ModulesFromList.check()."""
+        missed_requirement, adviser_recommendation = check_for_120_credits_each_year(student_module_sets.student)
+
+        return [missed_requirement], [adviser_recommendation]
+
+class AnalysisModules(ProgrammeRule):
+    def check(self, student_module_sets):
+        """Check that a student on a joint programme with physics takes the analysis modules that fit the subhonours
+        modules they passed, i.e. MT3504 after MT2506 and MT2507, or MT3502 and MT3505 after MT2502 and MT2505.
+        Returns lists of missed requirements and adviser recommendations, as ModulesFromList.check()."""
+        student = student_module_sets.student
+        subhonours_modules = student.passed_module_table['Module code'].to_list()
+        student_took_MT2507_and_MT2506 = 'MT2507' in subhonours_modules and 'MT2506' in subhonours_modules
+        student_took_MT2502_and_MT2505 = 'MT2502' in subhonours_modules and 'MT2505' in subhonours_modules
+
+        if student.current_honours_year == 1:
+            taken_modules = student_module_sets.get_module_counts(('Year 1', 'passed modules'))
+        else:
+            taken_modules = student_module_sets.get_module_counts(('planned modules', 'passed modules'))
+        student_takes_3504 = 'MT3504' in taken_modules
+        student_takes_3502_and_3505 = 'MT3502' in taken_modules and 'MT3505' in taken_modules
+
+        if student_took_MT2507_and_MT2506 and student_took_MT2502_and_MT2505:
+            if not student_takes_3504 and not student_takes_3502_and_3505:
+                return ['Student is not taking MT3504 or (MT3502 and MT3505) (which is required for them)'], []
+        elif student_took_MT2507_and_MT2506:
+            if not student_takes_3504:
+                return ['Student is not taking MT3504 in year 3 (which is required for them)'], []
+        elif student_took_MT2502_and_MT2505:
+            if not student_takes_3502_and_3505:
+                return ['Student is not taking MT3505 and MT3502 in year 3 (which is a requirement for them)'], []
+        else:
+            return ['Student has not yet passed an allowed selection of subhonours MT modules'], []
+
+        return [], []
+
+def check_programme_rules(student, programme_rules, student_module_sets = None):
+    """Check a student against the compiled rules of their programme.
+
+    Parameters:
+    -----------
+
+    student : instance of Student class
+        the student we are checking
+
+    programme_rules : list of rule objects
+        the rules of the programme, each with a method check(student_module_sets)
+
+    student_module_sets : instance of StudentModuleSets
+        the modules of the student, if they have already been collected, e.g. to check the student against
+        the rules of several programmes. If this is None, they are collected here.
+
+    Returns:
+    --------
+
+    missed_requirements : list of strings
+        the missed requirements, in the order of the rules
+
+    adviser_recommendations : list of strings
+        the adviser recommendations, in the order of the rules
+    """
+    if student_module_sets is None:
+        student_module_sets = StudentModuleSets(student)
+    missed_requirements = []
+    adviser_recommendations = []
+    for programme_rule in programme_rules:
+        these_missed_requirements, these_adviser_recommendations = programme_rule.check(student_module_sets)
+        missed_requirements += these_missed_requirements
+        adviser_recommendations += these_adviser_recommendations
+
+    return missed_requirements, adviser_recommendations
+
+def check_programme_rules_for_cohort(students, programme_rules):
+    """Check many students on the same programme against the compiled rules of the programme at once.
+    Gives the same results as calling check_programme_rules() for each student.
+
+    Parameters:
+    -----------
+
+    students : list of instances of Student class
+        the students we are checking, who all need to be on the programme
+
+    programme_rules : list of rule objects
+        the rules of the programme, each with a method check_cohort(cohort_module_sets)
+
+    Returns:
+    --------
+
+    programme_rule_results : list of tuples
+        a tuple (missed_requirements, adviser_recommendations) of lists for each student, in the order of the students
+    """
+    cohort_module_sets = CohortModuleSets(students)
+    programme_rule_results = [([], []) for student in students]
+    for programme_rule in programme_rules:
+        for (missed_requirements, adviser_recommendations), (these_missed_requirements, these_adviser_recommendations) in zip(
+                programme_rule_results, programme_rule.check_cohort(cohort_module_sets)):
+            missed_requirements += these_missed_requirements
+            adviser_recommendations += these_adviser_recommendations
+
+    return programme_rule_results
+
+def get_total_honours_credits(student):
+    """Calculate and return the total credits the student took at honours
+    
+    Parameters :
+    ------------
+    
+    student : Student object
+        the student we want to investigate
+    
+    Returns :
+    ---------
+    
+    total_credits : int
+        total number of credtis the student took at honours
+    """
+    total_credits = student.credit_ledger.honours_credits
+
+    return total_credits
+
+def get_total_credits_at_level(student, level):
+    """Calculate and return the total credits the student took at honours
+    
+    Parameters :
+    ------------
+    
+    student : Student object
+        the student we want to investigate
+    
+    level : int
+        the level we want to sum up. Needs to be 1, 2, 3, 4, or 5.
+    
+    Returns :
+    ---------
+    
+    total_credits : int
+        total number of credits the student took at this level
+    """
+    total_credits = student.credit_ledger.credits_by_level[level]
+    
+    return total_credits
+
+def check_for_120_credits_each_year(student):
+    """check whether the student is actually taking 120 credits each acacemic year, and whether they 
+       have an even split of modules.
+
+    Parameters:
+    -----------
+
+    student : instance of Student()
+        the student we are investigating
+
+    Returns:
+    --------
+
+    missed_requirement : string
+        a note if credits are not satisfied
+
+    adviser_recommendation : string
+        a note if module split is uneven 
+    """
+    honours_years = student.get_planned_honours_years()
+    list_of_missed_requirements = []
+    list_of_adviser_recommendations = []
+    
+    current_honours_year_string = 'Year ' + str(student.current_honours_year)
+    
+    #checking total number of modules
+    for honours_year in honours_years:
+        number_of_modules = student.credit_ledger.modules_by_honours_year[honours_year]
+
+        if honours_year == 'Year 1' or honours_year == 'Year 2':
+            if number_of_modules<8:
+                this_year_credits = get_planned_and_passed_credits(student, honours_year)
+                if this_year_credits is not None:
+                    if this_year_credits<120:
+                        definitely_undercrediting = True
+                    else:
+                        definitely_undercrediting = False
+                else:
+                    definitely_undercrediting = True
+                if definitely_undercrediting:
+                    list_of_missed_requirements.append('Not collecting 120 credits in ' + honours_year)
+            elif number_of_modules > 8 and honours_year ==current_honours_year_string :
+                list_of_adviser_recommendations.append('Student is planning to overcredit, which requires permission')
+        if honours_year == 'Year 3':
+            if number_of_modules<7:
+                this_year_credits = get_planned_and_passed_credits(student, honours_year)
+                if this_year_credits is not None:
+                    if this_year_credits<120:
+                        definitely_undercrediting = True
+                    else:
+                        definitely_undercrediting = False
+                else:
+                    definitely_undercrediting = True
+                if definitely_undercrediting:
+                    list_of_missed_requirements.append('Not collecting 120 credits in ' + honours_year)
+            if ( number_of_modules>7 and honours_year == current_honours_year_string ):
+                list_of_adviser_recommendations.append('Student is planning to overcredit, which requires permission')
+    
+    #checking moduel splits
+    for honours_year in honours_years:
+        this_year_modules = get_planned_and_passed_modules_by_semester(student, honours_year)
+        if honours_year == 'Year 1' or (honours_year == 'Year 2' and student.expected_honours_years == 3):
+            for semester in ['S1', 'S2']:
+                if len(this_year_modules.get(semester, [])) !=4:
+                    list_of_adviser_recommendations.append('Not taking even credit split in ' + honours_year)
+        elif honours_year == 'Year 2':
+            semester_1_modules = [module for module in this_year_modules.get('S1', []) if module != 'MT4599']
+            semester_2_modules = [module for module in this_year_modules.get('S2', []) if module != 'MT4599']
+            if len(semester_1_modules) != 4 or len(semester_2_modules) != 3:
+                list_of_adviser_recommendations.append('Student is taking a high course load in second semester of final honours year so should ensure the majority of their project is completed before the start of S2')
+        elif honours_year == 'Year 3':
+            semester_1_modules = [module for module in this_year_modules.get('S1', []) if module != 'MT5599']
+            semester_2_modules = [module for module in this_year_modules.get('S2', []) if module != 'MT5599']
+            if not ((len(semester_1_modules) == 3 and len(semester_2_modules) == 3) or (len(semester_1_modules) == 4 and len(semester_2_modules) == 2)):
+                list_of_adviser_recommendations.append('Student is taking a high course load second semester of final honours year (which may make project completion difficult)')
+    
+    missed_requirement = merge_list_to_long_string(list_of_missed_requirements)
+    adviser_recommendation = merge_list_to_long_string(list_of_adviser_recommendations)
+    
+    return missed_requirement, adviser_recommendation
+
+def get_planned_and_passed_modules_by_semester(student, honours_year):
+    """Get all planned and passed modules of the student in one honours year, sorted by semester.
+    
+    Parameters :
+    ------------
+    
+    student : Student object
+        the student we want to investigate
+    
+    honours_year : string
+        the honours year, e.g. 'Year 2'
+    
+    Returns :
+    ---------
+    
+    modules_by_semester : dictionary
+        the list of module codes for each semester, e.g. 'S1', 'S2' or 'Full Year'
+    """
+    modules_by_semester = dict()
+    for module_timeline in [student.module_timeline, student.passed_module_timeline]:
+        for (this_honours_year, semester), module_codes in module_timeline.items():
+            if this_honours_year == honours_year:
+                modules_by_semester.setdefault(semester, []).extend(module_codes)
+
+    return modules_by_semester
+
+def get_planned_and_passed_credits(student, honours_year):
+    """Calculate the credits of all planned and passed modules of the student in one honours year.
+    
+    Parameters :
+    ------------
+    
+    student : Student object
+        the student we want to investigate
+    
+    honours_year : string
+        the honours year, e.g. 'Year 2'
+    
+    Returns :
+    ---------
+    
+    total_credits : float or None
+        the total credits, or None if the student's module tables do not contain credits
+    """
+    if not student.credit_ledger.has_credits:
+        return None
+    total_credits = student.credit_ledger.credits_by_honours_year[honours_year]
+
+    return total_credits
@@ -1,5 +1,15 @@
+import re
+import copy
+import functools
+import collections
 import pandas as pd
 
+# the subject letters and the number of a module code, e.g. 'MT' and '3501' in 'MT3501'. The first digit is the level.
+module_code_pattern = re.compile(r'([A-Z]+)(\d+)')
+
+# the last three digits of final year projects, e.g. MT4599, MT5599, or joint honours projects like CS4796
+project_number_endings = ['598', '599', '794', '795', '796', '797']
+
 class Student():
     def __init__(self, 
                  student_id, 
@@ -86,6 +96,12 @@ class Student():
         
         # and a list of planned honours modules
         self.planned_honours_modules = self.honours_module_choices['Module code'].tolist()
+
+        # index the module tables by honours year and semester
+        self.passed_module_timeline = get_module_timeline(self.passed_module_table)
+        self.update_module_timeline()
+        self.update_module_classifications()
+        self.credit_ledger = CreditLedger(self.passed_module_table, self.honours_module_choices, self.passed_honours_modules)
     
     def update_honours_module_choices(self, additional_honours_module_choices):
         '''add planned honours module choices to student.
@@ -101,6 +117,187 @@ class Student():
         self.full_module_list += additional_honours_module_choices['Module code'].to_list()
         self.all_honours_modules += additional_honours_module_choices['Module code'].tolist()
         self.planned_honours_modules += additional_honours_module_choices['Module code'].tolist()
+        self.update_module_timeline()
+        self.update_module_classifications()
+        self.credit_ledger = CreditLedger(self.passed_module_table, self.honours_module_choices, self.passed_honours_modules)
+
+    def get_copy_with_honours_module_choices(self, honours_module_choices):
+        """Make a copy of the student that has different honours module choices, for example to check 
+        whether an alternative selection of modules would meet the programme requirements.
+
+        Parameters:
+        -----------
+
+        honours_module_choices : pandas data frame
+            the alternative honours module choices, with the same columns as honours_module_choices
+
+        Returns:
+        --------
+
+        student_copy : instance of Student class
+            the copy. The passed modules are shared with this student and should not be changed.
+        """
+        number_of_passed_honours_modules = len(self.all_honours_modules) - len(self.planned_honours_modules)
+
+        student_copy = copy.copy(self)
+        student_copy.honours_module_choices = honours_module_choices
+        student_copy.passed_honours_modules = self.all_honours_modules[:number_of_passed_honours_modules]
+        student_copy.planned_honours_modules = honours_module_choices['Module code'].tolist()
+        student_copy.full_module_list = self.passed_modules + student_copy.planned_honours_modules
+        student_copy.all_honours_modules = student_copy.passed_honours_modules + student_copy.planned_honours_modules
+        student_copy.update_module_timeline()
+        student_copy.update_module_classifications()
+        student_copy.credit_ledger = CreditLedger(student_copy.passed_module_table, student_copy.honours_module_choices,
+                                                  student_copy.passed_honours_modules)
+
+        return student_copy
+
+    def update_module_timeline(self):
+        '''Index the honours module choices by honours year and semester, so that the checks can find out which 
+        modules the student takes when, and which modules they have taken by then, without searching the module choices.
+        This sets the attributes
+
+        module_timeline : dictionary
+            the planned module codes for each (honours year, semester) tuple, e.g. ('Year 2', 'S1'), in the
+            order in which they appear in honours_module_choices
+
+        module_slots : dictionary
+            the (honours year, semester) tuple of each planned module code. If a module appears more than once, the
+            first entry is used.
+
+        modules_taken_before_slot : dictionary
+            for each (honours year, semester) tuple in module_timeline, the set of modules that the student has passed or 
+            will have taken by the start of that semester. Modules of the first semester count as taken in the second 
+            semester of the same honours year, full year modules only count as taken in later honours years.
+        '''
+        self.module_timeline = get_module_timeline(self.honours_module_choices)
+
+        self.module_slots = dict()
+        for module_code, honours_year, semester in zip(self.honours_module_choices['Module code'],
+                                                       self.honours_module_choices['Honours year'],
+                                                       self.honours_module_choices['Semester']):
+            if module_code not in self.module_slots:
+                self.module_slots[module_code] = (honours_year, semester)
+
+        self.modules_taken_before_slot = dict()
+        for honours_year, semester in self.module_timeline:
+            modules_taken_before_this_slot = set(self.passed_modules)
+            for (other_honours_year, other_semester), module_codes in self.module_timeline.items():
+                if (int(other_honours_year[-1]) < int(honours_year[-1]) or
+                    (semester == 'S2' and other_honours_year == honours_year and other_semester == 'S1')):
+                    modules_taken_before_this_slot.update(module_codes)
+            self.modules_taken_before_slot[(honours_year, semester)] = modules_taken_before_this_slot
+
+    def update_module_classifications(self):
+        '''Classify each module of the student once, and count the modules in the module lists, so that the checks can
+        select modules by subject and level without searching the module codes. This sets the attributes
+
+        module_classifications : dictionary
+            the ModuleClassification of each passed and planned module code, including the module tables
+
+        full_module_set : frozenset of strings
+            the modules in full_module_list
+
+        full_module_counts : collections.Counter
+            how often each module appears in full_module_list
+
+        honours_module_counts : collections.Counter
+            how often each module appears in all_honours_modules
+
+        planned_module_counts : collections.Counter
+            how often each module appears in planned_honours_modules
+
+        passed_module_counts : collections.Counter
+            how often each module appears in passed_modules
+
+        honours_year_module_counts : dictionary
+            how often each module appears in the passed and planned modules of each honours year, e.g. 'Year 1'
+
+        module_honours_years : dictionary
+            the honours year of each passed and planned module, where a planned module takes precedence over
+            a passed module with the same code
+
+        studied_abroad : bool
+            True if any of the modules of the student is a study abroad module
+        '''
+        self.full_module_counts = collections.Counter(self.full_module_list)
+        self.honours_module_counts = collections.Counter(self.all_honours_modules)
+        self.planned_module_counts = collections.Counter(self.planned_honours_modules)
+        self.passed_module_counts = collections.Counter(self.passed_modules)
+        self.full_module_set = frozenset(self.full_module_counts)
+
+        self.honours_year_module_counts = dict()
+        self.module_honours_years = dict()
+        for module_table in [self.honours_module_choices, self.passed_module_table]:
+            for module_code, honours_year in zip(module_table['Module code'], module_table['Honours year']):
+                if honours_year not in self.honours_year_module_counts:
+                    self.honours_year_module_counts[honours_year] = collections.Counter()
+                self.honours_year_module_counts[honours_year][module_code] += 1
+                self.module_honours_years.setdefault(module_code, honours_year)
+
+        self.module_classifications = {module_code: get_module_classification(module_code)
+                                       for module_code in self.full_module_set.union(self.honours_module_counts)}
+        self.studied_abroad = any(module_classification.is_study_abroad
+                                  for module_classification in self.module_classifications.values())
+        for module_code in self.module_honours_years:
+            if module_code not in self.module_classifications:
+                self.module_classifications[module_code] = get_module_classification(module_code)
+
+    def get_planned_honours_years(self):
+        """Get the honours years in which the student has planned modules.
+
+        Returns:
+        --------
+
+        honours_years : list of strings
+            the honours years, e.g. ['Year 1', 'Year 2'], in the order in which they appear in honours_module_choices
+        """
+        return list(dict.fromkeys(honours_year for honours_year, _ in self.module_timeline))
+
+    def get_modules_in_semester(self, honours_year, semester):
+        """Get the planned modules in one semester of one honours year.
+
+        Parameters:
+        -----------
+
+        honours_year : string
+            the honours year, e.g. 'Year 2'
+
+        semester : string
+            the semester, e.g. 'S1'
+
+        Returns:
+        --------
+
+        module_codes : list of strings
+            the planned modules, in the order in which they appear in honours_module_choices
+        """
+        return list(self.module_timeline.get((honours_year, semester), []))
+
+    def get_modules_taken_before_and_with_module(self, module):
+        """Find which modules the student has taken before a planned honours module, and which they are 
+        taking in the same semester.
+
+        Parameters:
+        -----------
+
+        module : string
+            the module code of a planned honours module
+
+        Returns:
+        --------
+
+        previously_taken_modules : set of strings
+            passed modules and planned modules from earlier honours years and semesters
+
+        simultaneously_taken_modules : list of strings
+            other planned modules in the same honours year and semester
+        """
+        slot = self.module_slots[module]
+        previously_taken_modules = self.modules_taken_before_slot[slot]
+        simultaneously_taken_modules = [module_code for module_code in self.module_timeline[slot] if module_code != module]
+
+        return previously_taken_modules, simultaneously_taken_modules
 
     def get_number_of_modules_in_list(self, module_list):
         """Get the number of modules that the student is taking in the module list. Already passed modules and scheduled
@@ -118,7 +315,151 @@ class Student():
         number_of_modules : int
             the number of modules in the given list that the student is taking.
         """
-        number_of_modules = len(set.intersection(set(self.full_module_list),set(module_list)))
+        number_of_modules = len(self.full_module_set.intersection(module_list))
         
         return number_of_modules
- 
\ No newline at end of file
+ 
+class ModuleClassification():
+    def __init__(self, module_code):
+        """Constructor for the ModuleClassification class. Reads the subject, level and number of a module from its code.
+
+        Parameters:
+        -----------
+
+        module_code : string
+            the module code, e.g. 'MT3501'
+        """
+        self.module_code = module_code
+        code_match = module_code_pattern.match(module_code)
+        if code_match is None:
+            self.subject = None
+            self.level = None
+            self.number = None
+            self.categories = frozenset([module_code])
+        else:
+            self.subject, digits = code_match.groups()
+            self.level = int(digits[0])
+            # codes like 'MT3J01' have a level but no number
+            if code_match.end() == len(module_code):
+                self.number = int(digits)
+            else:
+                self.number = None
+            # a module is in the category of its own code, its subject, e.g. 'MT', and its subject and level, e.g. 'MT3'
+            self.categories = frozenset([module_code, self.subject, self.subject + digits[0]])
+
+        self.is_dip_down = self.level is not None and self.level < 3
+        self.is_dip_across = self.subject != 'MT'
+        self.is_project = (self.number is not None and self.level >= 4 and
+                           module_code[len(self.subject) + 1:] in project_number_endings)
+        self.is_study_abroad = 'J' in module_code or 'MTSAU' in module_code or 'MT30' in module_code
+
+    def is_in_categories(self, categories):
+        """Check whether the module is in any of the given categories.
+
+        Parameters:
+        -----------
+
+        categories : frozenset of strings
+            module codes like 'ID5059', subjects like 'VP', or subjects and levels like 'MT3'
+
+        Returns:
+        --------
+
+        is_in_categories : bool
+            True if the module is in at least one of the categories
+        """
+        return not self.categories.isdisjoint(categories)
+
+class CreditLedger():
+    def __init__(self, passed_module_table, honours_module_choices, passed_honours_modules):
+        """Constructor for the CreditLedger class. Adds up the credits and the number of passed and planned modules of a
+        student once, so that the credit and course load checks can look them up.
+
+        Parameters:
+        -----------
+
+        passed_module_table : pandas data frame
+            the passed modules, with the columns 'Honours year', 'Semester', 'Module code' and optionally 'Credits'
+
+        honours_module_choices : pandas data frame
+            the planned modules, with the same columns
+
+        passed_honours_modules : list of strings
+            the passed modules that count as honours modules
+        """
+        # credits and number of modules for each (honours year, semester, level) tuple, of passed and planned modules
+        self.entries = dict()
+        # the credits of passed honours modules and planned modules
+        self.honours_credits = 0
+        # True if at least one of the module tables has credits
+        self.has_credits = False
+        # True if the passed modules and all planned modules have credits
+        self.credits_are_complete = 'Credits' in passed_module_table.columns and 'Credits' in honours_module_choices.columns
+
+        passed_honours_modules = set(passed_honours_modules)
+        for module_table, is_planned in [(passed_module_table, False), (honours_module_choices, True)]:
+            if 'Credits' in module_table.columns:
+                self.has_credits = True
+                module_credits = module_table['Credits']
+            else:
+                module_credits = [0]*len(module_table)
+            for module_code, honours_year, semester, credits in zip(module_table['Module code'], module_table['Honours year'],
+                                                                    module_table['Semester'], module_credits):
+                if pd.isna(credits):
+                    if is_planned:
+                        self.credits_are_complete = False
+                    credits = 0
+                entry = self.entries.setdefault((honours_year, semester, get_module_classification(module_code).level), [0, 0])
+                entry[0] += credits
+                entry[1] += 1
+                if is_planned or module_code in passed_honours_modules:
+                    self.honours_credits += credits
+
+        self.credits_by_honours_year = collections.Counter()
+        self.modules_by_honours_year = collections.Counter()
+        self.credits_by_level = collections.Counter()
+        for (honours_year, semester, level), (credits, number_of_modules) in self.entries.items():
+            self.credits_by_honours_year[honours_year] += credits
+            self.modules_by_honours_year[honours_year] += number_of_modules
+            self.credits_by_level[level] += credits
+
+@functools.lru_cache(maxsize=None)
+def get_module_classification(module_code):
+    """Classify a module code once per process.
+
+    Parameters:
+    -----------
+
+    module_code : string
+        the module code, e.g. 'MT3501'
+
+    Returns:
+    --------
+
+    module_classification : instance of ModuleClassification
+        the classification of the module
+    """
+    return ModuleClassification(module_code)
+
+def get_module_timeline(module_table):
+    """Index a table of modules by honours year and semester.
+
+    Parameters:
+    -----------
+
+    module_table : pandas data frame
+        a table with the columns 'Honours year', 'Semester' and 'Module code', like honours_module_choices
+
+    Returns:
+    --------
+
+    module_timeline : dictionary
+        the module codes for each (honours year, semester) tuple, in the order in which they appear in the table
+    """
+    module_timeline = dict()
+    for module_code, honours_year, semester in zip(module_table['Module code'],
+                                                   module_table['Honours year'],
+                                                   module_table['Semester']):
+        module_timeline.setdefault((honours_year, semester), []).append(module_code)
+
+    return module_timeline
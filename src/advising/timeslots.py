@@ -0,0 +1,125 @@
+import re
+
+# Timeslots are stored as bitmasks. Each hour of each day has two bits, one for odd weeks and one for even weeks,
+# so a lecture that runs every week sets both bits and overlaps with lectures in odd weeks and in even weeks,
+# while a lecture in odd weeks does not overlap with a lecture in even weeks.
+timetable_days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri']
+week_parities = ['odd weeks', 'even weeks']
+hours_per_day = 24
+
+# one item of a 'Timetable' entry, like '12noon Mon (odd weeks)' or 'Wed'. 'Mons' is a known typo in the catalogue.
+timetable_item_pattern = re.compile(r'(?:(\d{1,2})(am|pm|noon)\s+)?(Mon|Tue|Wed|Thu|Fri)s?(?:\s+\((odd|even) weeks\))?')
+
+def parse_timetable_entry(timeslot_entry):
+    """Turn an entry of the 'Timetable' column of the module catalogue into a list of timeslots.
+    An entry like '12noon Mon (odd weeks), Wed, Fri' will become
+    [('Mon', 12, 'odd weeks'), ('Wed', 12, None), ('Fri', 12, None)], i.e. a day without a time
+    is at the time of the item before it.
+
+    Parameters:
+    -----------
+
+    timeslot_entry : string or float
+        the entry of the catalogue. Empty entries are read as nan.
+
+    Returns:
+    --------
+
+    timeslots : list of tuples
+        one tuple (day, hour, week_parity) per timeslot. The hour counts from 0 to 23, and the week parity
+        is 'odd weeks', 'even weeks', or None if the timeslot is every week.
+    """
+    timeslots = []
+    if not isinstance(timeslot_entry, str):
+        return timeslots
+
+    hour = None
+    for item in timeslot_entry.split(','):
+        item_match = timetable_item_pattern.fullmatch(item.strip())
+        if item_match is None:
+            raise(ValueError('cannot read ' + repr(item.strip()) + ' in timetable entry ' + repr(timeslot_entry)))
+        hour_number, hour_suffix, day, week_parity = item_match.groups()
+        if hour_number is not None:
+            hour = int(hour_number) % 12
+            if hour_suffix == 'pm' or hour_suffix == 'noon':
+                hour += 12
+        if hour is None:
+            raise(ValueError('the timetable entry ' + repr(timeslot_entry) + ' does not start with a time'))
+        if week_parity is not None:
+            week_parity += ' weeks'
+        timeslots.append((day, hour, week_parity))
+
+    return timeslots
+
+def get_timeslot_mask(timeslots):
+    """Turn a list of timeslots into a bitmask.
+
+    Parameters:
+    -----------
+
+    timeslots : list of tuples
+        the timeslots, as returned by parse_timetable_entry()
+
+    Returns:
+    --------
+
+    timeslot_mask : int
+        the bitmask. Two modules clash if the bitwise and of their bitmasks is not 0.
+    """
+    timeslot_mask = 0
+    for day, hour, week_parity in timeslots:
+        for parity_index, this_week_parity in enumerate(week_parities):
+            if week_parity is None or week_parity == this_week_parity:
+                timeslot_mask |= 1 << (2*(timetable_days.index(day)*hours_per_day + hour) + parity_index)
+
+    return timeslot_mask
+
+def get_timeslot_labels(timeslot_mask):
+    """Turn a timeslot bitmask back into readable timeslots, like '9am Mon' or '12noon Wed (odd weeks)'.
+
+    Parameters:
+    -----------
+
+    timeslot_mask : int
+        the bitmask, e.g. the overlap of the bitmasks of two modules
+
+    Returns:
+    --------
+
+    timeslot_labels : list of strings
+        the timeslots, ordered by day and time
+    """
+    timeslot_labels = []
+    for day_index, day in enumerate(timetable_days):
+        for hour in range(hours_per_day):
+            hour_bits = (timeslot_mask >> (2*(day_index*hours_per_day + hour))) & 3
+            if hour_bits == 0:
+                continue
+            timeslot_label = get_hour_label(hour) + ' ' + day
+            if hour_bits != 3:
+                timeslot_label += ' (' + week_parities[hour_bits - 1] + ')'
+            timeslot_labels.append(timeslot_label)
+
+    return timeslot_labels
+
+def get_hour_label(hour):
+    """Write an hour of the day the way the module catalogue does, like '9am', '12noon' or '2pm'.
+
+    Parameters:
+    -----------
+
+    hour : int
+        the hour, counting from 0 to 23
+
+    Returns:
+    --------
+
+    hour_label : string
+        the hour as text
+    """
+    if hour < 12:
+        return str(hour) + 'am'
+    elif hour == 12:
+        return '12noon'
+    else:
+        return str(hour - 12) + 'pm'
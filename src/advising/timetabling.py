@@ -1,4 +1,6 @@
 from .infrastructure import *
+from .clash_table import *
+from .offerings import *
 
 def find_timetable_clashes(student):
     """Find all modules that the student is planning to take and which are not actually running in the year and semester
@@ -24,31 +26,16 @@ def find_timetable_clashes(student):
     adviser_recommendations_list = []
     
     # get remaining honours years
-    remaining_honours_years = student.honours_module_choices['Honours year'].unique()
+    remaining_honours_years = student.get_planned_honours_years()
     for honours_year in remaining_honours_years:
         for semester in ['S1', 'S2']:
-            semester_modules = student.honours_module_choices[(student.honours_module_choices['Semester'] == semester) &  
-                                                               (student.honours_module_choices['Honours year'] == honours_year)]['Module code'].to_list()
+            semester_modules = student.get_modules_in_semester(honours_year, semester)
             timeslot_dictionary = dict()
             for module in semester_modules:
-                these_timeslots = get_timeslots_for_module(module, semester)
-                timeslot_dictionary[module] = these_timeslots
+                timeslot_dictionary[module] = get_timeslot_mask_for_module(module, semester)
             
             timetable_clashes_list += find_clashing_timeslots_and_modules(timeslot_dictionary, honours_year, semester)
-            reduced_timeslot_dictionary = timeslot_dictionary.copy()
-            for _,value in reduced_timeslot_dictionary.items():
-                for entry in value:
-                    entry.replace(' (even weeks)','')
-            timetable_clashes_list += find_clashing_timeslots_and_modules(timeslot_dictionary, honours_year, semester)
-
-            reduced_timeslot_dictionary = timeslot_dictionary.copy()
-            for _,value in reduced_timeslot_dictionary.items():
-                for entry in value:
-                    entry.replace(' (odd weeks)','')
-            timetable_clashes_list += find_clashing_timeslots_and_modules(timeslot_dictionary, honours_year, semester)
 
-    # remove duplicate items
-    timetable_clashes_list = list(set(timetable_clashes_list))
     # merge all found problems into a string
     timetable_clashes = merge_list_to_long_string(timetable_clashes_list)
     adviser_recommendations = merge_list_to_long_string(adviser_recommendations_list)
@@ -56,13 +43,14 @@ def find_timetable_clashes(student):
     return timetable_clashes, adviser_recommendations
  
 def find_clashing_timeslots_and_modules(module_dictionary, honours_year, semester):
-    """Given timeslot and a dictionary of concurrently running modules return the timeslots that are clashing and the clashing module codes
+    """Given a dictionary of concurrently running modules return the timeslots that are clashing and the clashing module codes.
+    Modules that all run in the same timeslot are reported together in one warning.
     
     Parameters:
     -----------
     
     module_dictionary : dictionary
-        keys are module codes, values are lists of strings, which represent timeslots
+        keys are module codes, values are timeslot bitmasks, as returned by get_timeslot_mask_for_module()
     
     honours_year : string
         the honours year
@@ -76,48 +64,36 @@ def find_clashing_timeslots_and_modules(module_dictionary, honours_year, semeste
     timetable_clashes_list : list of strings
         warning messages about clashing modules
     """
-    timetable_clashes_list = []
-    all_timeslots = []
-    for module, timeslots in module_dictionary.items():
-        all_timeslots += timeslots
+    # find all timeslots in which at least two modules run, by looking up each pair of modules in the clash table
+    clash_table = get_clash_table(semester)
+    module_codes = sorted(module_dictionary)
+    clashing_timeslots = 0
+    for first_index, first_module in enumerate(module_codes):
+        for second_module in module_codes[first_index + 1:]:
+            clashing_timeslots |= clash_table.get_overlapping_timeslots(first_module, second_module)
 
-    my_timeslot_counter = collections.Counter(all_timeslots)
-    duplicate_entries = [timeslot for timeslot, count in my_timeslot_counter.items() if count > 1]
+    # find which modules run in each of these timeslots
     clashing_module_codes = []
-    for timeslot in duplicate_entries:
-        these_clashing_module_codes = []
-        for module, timeslot_list in module_dictionary.items():
-            if timeslot in timeslot_list:
-                these_clashing_module_codes.append(module)
-        these_clashing_module_codes.sort()
-        these_clashing_module_codes = tuple(these_clashing_module_codes)
-        clashing_module_codes.append(these_clashing_module_codes)
-        
-    unique_module_clashes = list(set(frozenset(entry) for entry in clashing_module_codes))
-    for module_combination in unique_module_clashes:
-        all_timeslot_sets = list()
-        for module in module_combination:
-            module_timeslots = set(module_dictionary[module])
-            all_timeslot_sets.append(module_timeslots)
-        affected_timeslots = set.intersection(*all_timeslot_sets)
-        # sort the list so that we can avoid duplicate warning in the if statement below
-        warning_string = 'Clash for ' + honours_year + ' ' + semester + ' between modules '
-        for module_index, module in enumerate(module_combination):
-            warning_string += module
-            if module_index < len(module_combination) - 1:
-                warning_string += ' and '
-        warning_string += ' at ' 
-        for timeslot_index, timeslot in enumerate(affected_timeslots):
-            warning_string += timeslot
-            if timeslot_index < len(affected_timeslots) - 1:
-                warning_string += ' and '
-        # if warning_string not in timetable_clashes_list:
+    while clashing_timeslots:
+        timeslot_bit = clashing_timeslots & -clashing_timeslots
+        clashing_timeslots ^= timeslot_bit
+        these_clashing_module_codes = [module for module in module_codes if module_dictionary[module] & timeslot_bit]
+        if these_clashing_module_codes not in clashing_module_codes:
+            clashing_module_codes.append(these_clashing_module_codes)
+
+    timetable_clashes_list = []
+    for module_combination in clashing_module_codes:
+        affected_timeslots = module_dictionary[module_combination[0]]
+        for module in module_combination[1:]:
+            affected_timeslots &= module_dictionary[module]
+        warning_string = ('Clash for ' + honours_year + ' ' + semester + ' between modules ' + 
+                          ' and '.join(module_combination) + ' at ' + ' and '.join(get_timeslot_labels(affected_timeslots)))
         timetable_clashes_list.append(warning_string)
     
     return timetable_clashes_list
    
-def get_timeslots_for_module(module, semester):
-    """Returns all timeslots for a module
+def get_timeslot_mask_for_module(module, semester):
+    """Returns all timeslots for a module as a bitmask
     
     Parameters:
     -----------
@@ -131,62 +107,15 @@ def get_timeslots_for_module(module, semester):
     Returns:
     --------
     
-    timeslots : list of strings
-        all timeslots that the module is running in
+    timeslot_mask : int
+        the bitmask of all timeslots that the module is running in
     """
-    if len(module_catalogue[module_catalogue['Module code'] == module]) == 0:
-        # The module does not exist, we have already flagged this
-        timeslot_entry = float('nan')
-    else:
-        timeslot_entries = module_catalogue[module_catalogue['Module code'] == module]['Timetable'].values
-        if len(timeslot_entries) == 1:
-            timeslot_entry = timeslot_entries[0]
-        else:
-            timeslot_entry = module_catalogue[(module_catalogue['Module code'] == module) & 
-                                                              (module_catalogue['Semester'] == semester)]['Timetable'].values[0]
-
-    timeslots = []
-    
-    # special treatment for MT4112 bewcause I can't be bothered to update the parsing below, it'd be a pain
-    if timeslot_entry == '10am Wed (odd weeks), 10am Fri (odd weeks)':
-        timeslots = ['10am Wed (odd weeks)', '10am Fri (odd weeks)']
-        return timeslots
-
-    if isinstance(timeslot_entry,str):
-        timeslot_splits = timeslot_entry.split()
-        first_timeslot = timeslot_splits[0]
-        if len(timeslot_splits) > 2 and timeslot_splits[2].startswith('('):
-            second_timeslot = first_timeslot + ' ' + timeslot_splits[4][:-1]
-            third_timeslot = first_timeslot + ' ' + timeslot_splits[5]
-            if third_timeslot.endswith(','):
-                third_timeslot = third_timeslot[:-1]
-            first_timeslot += ' ' + timeslot_splits[1] + ' ' + timeslot_splits[2] + ' ' + timeslot_splits[3][:-1]
-            timeslots += [first_timeslot, second_timeslot, third_timeslot]
-            if len(timeslot_splits) > 7:
-                remaining_splits = timeslot_splits[6:]
-            else:
-                remaining_splits = []
-        else:
-            first_timeslot += ' ' + timeslot_splits[1]
-            if first_timeslot.endswith(','):
-                first_timeslot = first_timeslot[:-1]
-            if len(timeslot_splits) > 2:
-                remaining_splits = timeslot_splits[2:]
-            else:
-                remaining_splits = []
-            timeslots.append(first_timeslot)
-        
-        current_index = 0
-        while current_index < len(remaining_splits):
-            this_timeslot = remaining_splits[current_index] + ' ' +  remaining_splits[current_index + 1]
-            if this_timeslot.endswith(','):
-                this_timeslot = this_timeslot[:-1]
-            timeslots.append(this_timeslot)
-            current_index +=2
+    # modules that do not exist have no timeslots, we have already flagged these
+    timeslot_mask = get_module_catalogue().get_timeslot_mask(module, semester)
         
-    return timeslots
+    return timeslot_mask
 
-def find_not_running_modules(student):
+def find_not_running_modules(student, choice_checks = None):
     """Find all modules that the student is planning to take and which are not actually running in the year and semester
     they are claiming.
     
@@ -195,6 +124,11 @@ def find_not_running_modules(student):
     
     student : instance of Student class
         the student we are investigating
+
+    choice_checks : pandas data frame
+        the result of OfferingIndex.check_module_choices() for the honours module choices of the student, if it has 
+        already been worked out, e.g. for a whole cohort by find_not_running_modules_for_cohort(). If this is None, 
+        the module choices will be checked here.
         
     Returns:
     --------
@@ -205,54 +139,29 @@ def find_not_running_modules(student):
     adviser_recommendations : string
         advising recommendations, in this case may include warnings where scheduling is not finalised.
     """
+    module_catalogue = get_module_catalogue()
+
     # make a list of not running modules
     not_running_modules_list = []
     adviser_recommendations_list = []
     
     for module in student.planned_honours_modules:
-        if module.startswith('MT') and module not in module_catalogue['Module code'].values:
+        if module.startswith('MT') and module not in module_catalogue:
             not_running_modules_list.append('Student is planning to take ' + module + ' (which does not exist)')
 
-    for _, row in student.honours_module_choices.iterrows():
-        # get the module data
-        planned_module_code = row['Module code']
-        planned_academic_year = row['Academic year']
-        planned_semester = row['Semester']
-        if len(module_catalogue[module_catalogue['Module code'] == planned_module_code]) == 0:
-            # the module does not exist, we have already flagged this so we are just going to
-            # skip this here
-            continue
-        module_catalogue_entry = module_catalogue[module_catalogue['Module code'] == planned_module_code]
-        # module_semester = module_catalogue_entry['Semester'].values[0]
-        module_semesters = module_catalogue_entry['Semester']
+    if choice_checks is None:
+        choice_checks = get_offering_index().check_module_choices(student.honours_module_choices)
+
+    # modules that do not exist have been flagged already, so only modules with a problem are left
+    problem_choice_checks = choice_checks[~choice_checks['Runs in semester'] | ~choice_checks['Runs in academic year']]
+    for _, row in problem_choice_checks.iterrows():
         # tell if the student picked the wrong semester
-        # if planned_semester != module_semester and module_semester != 'Full Year':
-        if (planned_semester not in module_semesters.values) and ('Full Year' not in module_semesters.values):
-            not_running_modules_list.append('Selected module ' + planned_module_code + ' for Semester ' +
-                                            planned_semester + ' but it is actually running in ' + module_semesters.values[0])
-        # figure out when the module is running
-        module_academic_year = module_catalogue_entry['Year'].values[0]
-        module_is_alternating_entry = module_catalogue_entry['Alternate years'].values[0]
-        if module_is_alternating_entry == 'Yes':
-            module_is_alternating = True
-        elif module_is_alternating_entry == 'No':
-            module_is_alternating = False
-        else:
-            raise(ValueError('cannot tell if module ' + planned_module_code + ' is alternating or not. Check the table entry.'))
-        # figure out which years the module is running in
-        list_of_running_academic_years = [module_academic_year]
-        start_year = int(module_academic_year[:4])
-        for repeat_index in range(20):
-            if module_is_alternating:
-                new_academic_year = str(start_year + 2*repeat_index) + '/' + str(start_year + 2*repeat_index + 1)
-            else:
-                new_academic_year = str(start_year + repeat_index) + '/' + str(start_year + repeat_index + 1)
-            list_of_running_academic_years.append(new_academic_year)
-        if planned_module_code == 'MT4614':
-            list_of_running_academic_years = ['2024/2025']
-        if planned_academic_year not in list_of_running_academic_years:
-            not_running_modules_list.append('Selected module ' + planned_module_code + ' is not running in academic year ' +
-                                            str(planned_academic_year))
+        if not row['Runs in semester']:
+            not_running_modules_list.append('Selected module ' + row['Module code'] + ' for Semester ' +
+                                            row['Semester'] + ' but it is actually running in ' + row['Catalogue semester'])
+        if not row['Runs in academic year']:
+            not_running_modules_list.append('Selected module ' + row['Module code'] + ' is not running in academic year ' +
+                                            row['Academic year'])
 
     if 'MT45AB' in student.planned_honours_modules or 'MT45ML' in student.planned_honours_modules:
         adviser_recommendations_list.append('Student is planning to take MT45AB or MT45ML - these will be new modules and their timetabling and prerequisites may change')
@@ -263,3 +172,43 @@ def find_not_running_modules(student):
     
     return not_running_modules, adviser_recommendations
 
+def find_not_running_modules_for_cohort(students):
+    """Find the modules that are not running as selected for many students at once, with one join of
+    all their module choices against the offering index.
+    
+    Parameters:
+    -----------
+    
+    students : list of instances of Student class
+        the students to check, e.g. all final year students
+        
+    Returns:
+    --------
+    
+    not_running_modules : dictionary
+        the result of find_not_running_modules() for each student ID, i.e. a tuple (not_running_modules, 
+        adviser_recommendations). Students whose modules cannot be checked are left out, so that they can be
+        checked individually and the error can be reported for them.
+    """
+    offering_index = get_offering_index()
+    if len(students) == 0:
+        return dict()
+
+    student_ids = np.concatenate([np.full(len(student.honours_module_choices), student.student_id) for student in students])
+    all_module_choices = pd.concat([student.honours_module_choices[['Module code', 'Academic year', 'Semester']] 
+                                    for student in students], ignore_index = True)
+    try:
+        all_choice_checks = offering_index.check_module_choices(all_module_choices)
+    except ValueError:
+        # a module in the catalogue cannot be checked, so check every student on their own to find out whom this affects
+        return dict()
+    all_choice_checks['Student ID'] = student_ids
+
+    not_running_modules = dict()
+    choice_checks_by_student = dict(tuple(all_choice_checks.groupby('Student ID', sort = False)))
+    for student in students:
+        choice_checks = choice_checks_by_student.get(student.student_id, all_choice_checks.iloc[:0])
+        not_running_modules[student.student_id] = find_not_running_modules(student, choice_checks)
+
+    return not_running_modules
+